@@ -0,0 +1,65 @@
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bs4 import BeautifulSoup
+from stats_scraper import pages
+
+
+ROWS = 2000
+REPEAT = 3
+
+
+def build_page(rows: int) -> str:
+    body = "".join(
+        f'<tr><td class="time"><a href="/stats/matches/{i}/x">{i % 28 + 1:02d}/01/25</a></td>'
+        f'<td class="gtSmartphone-only"><a href="/events/1/x"><span>Event {i % 7}</span></a></td>'
+        f'<td class="gtSmartphone-only"><img class="flag" src="x.gif"></td>'
+        f'<td><img class="flag" src="x.gif"><a href="/stats/teams/1/x">Opponent {i % 9}</a></td>'
+        f'<td class="statsMapPlayed"><span>Mirage</span></td>'
+        f'<td class="statsDetail">13 - {i % 13}</td>'
+        f'<td class="text-center match-won">W</td></tr>'
+        for i in range(rows)
+    )
+    return f'<html><body><table class="stats-table"><tbody>{body}</tbody></table></body></html>'
+
+
+def get_text(soup, selector):
+    text = soup.select_one(selector)
+    return text.getText(strip=True) if text else None
+
+
+def legacy_matches(soup):
+    return [{
+        "date":     get_text(item, ".time"),
+        "event":    get_text(item, ".gtSmartphone-only"),
+        "opponent": get_text(item, ":nth-child(4)"),
+        "map":      get_text(item, ".statsMapPlayed"),
+        "result":   get_text(item, ".statsDetail"),
+        "W/L":      get_text(item, ".text-center:not(.gtSmartphone-only)")
+    } for item in soup.select(".stats-table > tbody > tr")]
+
+
+def schema_matches(soup):
+    return pages.TEAM_MATCHES.collect(soup)
+
+
+def measure(parser, soup) -> float:
+    best = float("inf")
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        parser(soup)
+        best = min(best, time.perf_counter() - started)
+    return ROWS / best
+
+
+if __name__ == "__main__":
+    soup = BeautifulSoup(build_page(ROWS), "lxml")
+    assert legacy_matches(soup) == schema_matches(soup)
+
+    legacy = measure(legacy_matches, soup)
+    schema = measure(schema_matches, soup)
+    print(f"get_text/select_one: {legacy:10.0f} rows/sec")
+    print(f"compiled schema:     {schema:10.0f} rows/sec ({schema / legacy:.2f}x)")
@@ -0,0 +1,86 @@
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from stats_scraper.logger import logger
+from stats_scraper.features import Tables, match_features
+from stats_scraper.state import MATCH, PLAYERS, TEAMS
+from stats_scraper.storage import Storage
+from benchmarks.bench_models import fixture_sections
+
+
+MAPS = ("Mirage", "Inferno", "Nuke", "Ancient", "Anubis", "Vertigo", "Overpass")
+
+
+def synthetic_sections(template: str, rng: random.Random, match_id: int, teams: int) -> dict:
+    sections = json.loads(template)
+    start = datetime(2025, 1, 1) + timedelta(hours=match_id * 6)
+    sections[MATCH]["start"] = int(start.timestamp())
+    sections[MATCH]["analytics_url"] = None
+
+    team_ids = rng.sample(range(1, teams + 1), 2)
+    lineups = sections[MATCH]["data"]["lineups"]
+    for lineup, team_id in zip(lineups, team_ids):
+        lineup["id"], lineup["team"] = team_id, f"team-{team_id}"
+        for player in lineup["players"]:
+            player["id"] = f"{team_id}-{player['id']}"
+    sections[MATCH]["data"]["head_to_head"]["stats"] = {
+        lineup["team"]: str(rng.randint(0, 9)) for lineup in lineups
+    }
+
+    for stats in sections[PLAYERS]:
+        stats["short_stats"]["Rating 2.0"] = f"{rng.uniform(0.7, 1.4):.2f}"
+    for team_stats, lineup in zip(sections[TEAMS], lineups):
+        team_stats["team"] = lineup["team"]
+        for index, item in enumerate(team_stats["matches"]):
+            won, lost = rng.randint(0, 16), rng.randint(0, 16)
+            item.update(
+                date=(start - timedelta(days=index * 3 + 1)).strftime("%d/%m/%y"),
+                map=rng.choice(MAPS),
+                result=f"{won} - {lost}",
+                **{"W/L": "W" if won > lost else "L"}
+            )
+        for item in team_stats["opening_kills"] + team_stats["flashes"]:
+            item["success"] = f"{rng.uniform(0.2, 1.8):.2f}"
+    return sections
+
+
+def bench(matches: int, teams: int, out_dir: Path) -> dict:
+    rng = random.Random(0)
+    template = json.dumps(fixture_sections(), ensure_ascii=False)
+    storage = Storage(out_dir / "features.sqlite3")
+    for match_id in range(1, matches + 1):
+        storage.save(match_id, f"/matches/{match_id}/bench", synthetic_sections(template, rng, match_id, teams))
+
+    started = time.perf_counter()
+    tables = Tables(storage)
+    loaded = time.perf_counter()
+    features = match_features(tables)
+    computed = time.perf_counter()
+    storage.close()
+
+    return {
+        "matches": matches,
+        "history_rows": len(tables.history_day),
+        "load_s": round(loaded - started, 3),
+        "compute_s": round(computed - loaded, 3),
+        "columns": len(features)
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бенчмарк расчета признаков по архиву матчей")
+    parser.add_argument("--matches", type=int, default=2000)
+    parser.add_argument("--teams", type=int, default=60)
+    args = parser.parse_args()
+
+    logger.remove()
+    with tempfile.TemporaryDirectory() as out_dir:
+        print(json.dumps(bench(args.matches, args.teams, Path(out_dir)), indent=4))
@@ -0,0 +1,71 @@
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import soupsieve as sv
+from bs4 import BeautifulSoup
+
+from stats_scraper import pages
+from stats_scraper.fetcher import ROUTES
+from benchmarks.server import FIXTURES_DIR
+
+
+def with_chrome(page_content: str, size_kb: int) -> str:
+    block = '<div class="sidebar-item"><a href="/news/1/headline"><img src="/img/1.png"><span>Headline</span></a></div>'
+    script = '<script>window.__DATA__ = {"ads": [' + ",".join(['{"id": 1, "slot": "top"}'] * (size_kb * 20)) + ']};</script>'
+    chrome = '<div class="sidebar">' + block * (size_kb * 5) + "</div>"
+    return page_content.replace("<body>", "<body>" + chrome, 1).replace("</body>", script + "</body>", 1)
+
+
+def fragments(page_content: str, roots: tuple) -> str | None:
+    soup = BeautifulSoup(page_content, "lxml")
+    selector = sv.compile(", ".join(roots))
+    found = [
+        str(element) for element in selector.select(soup)
+        if not any(selector.match(parent) for parent in element.parents if parent is not soup)
+    ]
+    return "<html><body>" + "".join(found) + "</body></html>" if found else None
+
+
+def parse_ms(page_type: str, page_content: str, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        pages.parse_html(page_type, page_content)
+    return round((time.perf_counter() - started) / repeat * 1000, 3)
+
+
+def bench(pages_dir: Path, repeat: int, chrome_kb: int) -> dict:
+    results = {}
+    for route in ROUTES:
+        path = pages_dir / f"{route.name}.html"
+        if not path.exists() or not route.roots:
+            continue
+
+        page_content = with_chrome(path.read_text(encoding="utf-8"), chrome_kb)
+        fragment = fragments(page_content, route.roots)
+        results[route.name] = {
+            "same_result": fragment is not None
+                           and pages.parse_html(route.name, fragment) == pages.parse_html(route.name, page_content),
+            "page_bytes": len(page_content.encode("utf-8")),
+            "fragment_bytes": len(fragment.encode("utf-8")) if fragment else 0,
+            "page_parse_ms": parse_ms(route.name, page_content, repeat),
+            "fragment_parse_ms": parse_ms(route.name, fragment, repeat) if fragment else None
+        }
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Сравнение разбора целых страниц и фрагментов из browser.fragments")
+    parser.add_argument("--pages", default=str(FIXTURES_DIR), help="папка с сохраненными страницами <тип>.html")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--chrome-kb", type=int, default=300,
+                        help="примерный размер навигации, рекламы и скриптов, добавляемых к каждой странице (КБ)")
+    args = parser.parse_args()
+
+    results = bench(Path(args.pages), args.repeat, args.chrome_kb)
+    print(json.dumps(results, indent=4, ensure_ascii=False))
+    sys.exit(0 if all(result["same_result"] for result in results.values()) else 1)
@@ -0,0 +1,61 @@
+import sys
+import json
+import argparse
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from stats_scraper.logger import logger
+from stats_scraper import pages
+from stats_scraper.models import to_records, to_sections
+from stats_scraper.state import MATCH, PLAYERS, TEAMS
+from benchmarks.bench_pipeline import fixture_report
+
+
+def fixture_sections() -> dict:
+    report = fixture_report()
+    match_page = pages.parse_html("match", (pages_dir() / "match.html").read_text(encoding="utf-8"))
+    return {
+        MATCH: {"name": match_page["name"], "type": match_page["type"], "data": match_page["data"]},
+        PLAYERS: report["match_player_stats"],
+        TEAMS: report["match_teams"]
+    }
+
+
+def pages_dir() -> Path:
+    return Path(__file__).resolve().parent / "fixtures"
+
+
+def allocated_mb(build) -> float:
+    tracemalloc.start()
+    data = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del data
+    return round(size / 1024 / 1024, 2)
+
+
+def bench(matches: int) -> dict:
+    text = json.dumps(fixture_sections(), ensure_ascii=False)
+    sections = json.loads(text)
+    if to_sections(to_records(sections)) != sections:
+        raise SystemExit("Записи не совпадают со словарями после обратного преобразования")
+
+    dicts_mb = allocated_mb(lambda: [json.loads(text) for _ in range(matches)])
+    records_mb = allocated_mb(lambda: [to_records(json.loads(text)) for _ in range(matches)])
+    return {
+        "matches": matches,
+        "dicts_mb": dicts_mb,
+        "records_mb": records_mb,
+        "ratio": round(dicts_mb / records_mb, 2)
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Память архива матчей: словари против типизированных записей")
+    parser.add_argument("--matches", type=int, default=200)
+    args = parser.parse_args()
+
+    logger.remove()
+    print(json.dumps(bench(args.matches), indent=4))
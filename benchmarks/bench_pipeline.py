@@ -0,0 +1,155 @@
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from stats_scraper.logger import logger
+from stats_scraper import pages, utils
+from stats_scraper.main import main
+from stats_scraper.fetcher import ROUTES
+from stats_scraper.settings import load_config
+from benchmarks.server import FIXTURES_DIR, StandInServer
+
+
+LOWER_IS_BETTER = ("wall_time_s", "report_ms", "peak_rss_mb")
+HIGHER_IS_BETTER = ("pages_per_sec",)
+
+
+def bench_config(base_url: str, parser_mode: str) -> dict:
+    config = dict(load_config())
+    config["base_url"] = base_url
+    config["rate_limit"] = {"rate": 10000, "burst": 1000, "concurrency": 32, "min_concurrency": 1, "max_concurrency": 64}
+    config["http"] = {**config.get("http", {}), "strategies": {route.name: "http" for route in ROUTES}}
+    config["cache"] = {**config.get("cache", {}), "enabled": False}
+    config["archive"] = {**config.get("archive", {}), "enabled": False}
+    config["journal"] = {**config.get("journal", {}), "enabled": False}
+    config["storage"] = {**config.get("storage", {}), "database": str(utils.OUT_DIR / "hltv.sqlite3")}
+    config["parser"] = {**config.get("parser", {}), "mode": parser_mode}
+    return config
+
+
+def peak_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    usage = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return round(usage / scale, 1)
+
+
+def bench_parse(repeat: int) -> dict:
+    results = {}
+    for path in sorted(FIXTURES_DIR.glob("*.html")):
+        page_content = path.read_text(encoding="utf-8")
+        started = time.perf_counter()
+        for _ in range(repeat):
+            pages.parse_html(path.stem, page_content)
+        results[path.stem] = round((time.perf_counter() - started) / repeat * 1000, 3)
+    return results
+
+
+def fixture_report() -> dict:
+    fixture = lambda name: pages.parse_html(name, (FIXTURES_DIR / f"{name}.html").read_text(encoding="utf-8"))
+    match_page = fixture("match")
+    team_stats = {"team": "team"}
+    for page_type in ("team_overview", "team_matches", "team_maps", "team_players", "team_flashes", "team_opening_kills"):
+        team_stats.update(fixture(page_type))
+
+    return {
+        "match_name": f"{match_page['name']}. {match_page['type']}",
+        "match_pre_data": match_page["data"],
+        "match_player_stats": [fixture("player_stats")] * 10,
+        "match_analytics": fixture("match_analytics"),
+        "match_teams": [team_stats, team_stats]
+    }
+
+
+def bench_report(repeat: int) -> float:
+    json_data = fixture_report()
+    started = time.perf_counter()
+    for index in range(repeat):
+        utils.save_data_to_txt(json_data, f"report-{index}")
+    return round((time.perf_counter() - started) / repeat * 1000, 3)
+
+
+async def bench_pipeline(args: argparse.Namespace) -> dict:
+    server = StandInServer(latency=args.latency, jitter=args.jitter,
+                           error_rate=args.error_rate, challenge_rate=args.challenge_rate)
+    base_url = await server.start()
+    try:
+        started = time.perf_counter()
+        await main(config=bench_config(base_url, args.parser))
+        wall_time = time.perf_counter() - started
+    finally:
+        await server.close()
+
+    pages_served = sum(server.served.values())
+    return {
+        "wall_time_s": round(wall_time, 3),
+        "pages": pages_served,
+        "pages_per_sec": round(pages_served / wall_time, 1),
+        "bytes": server.served_bytes,
+        "injected_errors": server.errors,
+        "pages_by_type": dict(server.served)
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    regressions = []
+    for key in LOWER_IS_BETTER + HIGHER_IS_BETTER:
+        old, new = baseline.get(key), results.get(key)
+        if not old or new is None:
+            continue
+        change = (new - old) / old
+        if (key in LOWER_IS_BETTER and change > tolerance) or (key in HIGHER_IS_BETTER and change < -tolerance):
+            regressions.append(f"{key}: {old} -> {new} ({change:+.0%})")
+
+    for page_type, old in baseline.get("parse_ms", {}).items():
+        new = results["parse_ms"].get(page_type)
+        if old and new is not None and (new - old) / old > tolerance:
+            regressions.append(f"parse_ms.{page_type}: {old} -> {new} ({(new - old) / old:+.0%})")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бенчмарк скрапера на локальной замене hltv.org")
+    parser.add_argument("--parser", default="inline", choices=("inline", "thread", "process"))
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--jitter", type=float, default=0.01)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--challenge-rate", type=float, default=0.0)
+    parser.add_argument("--repeat", type=int, default=20, help="повторов для замеров разбора и отчета")
+    parser.add_argument("--output", help="файл для результатов в JSON")
+    parser.add_argument("--baseline", help="предыдущие результаты для поиска регрессий")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="допустимое ухудшение (доля)")
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        utils.OUT_DIR = Path(out_dir)
+        results = asyncio.run(bench_pipeline(args))
+        results["parse_ms"] = bench_parse(args.repeat)
+        results["report_ms"] = bench_report(args.repeat)
+    results["peak_rss_mb"] = peak_rss_mb()
+
+    output = json.dumps(results, indent=4, ensure_ascii=False)
+    print(output)
+    if args.output:
+        Path(args.output).write_text(output, encoding="utf-8")
+
+    if args.baseline:
+        regressions = compare(results, json.loads(Path(args.baseline).read_text(encoding="utf-8")), args.tolerance)
+        for regression in regressions:
+            print(f"Регрессия: {regression}", file=sys.stderr)
+        sys.exit(1 if regressions else 0)
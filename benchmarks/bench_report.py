@@ -0,0 +1,81 @@
+import sys
+import json
+import shutil
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from stats_scraper.logger import logger
+from stats_scraper import utils
+from benchmarks.bench_pipeline import fixture_report
+from benchmarks.legacy_report import legacy_save_data_to_txt
+
+
+def scaled_report(scale: int) -> dict:
+    json_data = fixture_report()
+    json_data["match_teams"] = [
+        {key: value * scale if isinstance(value, list) else value for key, value in team_stats.items()}
+        for team_stats in json_data["match_teams"]
+    ]
+    return json_data
+
+
+def throughput(render, count: int) -> float:
+    started = time.perf_counter()
+    render(count)
+    return round(count / (time.perf_counter() - started), 1)
+
+
+def bench(args: argparse.Namespace, out_dir: Path) -> dict:
+    utils.OUT_DIR = out_dir
+    results = {}
+    for scale in args.scale:
+        json_data = scaled_report(scale)
+
+        legacy_save_data_to_txt(json_data, out_dir / "legacy.txt")
+        utils.save_data_to_txt(json_data, "report")
+        if (out_dir / "legacy.txt").read_bytes() != (out_dir / "report.txt").read_bytes():
+            raise SystemExit(f"Отчеты различаются при scale={scale}")
+
+        def legacy(count: int) -> None:
+            for index in range(count):
+                legacy_save_data_to_txt(json_data, out_dir / "legacy" / f"{index}.txt")
+
+        def streaming(count: int) -> None:
+            for index in range(count):
+                utils.save_data_to_txt(json_data, f"streaming/{index}")
+
+        def batch(count: int) -> None:
+            utils.save_reports_to_txt((json_data, f"batch/{index}") for index in range(count))
+
+        # Способы замеряются по очереди несколько раз, каждый в своей папке, и
+        # берется лучший результат: иначе на медленной записи на диск выигрывает
+        # тот, кто запускался первым
+        variants = {"legacy_per_sec": legacy, "streaming_per_sec": streaming, "batch_per_sec": batch}
+        best = dict.fromkeys(variants, 0.0)
+        for _ in range(args.rounds):
+            for name, render in variants.items():
+                shutil.rmtree(out_dir / name.split("_")[0], ignore_errors=True)
+                (out_dir / name.split("_")[0]).mkdir()
+                best[name] = max(best[name], throughput(render, args.count))
+
+        results[f"scale_{scale}"] = {"report_kb": (out_dir / "report.txt").stat().st_size // 1024, **best}
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Сравнение скорости построения txt отчетов")
+    parser.add_argument("--count", type=int, default=200, help="отчетов на каждый замер")
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 10, 50],
+                        help="во сколько раз увеличить таблицы статистики команд")
+    parser.add_argument("--rounds", type=int, default=3, help="повторов каждого замера")
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        print(json.dumps(bench(args, Path(out_dir)), indent=4, ensure_ascii=False))
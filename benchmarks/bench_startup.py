@@ -0,0 +1,73 @@
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+import tarfile
+import tempfile
+from io import BytesIO
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+HEAVY_MODULES = ("aiohttp", "bs4", "dateutil", "fake_useragent", "lxml", "numpy", "playwright", "soupsieve", "yaml")
+
+TARGETS = {
+    "import_main": [sys.executable, "-c", "import stats_scraper.main"],
+    "start_help": [sys.executable, "start.py", "--help"]
+}
+
+LOADED = (
+    "import sys, stats_scraper.main; "
+    f"print(' '.join(name for name in {HEAVY_MODULES!r} if name in sys.modules))"
+)
+
+
+def checkout(ref: str, directory: Path) -> Path:
+    archive = subprocess.run(["git", "archive", "--format=tar", ref], cwd=ROOT, capture_output=True, check=True)
+    with tarfile.open(fileobj=BytesIO(archive.stdout)) as tar:
+        tar.extractall(directory)
+    return directory
+
+
+def wall_time_ms(command: list, cwd: Path, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run(command, cwd=cwd, capture_output=True, check=True)
+        timings.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(timings), 1)
+
+
+def slowest_imports(cwd: Path, limit: int) -> dict:
+    output = subprocess.run([sys.executable, "-X", "importtime", "-c", "import stats_scraper.main"],
+                            cwd=cwd, capture_output=True, text=True, check=True).stderr
+    imports = []
+    for line in output.splitlines()[1:]:
+        own, _, name = line.split("|")
+        imports.append((int(own.split(":")[1]), name.strip()))
+    return {name: round(own / 1000, 1) for own, name in sorted(imports, reverse=True)[:limit]}
+
+
+def bench(cwd: Path, repeat: int, limit: int) -> dict:
+    interpreter = wall_time_ms([sys.executable, "-c", "pass"], cwd, repeat)
+    results = {name: round(wall_time_ms(command, cwd, repeat) - interpreter, 1) for name, command in TARGETS.items()}
+    results["heavy_modules"] = subprocess.run([sys.executable, "-c", LOADED], cwd=cwd, capture_output=True,
+                                              text=True, check=True).stdout.split()
+    results["slowest_imports_ms"] = slowest_imports(cwd, limit)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бенчмарк времени запуска (мс сверх запуска пустого интерпретатора)")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--top", type=int, default=8, help="сколько самых медленных импортов показать")
+    parser.add_argument("--ref", help="git-ревизия для сравнения, например HEAD~1")
+    args = parser.parse_args()
+
+    results = {"current": bench(ROOT, args.repeat, args.top)}
+    if args.ref:
+        with tempfile.TemporaryDirectory() as directory:
+            results[args.ref] = bench(checkout(args.ref, Path(directory)), args.repeat, args.top)
+    print(json.dumps(results, indent=4, ensure_ascii=False))
@@ -0,0 +1,95 @@
+import sys
+import random
+import asyncio
+import argparse
+from pathlib import Path
+from collections import Counter
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from aiohttp import web
+from stats_scraper.fetcher import find_route
+
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+CHALLENGE_PAGE = (
+    "<html><head><title>Just a moment...</title></head>"
+    '<body><div id="challenge-platform"></div></body></html>'
+)
+
+
+class StandInServer:
+    def __init__(self, fixtures_dir: Path = FIXTURES_DIR, latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, challenge_rate: float = 0.0, seed: int = 0) -> None:
+        self.fixtures = {path.stem: path.read_text(encoding="utf-8") for path in fixtures_dir.glob("*.html")}
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.challenge_rate = challenge_rate
+        self.random = random.Random(seed)
+
+        self.served: Counter = Counter()
+        self.served_bytes = 0
+        self.errors = 0
+        self._runner = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        app = web.Application()
+        app.router.add_route("GET", "/{path:.*}", self.handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        host, port = self._runner.addresses[0][:2]
+        return f"http://{host}:{port}"
+
+    async def close(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    async def handle(self, request: web.Request) -> web.Response:
+        if self.latency or self.jitter:
+            await asyncio.sleep(max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter)))
+
+        roll = self.random.random()
+        if roll < self.error_rate:
+            self.errors += 1
+            return web.Response(status=503, text="Service Unavailable")
+        if roll < self.error_rate + self.challenge_rate:
+            self.errors += 1
+            return web.Response(status=403, text=CHALLENGE_PAGE, content_type="text/html")
+
+        route = find_route(str(request.rel_url))
+        page_content = self.fixtures.get(route.name)
+        if page_content is None:
+            return web.Response(status=404, text="Not Found")
+
+        self.served[route.name] += 1
+        self.served_bytes += len(page_content)
+        return web.Response(text=page_content, content_type="text/html")
+
+
+async def serve(args: argparse.Namespace) -> None:
+    server = StandInServer(Path(args.fixtures), args.latency, args.jitter, args.error_rate, args.challenge_rate)
+    url = await server.start(args.host, args.port)
+    print(f"Сервер запущен: {url}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Локальная замена hltv.org для бенчмарков")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--fixtures", default=str(FIXTURES_DIR))
+    parser.add_argument("--latency", type=float, default=0.0, help="задержка ответа (сек)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="случайное отклонение задержки (сек)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="доля ответов 503")
+    parser.add_argument("--challenge-rate", type=float, default=0.0, help="доля страниц проверки Cloudflare")
+    try:
+        asyncio.run(serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -1,5 +1,28 @@
 import asyncio
-from stats_scraper.main import main
+import argparse
+from stats_scraper.logger import setup_logger
+from stats_scraper.main import backfill, coordinator, main, worker
+from stats_scraper.settings import load_config
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--replay", action="store_true", help="разобрать страницы из архива без обращения к сайту")
+    parser.add_argument("--watch", action="store_true", help="постоянно обновлять данные матчей, загружая только изменившиеся разделы")
+    parser.add_argument("--resume", action="store_true", help="продолжить прерванный запуск, не загружая уже полученные страницы")
+    parser.add_argument("--coordinator", action="store_true", help="раздавать задачи исполнителям через общую очередь и собирать результаты")
+    parser.add_argument("--worker", action="store_true", help="выполнять задачи из общей очереди")
+    parser.add_argument("--backfill", action="store_true", help="загрузить прошедшие матчи за период из раздела backfill настроек")
+    args = parser.parse_args()
+    setup_logger(load_config().get("debug", False))
+    
+    try:
+        if args.coordinator:
+            asyncio.run(coordinator(resume=args.resume))
+        elif args.backfill:
+            asyncio.run(backfill(replay=args.replay))
+        elif args.worker:
+            asyncio.run(worker(replay=args.replay))
+        else:
+            asyncio.run(main(replay=args.replay, watch=args.watch, resume=args.resume))
+    except KeyboardInterrupt:
+        pass
\ No newline at end of file
@@ -0,0 +1,118 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from stats_scraper.logger import logger
+from stats_scraper.utils import normalize_url
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+DATE_PARAMS = ("startDate", "endDate")
+
+
+class ArchiveMiss(LookupError):
+    pass
+
+
+def undated_url(url: str) -> str:
+    parts = urlsplit(normalize_url(url))
+    query = urlencode([(key, value) for key, value in parse_qsl(parts.query) if key not in DATE_PARAMS])
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, query, ""))
+
+
+class PageArchive:
+    def __init__(self, path: Path, compression: str = "zstd") -> None:
+        if compression == "zstd" and zstandard is None:
+            logger.debug("Модуль zstandard не установлен, архив сжимается gzip")
+            compression = "gzip"
+
+        self.path = path
+        self.compression = compression
+        self.index_path = path / "index.jsonl"
+
+        self._lock = threading.Lock()
+        self._index: Optional[Dict[str, Tuple[str, float, int]]] = None
+        self._undated: Optional[Dict[str, Tuple[str, float, int]]] = None
+
+    def store(self, url: str, page_content: str, status: int) -> str:
+        content = page_content.encode("utf-8")
+        digest = hashlib.sha256(content).hexdigest()
+        record = {"url": url, "hash": digest, "fetched_at": time.time(), "status": status}
+
+        with self._lock:
+            if self._find_object(digest) is None:
+                self._write_object(digest, content)
+            with open(self.index_path, "a", encoding="utf-8") as file:
+                file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            if self._index is not None:
+                self._add_to_index(record)
+        return digest
+
+    def load(self, url: str) -> str:
+        with self._lock:
+            if self._index is None:
+                self._read_index()
+            entry = self._index.get(normalize_url(url)) or self._undated.get(undated_url(url))
+
+        if entry is None:
+            raise ArchiveMiss(f"Страницы нет в архиве: {url}")
+        return self.read_object(entry[0])
+
+    def read_object(self, digest: str) -> str:
+        path = self._find_object(digest)
+        if path is None:
+            raise ArchiveMiss(f"Объект {digest} отсутствует в архиве")
+
+        content = path.read_bytes()
+        if path.suffix == ".zst":
+            content = zstandard.ZstdDecompressor().decompress(content)
+        elif path.suffix == ".gz":
+            content = gzip.decompress(content)
+        return content.decode("utf-8")
+
+    def _object_path(self, digest: str, suffix: str) -> Path:
+        return self.path / "objects" / digest[:2] / f"{digest}.html{suffix}"
+
+    def _find_object(self, digest: str) -> Optional[Path]:
+        for suffix in (".zst", ".gz"):
+            path = self._object_path(digest, suffix)
+            if path.exists():
+                return path
+        return None
+
+    def _write_object(self, digest: str, content: bytes) -> None:
+        if self.compression == "zstd":
+            path, content = self._object_path(digest, ".zst"), zstandard.ZstdCompressor(level=10).compress(content)
+        else:
+            path, content = self._object_path(digest, ".gz"), gzip.compress(content)
+
+        os.makedirs(path.parent, exist_ok=True)
+        temp_path = path.with_name(f"{path.name}.tmp")
+        temp_path.write_bytes(content)
+        os.replace(temp_path, path)
+
+    def _read_index(self) -> None:
+        self._index, self._undated = {}, {}
+        if not self.index_path.exists():
+            return
+        with open(self.index_path, encoding="utf-8") as file:
+            for line in file:
+                if line.strip():
+                    self._add_to_index(json.loads(line))
+
+    def _add_to_index(self, record: dict) -> None:
+        entry = (record["hash"], record["fetched_at"], record["status"])
+        for index, key in ((self._index, normalize_url(record["url"])), (self._undated, undated_url(record["url"]))):
+            current = index.get(key)
+            if current is None or entry[2] == 200 or current[2] != 200:
+                index[key] = entry
@@ -0,0 +1,66 @@
+import sqlite3
+import threading
+import time
+from datetime import date, timedelta
+
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+from stats_scraper.logger import logger
+from stats_scraper.metrics import metrics
+from stats_scraper.paths import ensure_parent
+from stats_scraper.scraper import Scraper
+
+
+Position = Tuple[str, int]
+
+
+def parse_date(value: Any) -> date:
+    return value if isinstance(value, date) else date.fromisoformat(str(value))
+
+
+async def iter_results(scraper: Scraper, start: date, end: date, window_days: int = 7,
+                       position: Optional[Position] = None) -> AsyncIterator[Tuple[Dict[str, Any], Optional[Position]]]:
+    window, offset = position or (start.isoformat(), 0)
+    window_start = date.fromisoformat(window)
+    while window_start <= end:
+        window_end = min(window_start + timedelta(days=window_days - 1), end)
+        page = await scraper.get_results(window_start.isoformat(), window_end.isoformat(), offset)
+        matches = page["matches"]
+        metrics.inc("backfill_pages_total")
+
+        offset += len(matches)
+        if not matches or page["total"] is None or offset >= page["total"]:
+            window_start, offset = window_end + timedelta(days=1), 0
+        for number, match in enumerate(matches, 1):
+            yield match, (window_start.isoformat(), offset) if number == len(matches) else None
+
+
+class BackfillCursor:
+    def __init__(self, path: Path, start: date, end: Optional[date] = None) -> None:
+        self.key = f"{start.isoformat()}:{end.isoformat() if end is not None else 'open'}"
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(ensure_parent(path), check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS cursors ("
+            "range TEXT PRIMARY KEY, window TEXT NOT NULL, offset INTEGER NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._connection.commit()
+
+    def position(self) -> Optional[Position]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT window, offset FROM cursors WHERE range = ?", (self.key,)
+            ).fetchone()
+        return None if row is None else (row[0], row[1])
+
+    def commit(self, position: Position) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO cursors VALUES (?, ?, ?, ?)", (self.key, *position, time.time())
+            )
+        logger.debug(f"Загрузка прошедших матчей {self.key}: позиция {position[0]}, смещение {position[1]}")
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
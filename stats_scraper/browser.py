@@ -0,0 +1,177 @@
+import asyncio
+from collections import Counter
+from contextlib import asynccontextmanager
+from urllib.parse import urlsplit
+
+from typing import TYPE_CHECKING, AsyncIterator, Dict, List, Optional, Tuple
+from stats_scraper.logger import logger
+from stats_scraper.metrics import metrics
+from stats_scraper.useragent import random_user_agent
+
+if TYPE_CHECKING:
+    from playwright.async_api import Browser, BrowserContext, Page, Playwright, Route
+
+
+ALLOWED_RESOURCE_TYPES = ("document", "script", "xhr", "fetch")
+CHALLENGE_DOMAIN = "challenges.cloudflare.com"
+
+# Заблокированный запрос не отправляется, поэтому его размер неизвестен.
+# Экономия считается по среднему размеру ресурса каждого типа.
+ESTIMATED_SIZES = {
+    "image": 40 * 1024,
+    "media": 500 * 1024,
+    "font": 60 * 1024,
+    "stylesheet": 30 * 1024,
+    "script": 50 * 1024,
+    "xhr": 5 * 1024,
+    "fetch": 5 * 1024,
+    "document": 50 * 1024
+}
+DEFAULT_ESTIMATED_SIZE = 10 * 1024
+
+
+def allowed_domains(base_url: str, extra: Tuple[str, ...] = ()) -> Tuple[str, ...]:
+    # Домен сайта берется без www., чтобы пропускать и его поддомены (static., img. и т.п.)
+    host = (urlsplit(base_url).hostname or "").removeprefix("www.")
+    return tuple(dict.fromkeys(domain for domain in (host, CHALLENGE_DOMAIN, *extra) if domain))
+
+# Возвращает outerHTML корневых элементов в порядке документа, пропуская
+# вложенные друг в друга, или null, если на странице нет ни одного из них.
+FRAGMENTS_SCRIPT = """
+(roots) => {
+    const selector = roots.join(", ");
+    const fragments = [];
+    for (const element of document.querySelectorAll(selector)) {
+        const parent = element.parentElement;
+        if (!parent || !parent.closest(selector)) {
+            fragments.push(element.outerHTML);
+        }
+    }
+    return fragments.length ? "<html><body>" + fragments.join("") + "</body></html>" : null;
+}
+"""
+
+
+async def page_fragments(page: "Page", roots: Tuple[str, ...]) -> Optional[str]:
+    return await page.evaluate(FRAGMENTS_SCRIPT, list(roots))
+
+
+class PageSlot:
+    def __init__(self) -> None:
+        self.context: Optional["BrowserContext"] = None
+        self.page: Optional["Page"] = None
+        self.navigations = 0
+        self.blocked: Counter = Counter()
+        self.saved_bytes = 0
+
+
+class BrowserPool:
+    def __init__(self, size: int = 4, max_navigations: int = 50, headless: bool = True,
+                 block_resources: bool = True, allowed_resource_types: List[str] = ALLOWED_RESOURCE_TYPES,
+                 allowed_domains: Tuple[str, ...] = (CHALLENGE_DOMAIN,)) -> None:
+        self.size = size
+        self.max_navigations = max_navigations
+        self.headless = headless
+        self.block_resources = block_resources
+        self.allowed_resource_types = set(allowed_resource_types)
+        self.allowed_domains = tuple(allowed_domains)
+
+        self.blocked: Counter = Counter()
+        self.saved_bytes = 0
+
+        self._playwright: Optional["Playwright"] = None
+        self._browser: Optional["Browser"] = None
+        self._browser_lock = asyncio.Lock()
+        self._slots: List[PageSlot] = [PageSlot() for _ in range(size)]
+        self._idle: asyncio.Queue[PageSlot] = asyncio.Queue()
+        for slot in self._slots:
+            self._idle.put_nowait(slot)
+
+    async def start(self) -> None:
+        await self._ensure_browser()
+
+    async def close(self) -> None:
+        for slot in self._slots:
+            await self._close_slot(slot)
+
+        if self._browser is not None:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+        if self.blocked:
+            blocked: Dict[str, int] = dict(self.blocked.most_common())
+            logger.info(f"Заблокировано запросов браузера: {blocked}, сэкономлено ~{self.saved_bytes // 1024} КБ")
+        logger.debug("Браузер закрыт")
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator["Page"]:
+        slot = await self._idle.get()
+        healthy = False
+        try:
+            if slot.page is None:
+                await self._open_slot(slot)
+            yield slot.page
+            healthy = True
+        finally:
+            if slot.saved_bytes:
+                logger.debug(f"Заблокировано запросов на странице: {sum(slot.blocked.values())}, "
+                             f"сэкономлено ~{slot.saved_bytes // 1024} КБ")
+                self.blocked.update(slot.blocked)
+                self.saved_bytes += slot.saved_bytes
+                slot.blocked.clear()
+                slot.saved_bytes = 0
+
+            slot.navigations += 1
+            if not healthy or slot.navigations >= self.max_navigations:
+                await self._close_slot(slot)
+            self._idle.put_nowait(slot)
+
+    async def _ensure_browser(self) -> "Browser":
+        async with self._browser_lock:
+            if self._browser is None or not self._browser.is_connected():
+                if self._playwright is None:
+                    from playwright.async_api import async_playwright
+
+                    self._playwright = await async_playwright().start()
+                logger.debug("Запуск браузера")
+                with metrics.timer("browser_launch_seconds"):
+                    self._browser = await self._playwright.chromium.launch(headless=self.headless)
+            return self._browser
+
+    async def _open_slot(self, slot: PageSlot) -> None:
+        browser = await self._ensure_browser()
+        slot.context = await browser.new_context(user_agent=random_user_agent())
+        if self.block_resources:
+            await slot.context.route("**/*", lambda route: self._filter_request(route, slot))
+        slot.page = await slot.context.new_page()
+        slot.navigations = 0
+
+    def _is_allowed(self, resource_type: str, url: str) -> bool:
+        if resource_type not in self.allowed_resource_types:
+            return False
+        host = urlsplit(url).hostname or ""
+        return any(host == domain or host.endswith(f".{domain}") for domain in self.allowed_domains)
+
+    async def _filter_request(self, route: "Route", slot: PageSlot) -> None:
+        request = route.request
+        if self._is_allowed(request.resource_type, request.url):
+            await route.continue_()
+            return
+
+        slot.blocked[request.resource_type] += 1
+        metrics.inc("browser_blocked_total", type=request.resource_type)
+        slot.saved_bytes += ESTIMATED_SIZES.get(request.resource_type, DEFAULT_ESTIMATED_SIZE)
+        await route.abort("blockedbyclient")
+
+    async def _close_slot(self, slot: PageSlot) -> None:
+        if slot.context is not None:
+            try:
+                await slot.context.close()
+            except Exception as error:
+                logger.debug(f"Не удалось закрыть контекст браузера: {error}")
+        slot.context = None
+        slot.page = None
+        slot.navigations = 0
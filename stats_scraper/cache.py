@@ -0,0 +1,159 @@
+import asyncio
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+from stats_scraper.logger import logger
+from stats_scraper.fetcher import Route
+from stats_scraper.metrics import metrics
+from stats_scraper.paths import ensure_parent
+from stats_scraper.resilience import run_detached, within_budget
+from stats_scraper.utils import normalize_url
+
+
+class MemoryCache:
+    def __init__(self, max_items: int) -> None:
+        self.max_items = max_items
+        self._items: OrderedDict[str, Tuple[float, str]] = OrderedDict()
+
+    def get(self, key: str) -> Optional[str]:
+        item = self._items.get(key)
+        if item is None:
+            return None
+        expires_at, page_content = item
+        if expires_at < time.time():
+            del self._items[key]
+            return None
+        self._items.move_to_end(key)
+        return page_content
+
+    def set(self, key: str, page_content: str, expires_at: float) -> int:
+        self._items[key] = (expires_at, page_content)
+        self._items.move_to_end(key)
+        evicted = 0
+        while len(self._items) > self.max_items:
+            self._items.popitem(last=False)
+            evicted += 1
+        return evicted
+
+
+class DiskCache:
+    def __init__(self, path: Path, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(ensure_parent(path), timeout=30, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            "key TEXT PRIMARY KEY, expires_at REAL, accessed_at REAL, size INTEGER, content BLOB)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS pages_accessed ON pages (accessed_at)")
+        self._connection.commit()
+
+    def get(self, key: str) -> Optional[Tuple[float, str]]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT expires_at, content FROM pages WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            expires_at, content = row
+            if expires_at < time.time():
+                self._connection.execute("DELETE FROM pages WHERE key = ?", (key,))
+                self._connection.commit()
+                return None
+            self._connection.execute("UPDATE pages SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._connection.commit()
+        return expires_at, zlib.decompress(content).decode("utf-8")
+
+    def set(self, key: str, page_content: str, expires_at: float) -> int:
+        content = zlib.compress(page_content.encode("utf-8"))
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?)",
+                (key, expires_at, time.time(), len(content), content)
+            )
+            evicted = self._evict()
+            self._connection.commit()
+        return evicted
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def _evict(self) -> int:
+        self._connection.execute("DELETE FROM pages WHERE expires_at < ?", (time.time(),))
+        total, = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()
+        evicted = 0
+        for key, size in self._connection.execute("SELECT key, size FROM pages ORDER BY accessed_at").fetchall():
+            if total <= self.max_bytes:
+                break
+            self._connection.execute("DELETE FROM pages WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        return evicted
+
+
+class PageCache:
+    def __init__(self, path: Path, ttl: Dict[str, int], memory_items: int = 256, disk_size_mb: int = 512) -> None:
+        self.ttl = ttl
+        self.memory = MemoryCache(memory_items)
+        self.disk = DiskCache(path, disk_size_mb * 1024 * 1024)
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "shared": 0, "evictions": 0}
+
+        self._in_flight: Dict[str, asyncio.Task] = {}
+
+    async def get_or_fetch(self, url: str, route: Route, fetch: Callable[[str], Awaitable[str]]) -> str:
+        ttl = self.ttl.get(route.name, 0)
+        if ttl <= 0:
+            return await fetch(url)
+
+        key = normalize_url(url)
+
+        page_content = self.memory.get(key)
+        if page_content is not None:
+            self.stats["memory_hits"] += 1
+            metrics.inc("cache_requests_total", route=route.name, result="memory")
+            return page_content
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.stats["shared"] += 1
+            metrics.inc("cache_requests_total", route=route.name, result="shared")
+        else:
+            task = run_detached(self._load(key, url, route, ttl, fetch))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        return await within_budget(asyncio.shield(task))
+
+    def close(self) -> None:
+        logger.info(
+            "Кэш страниц: в памяти {memory_hits}, на диске {disk_hits}, промахов {misses}, "
+            "общих запросов {shared}, вытеснено {evictions}".format(**self.stats)
+        )
+        self.disk.close()
+
+    async def _load(self, key: str, url: str, route: Route, ttl: int,
+                    fetch: Callable[[str], Awaitable[str]]) -> str:
+        cached = await asyncio.to_thread(self.disk.get, key)
+        if cached is not None:
+            self.stats["disk_hits"] += 1
+            metrics.inc("cache_requests_total", route=route.name, result="disk")
+            expires_at, page_content = cached
+            self.stats["evictions"] += self.memory.set(key, page_content, expires_at)
+            return page_content
+
+        self.stats["misses"] += 1
+        metrics.inc("cache_requests_total", route=route.name, result="miss")
+        page_content = await fetch(url)
+        if not route.is_complete(page_content):
+            return page_content
+
+        expires_at = time.time() + ttl
+        self.stats["evictions"] += self.memory.set(key, page_content, expires_at)
+        self.stats["evictions"] += await asyncio.to_thread(self.disk.set, key, page_content, expires_at)
+        return page_content
@@ -0,0 +1,269 @@
+import asyncio
+import os
+import socket
+import sys
+from datetime import datetime
+
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from stats_scraper.logger import logger
+from stats_scraper.metrics import metrics
+from stats_scraper.paths import ROOT
+from stats_scraper.pipeline import (
+    match_id, match_section, missing_player, missing_team, priority, save_match, team_slug
+)
+from stats_scraper.resilience import KINDS, TIMEOUT, classify, describe, section_error, time_budget
+from stats_scraper.scraper import TEAM_PAGES, Scraper
+from stats_scraper.state import ANALYTICS, ERRORS, MATCH, PLAYERS, TEAMS
+from stats_scraper.storage import Storage
+from stats_scraper.workqueue import DONE, FAILED, WRITTEN, Unit, WorkQueue
+
+
+MATCH_LIST_UNIT = "match_list"
+MATCH_UNIT = "match"
+PLAYER_UNIT = "player"
+ANALYTICS_UNIT = "analytics"
+TEAM_PAGE_UNIT = "team_page"
+
+HANDLERS: Dict[str, Callable[[Scraper, Dict[str, Any]], Awaitable[Any]]] = {
+    MATCH_LIST_UNIT: lambda scraper, payload: scraper.get_upcoming_matches(),
+    MATCH_UNIT:      lambda scraper, payload: scraper.get_match_page(payload["url"]),
+    PLAYER_UNIT:     lambda scraper, payload: scraper.get_player_stats(payload),
+    ANALYTICS_UNIT:  lambda scraper, payload: scraper.fetch_match_analytics(payload["url"]),
+    TEAM_PAGE_UNIT:  lambda scraper, payload: scraper.fetch_team_page(
+        payload["team_id"], payload["team"], payload["suffix"], payload["page_type"]
+    )
+}
+
+
+def unit_priority(match: Dict[str, Any]) -> float:
+    start, stars = priority(match)
+    return min(start, 1e11) * 10 + stars
+
+
+def unit_error(unit: Unit, section: str, item: Any) -> Dict[str, Any]:
+    kind, _, message = (unit.error or "").partition(": ")
+    if kind not in KINDS:
+        kind, message = TIMEOUT, unit.error or ""
+    return section_error(section, item, kind, message)
+
+
+class Coordinator:
+    def __init__(self, queue: WorkQueue, storage: Storage, export: Tuple[str, ...] = (),
+                 poll_interval: float = 0.5) -> None:
+        self.queue = queue
+        self.storage = storage
+        self.export = export
+        self.poll_interval = poll_interval
+        self.groups: Dict[str, Dict[str, Any]] = {}
+
+    async def run(self, resume: bool = False) -> None:
+        if resume:
+            self.groups = await asyncio.to_thread(self.queue.open_groups)
+            logger.info(f"Продолжение распределенного запуска, незаписанных матчей: {len(self.groups)}")
+        else:
+            await asyncio.to_thread(self.queue.reset)
+            await asyncio.to_thread(self.queue.put, [Unit(MATCH_LIST_UNIT, "", {}, priority=-1)])
+        await asyncio.to_thread(self.queue.start)
+
+        while True:
+            finished = await asyncio.to_thread(self.queue.finished)
+            for unit in finished:
+                await self._handle(unit)
+            for group in {unit.group for unit in finished} & set(self.groups):
+                await self._complete(group)
+            await asyncio.to_thread(self.queue.mark_handled, [unit.key for unit in finished])
+
+            if finished:
+                continue
+            if not await asyncio.to_thread(self.queue.unfinished):
+                break
+            await asyncio.sleep(self.poll_interval)
+
+        await asyncio.to_thread(self.queue.stop)
+        logger.info("Распределенный запуск завершен")
+
+    async def _handle(self, unit: Unit) -> None:
+        if unit.status == FAILED:
+            logger.error(f"Задача {unit.key} не выполнена после {unit.attempts} попыток: {unit.error}")
+            return
+
+        if unit.kind == MATCH_LIST_UNIT:
+            await self._enqueue_matches(unit.result)
+        elif unit.kind == MATCH_UNIT:
+            await self._enqueue_sections(unit)
+
+    async def _enqueue_matches(self, matches: List[Dict[str, Any]]) -> None:
+        started = datetime.now().strftime("%d%m%y%H%M%S")
+        units = []
+        for match in sorted(matches, key=priority):
+            info = {"start": match["start"], "stars": match["stars"], "started": started}
+            self.groups[match["url"]] = info
+            await asyncio.to_thread(self.queue.open_group, match["url"], info)
+            units.append(Unit(MATCH_UNIT, match["url"], {"url": match["url"]}, unit_priority(match)))
+
+        await asyncio.to_thread(self.queue.put, units)
+        logger.info(f"В очередь добавлено матчей: {len(units)}")
+
+    async def _enqueue_sections(self, unit: Unit) -> None:
+        match_page = unit.result
+        lineups = match_page["data"]["lineups"]
+        payloads = [(PLAYER_UNIT, player) for lineup in lineups for player in lineup["players"]]
+        if match_page["analytics_url"] is not None:
+            payloads.append((ANALYTICS_UNIT, {"url": match_page["analytics_url"]}))
+        for team_index, lineup in enumerate(lineups):
+            if lineup["id"] is None:
+                continue
+            payloads += [(TEAM_PAGE_UNIT, {
+                "team_id": lineup["id"],
+                "team": team_slug(lineup["team"]),
+                "team_index": team_index,
+                "suffix": suffix,
+                "page_type": page_type
+            }) for suffix, page_type in TEAM_PAGES]
+
+        await asyncio.to_thread(self.queue.put, [
+            Unit(kind, unit.group, payload, unit.priority, position)
+            for position, (kind, payload) in enumerate(payloads, start=1)
+        ])
+
+    async def _complete(self, group: str) -> None:
+        units = await asyncio.to_thread(self.queue.group_units, group)
+        if any(unit.status not in (DONE, FAILED) for unit in units):
+            return
+
+        info = self.groups.pop(group)
+        match_page, *units = units
+        if match_page.status == FAILED:
+            logger.error(f"Матч {group} не сохранен, страница матча не загружена: {match_page.error}")
+            await asyncio.to_thread(self.queue.close_group, group, FAILED)
+            return
+
+        match_name = match_page.result["name"] + f"({info['started']}-{match_id(group)})"
+        errors = []
+        players = []
+        for unit in units:
+            if unit.kind != PLAYER_UNIT:
+                continue
+            if unit.status == DONE:
+                players.append(unit.result)
+            else:
+                errors.append(unit_error(unit, PLAYERS, unit.payload["nickname"]))
+                players.append(missing_player(unit.payload))
+        sections = {
+            MATCH: match_section(match_page.result, match_name, info["start"], info["stars"]),
+            PLAYERS: players
+        }
+        for unit in units:
+            if unit.kind != ANALYTICS_UNIT:
+                continue
+            if unit.status == DONE:
+                sections[ANALYTICS] = unit.result
+            else:
+                errors.append(unit_error(unit, ANALYTICS, unit.payload["url"]))
+
+        teams: Dict[int, Dict[str, Any]] = {}
+        for team_index, lineup in enumerate(match_page.result["data"]["lineups"]):
+            if lineup["id"] is None:
+                teams[team_index], error = missing_team(lineup)
+                errors.append(error)
+        for unit in units:
+            if unit.kind != TEAM_PAGE_UNIT:
+                continue
+            team_stats = teams.setdefault(unit.payload["team_index"], {"team": unit.payload["team"]})
+            if unit.status == DONE:
+                team_stats.update(unit.result)
+            else:
+                errors.append(unit_error(unit, TEAMS, f"{unit.payload['team']}/{unit.payload['page_type']}"))
+        sections[TEAMS] = [teams[index] for index in sorted(teams)]
+        if errors:
+            sections[ERRORS] = errors
+
+        try:
+            await asyncio.to_thread(save_match, self.storage, self.export, group, match_name, sections)
+        except Exception:
+            logger.exception(f"Не удалось сохранить данные матча: {match_name}")
+            await asyncio.to_thread(self.queue.close_group, group, FAILED)
+            return
+        await asyncio.to_thread(self.queue.close_group, group, WRITTEN)
+        if errors:
+            logger.warning(f"Матч собран из {len(units) + 1} задач, не выполнено {len(errors)}: {match_name}")
+        else:
+            logger.info(f"Матч собран из {len(units) + 1} задач: {match_name}")
+
+
+class Worker:
+    def __init__(self, scraper: Scraper, queue: WorkQueue, name: Optional[str] = None, concurrency: int = 4,
+                 lease: float = 120, retry_delay: float = 5, poll_interval: float = 0.5,
+                 idle_exit: float = 0, match_budget: float = 0) -> None:
+        self.scraper = scraper
+        self.queue = queue
+        self.name = name or f"{socket.gethostname()}-{os.getpid()}"
+        self.concurrency = concurrency
+        self.lease = lease
+        self.retry_delay = retry_delay
+        self.poll_interval = poll_interval
+        self.idle_exit = idle_exit
+        self.match_budget = match_budget
+
+    async def run(self) -> None:
+        logger.info(f"Исполнитель {self.name} запущен")
+        stale_stop = await asyncio.to_thread(self.queue.stopped)
+        await asyncio.gather(*(self._loop(stale_stop) for _ in range(self.concurrency)))
+        logger.info(f"Исполнитель {self.name} завершен")
+
+    async def _loop(self, stale_stop: bool) -> None:
+        loop = asyncio.get_running_loop()
+        idle_since = loop.time()
+        while True:
+            unit = await asyncio.to_thread(self.queue.claim, self.name, self.lease)
+            if unit is not None:
+                await self.process(unit)
+                idle_since = loop.time()
+                continue
+
+            stopped = await asyncio.to_thread(self.queue.stopped)
+            stale_stop = stale_stop and stopped
+            if stopped and not stale_stop:
+                return
+            if self.idle_exit and loop.time() - idle_since >= self.idle_exit:
+                return
+            await asyncio.sleep(self.poll_interval)
+
+    async def process(self, unit: Unit) -> None:
+        heartbeat = asyncio.create_task(self._heartbeat(unit))
+        try:
+            with metrics.timer("work_unit_seconds", kind=unit.kind), time_budget(self.match_budget):
+                result = await HANDLERS[unit.kind](self.scraper, unit.payload)
+        except Exception as error:
+            retried = await asyncio.to_thread(
+                self.queue.fail, unit.key, f"{classify(error)}: {describe(error)}", self.retry_delay
+            )
+            metrics.inc("work_units_total", kind=unit.kind, result="retry" if retried else "failed")
+            logger.warning(f"Задача {unit.key} завершилась ошибкой (попытка {unit.attempts}): {describe(error)}")
+        else:
+            await asyncio.to_thread(self.queue.complete, unit.key, result)
+            metrics.inc("work_units_total", kind=unit.kind, result="done")
+        finally:
+            heartbeat.cancel()
+
+    async def _heartbeat(self, unit: Unit) -> None:
+        while True:
+            await asyncio.sleep(self.lease / 3)
+            if not await asyncio.to_thread(self.queue.extend, unit.key, self.name, self.lease):
+                logger.warning(f"Аренда задачи {unit.key} потеряна")
+                return
+
+
+async def spawn_workers(count: int) -> List[asyncio.subprocess.Process]:
+    start_script = str(ROOT.parent / "start.py")
+    return [await asyncio.create_subprocess_exec(sys.executable, start_script, "--worker") for _ in range(count)]
+
+
+async def wait_workers(processes: List[asyncio.subprocess.Process], timeout: float) -> None:
+    for process in processes:
+        try:
+            await asyncio.wait_for(process.wait(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Исполнитель {process.pid} не завершился, процесс остановлен")
+            process.terminate()
+            await process.wait()
@@ -0,0 +1,57 @@
+from datetime import datetime
+
+from typing import Any, Dict, Iterable, Optional
+from stats_scraper.state import ANALYTICS, ERRORS, MATCH, PLAYERS, TEAMS
+from stats_scraper.storage import Storage
+from stats_scraper.utils import save_data, save_data_to_txt
+
+
+JSON = "json"
+TXT = "txt"
+
+
+def capture_time(match: Dict[str, Any]) -> Dict[str, Any]:
+    if match.get("start") is None:
+        return {}
+    return {
+        "start_time": datetime.fromtimestamp(match["start"]).strftime("%Y-%m-%d %H:%M"),
+        "captured_before_start": match["captured_before_start"]
+    }
+
+
+def build_report(match_name: str, sections: Dict[str, Any]) -> Dict[str, Any]:
+    match = sections[MATCH]
+    json_data = {
+        "match_name": f"{match_name}. {match['type']}",
+        "match_pre_data": match["data"],
+        "match_player_stats": sections.get(PLAYERS, [])
+    }
+    if ANALYTICS in sections:
+        json_data["match_analytics"] = sections[ANALYTICS]
+    json_data["match_teams"] = sections.get(TEAMS, [])
+    if ERRORS in sections:
+        json_data["errors"] = sections[ERRORS]
+    json_data.update(capture_time(match))
+    return json_data
+
+
+def export_match(storage: Storage, match_id: int, match_name: str, formats: Iterable[str],
+                 changed: Optional[Iterable[str]] = None) -> None:
+    sections = storage.load(match_id)
+    changed = set(sections if changed is None else changed)
+
+    if JSON in formats:
+        if MATCH in changed:
+            save_data(match_name, "pre-match-data", {**sections[MATCH]["data"], **capture_time(sections[MATCH])})
+        if PLAYERS in changed and PLAYERS in sections:
+            save_data(match_name, "player-stats", sections[PLAYERS])
+        if ANALYTICS in changed and ANALYTICS in sections:
+            save_data(match_name, "match-analytics", sections[ANALYTICS])
+        if TEAMS in changed and TEAMS in sections:
+            for team_stats in sections[TEAMS]:
+                save_data(match_name, f"team-{team_stats['team']}", team_stats)
+        if ERRORS in changed and ERRORS in sections:
+            save_data(match_name, "errors", sections[ERRORS])
+
+    if TXT in formats:
+        save_data_to_txt(build_report(match_name, sections), match_name)
@@ -0,0 +1,142 @@
+import re
+import soupsieve as sv
+from bs4 import Tag
+
+from typing import Any, Callable, Dict, List, Optional, Union
+
+
+COMPOUND = re.compile(r"(?P<name>[a-z][a-z0-9]*)?(?P<parts>(?:\.[\w-]+|\[[\w-]+\]|:nth-child\(\d+\)|:not\(\.[\w-]+\))*)")
+PART = re.compile(r"\.(?P<cls>[\w-]+)|\[(?P<attr>[\w-]+)\]|:nth-child\((?P<nth>\d+)\)|:not\(\.(?P<not_cls>[\w-]+)\)")
+
+
+def _position(element: Tag) -> int:
+    position = 1
+    for sibling in element.previous_siblings:
+        if isinstance(sibling, Tag):
+            position += 1
+    return position
+
+
+def _compile_compound(text: str) -> Optional[Callable[[Tag], bool]]:
+    match = COMPOUND.fullmatch(text)
+    if not text or match is None:
+        return None
+
+    name = match["name"]
+    classes: List[str] = []
+    attrs: List[str] = []
+    excluded: List[str] = []
+    nth: Optional[int] = None
+    for part in PART.finditer(match["parts"]):
+        if part["cls"]:
+            classes.append(part["cls"])
+        elif part["attr"]:
+            attrs.append(part["attr"])
+        elif part["nth"]:
+            nth = int(part["nth"])
+        else:
+            excluded.append(part["not_cls"])
+
+    def matches(element: Tag) -> bool:
+        if name is not None and element.name != name:
+            return False
+        if classes or excluded:
+            element_classes = element.get("class") or ()
+            if any(cls not in element_classes for cls in classes):
+                return False
+            if any(cls in element_classes for cls in excluded):
+                return False
+        if attrs and not all(element.has_attr(attr) for attr in attrs):
+            return False
+        return nth is None or _position(element) == nth
+
+    return matches
+
+
+def compile_selector(selector: str) -> Callable[[Tag], bool]:
+    compounds = [_compile_compound(part) for part in selector.split(" > ")]
+    if any(compound is None for compound in compounds):
+        return sv.compile(selector).match
+
+    *ancestors, target = compounds
+    ancestors.reverse()
+
+    def matches(element: Tag) -> bool:
+        if not target(element):
+            return False
+        for compound in ancestors:
+            element = element.parent
+            if element is None or element.parent is None or not compound(element):
+                return False
+        return True
+
+    return matches
+
+
+class Field:
+    def __init__(self, selector: Optional[str] = None, attr: Optional[str] = None,
+                 transform: Optional[Callable[[str], Any]] = None) -> None:
+        self.selector = selector
+        self.matches = compile_selector(selector) if selector else None
+        self.attr = attr
+        self.transform = transform
+
+    def value(self, node: Tag) -> Any:
+        value = node.getText(strip=True) if self.attr is None else node.get(self.attr)
+        if value is not None and self.transform is not None:
+            value = self.transform(value)
+        return value
+
+
+class Schema:
+    def __init__(self, rows: Optional[str], fields: Union[Dict[str, Any], Field, str]) -> None:
+        self.rows = sv.compile(rows) if rows else None
+        self.scalar = not isinstance(fields, dict)
+
+        fields = {None: fields} if self.scalar else fields
+        self.fields = {name: Field(field) if isinstance(field, str) else field for name, field in fields.items()}
+
+        self._selected = [
+            (name, field) for name, field in self.fields.items()
+            if isinstance(field, Field) and field.matches is not None
+        ]
+        self._own = [
+            (name, field) for name, field in self.fields.items()
+            if isinstance(field, Field) and field.matches is None
+        ]
+        self._nested = [(name, field) for name, field in self.fields.items() if isinstance(field, Schema)]
+
+    def extract(self, node: Tag) -> Any:
+        result = dict.fromkeys(self.fields)
+
+        pending = self._selected
+        if pending:
+            for tag in node.descendants:
+                if not isinstance(tag, Tag):
+                    continue
+                matched = [item for item in pending if item[1].matches(tag)]
+                if not matched:
+                    continue
+                for name, field in matched:
+                    result[name] = field.value(tag)
+                pending = [item for item in pending if item not in matched]
+                if not pending:
+                    break
+
+        for name, field in self._own:
+            result[name] = field.value(node)
+        for name, schema in self._nested:
+            result[name] = schema.collect(node)
+
+        return result[None] if self.scalar else result
+
+    def collect(self, root: Tag) -> Any:
+        return [self.extract(row) for row in self.rows.select(root)]
+
+
+class Pairs(Schema):
+    def __init__(self, rows: str, key: Union[Field, str], value: Union[Field, str]) -> None:
+        super().__init__(rows, {"key": key, "value": value})
+
+    def collect(self, root: Tag) -> Dict[Any, Any]:
+        return {row["key"]: row["value"] for row in super().collect(root)}
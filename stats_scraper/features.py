@@ -0,0 +1,198 @@
+import json
+import numpy as np
+
+from typing import Any, Dict, List, Optional, Tuple, Type
+from stats_scraper.models import SCORE, Flash, OpeningKill, Record, parse_number
+from stats_scraper.storage import Storage
+
+
+SECONDS_PER_DAY = 86400
+DAY_SPAN = 1 << 20
+WINDOW_DAYS = 90
+
+TEAM_FEATURES = (
+    "maps_played", "win_rate", "round_diff",
+    "rating_mean", "rating_spread", "rating_min", "rating_max",
+    "opening_success", "opening_rating", "flash_success", "h2h_wins"
+)
+
+
+def _float(value: Any) -> float:
+    return float(value) if isinstance(value, (int, float)) else np.nan
+
+
+def _rounds(result: Any) -> Tuple[float, float]:
+    return result if isinstance(result, tuple) else (np.nan, np.nan)
+
+
+def _rating(short_stats: Dict[str, Any]) -> float:
+    for key, text in short_stats.items():
+        if key.startswith("Rating"):
+            return _float(parse_number(text))
+    return np.nan
+
+
+def _head_to_head(data: Optional[str], teams: Tuple[str, str]) -> List[float]:
+    stats = json.loads(data) if data else {}
+    return [_float(parse_number(stats.get(team))) for team in teams]
+
+
+def _window_sums(keys: np.ndarray, days: np.ndarray, columns: List[np.ndarray],
+                 query_keys: np.ndarray, query_days: np.ndarray, window: int) -> List[np.ndarray]:
+    order = np.lexsort((days, keys))
+    composite = keys[order] * DAY_SPAN + days[order]
+    upper = np.searchsorted(composite, query_keys * DAY_SPAN + query_days, "left")
+    lower = np.searchsorted(composite, query_keys * DAY_SPAN + query_days - window, "left")
+    sums = []
+    for column in columns:
+        cumulative = np.concatenate(([0], np.cumsum(column[order])))
+        sums.append(cumulative[upper] - cumulative[lower])
+    return sums
+
+
+def _divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denominator > 0, numerator / denominator, np.nan)
+
+
+class Tables:
+    def __init__(self, storage: Storage) -> None:
+        matches = storage.match_teams()
+        self.match_id = np.array([row[0] for row in matches], dtype=np.int64)
+        self.team_id = np.array([[row[2], row[4]] for row in matches], dtype=np.int64).reshape(-1, 2)
+        self.h2h_wins = np.array([
+            _head_to_head(row[6], (row[3], row[5])) for row in matches
+        ], dtype=np.float64).reshape(-1, 2)
+
+        history = storage.map_history()
+        self.maps, map_code = np.unique(np.array([row[2] for row in history], dtype=str), return_inverse=True)
+        self.history_team = np.array([row[0] for row in history], dtype=np.int64)
+        self.history_map = map_code.astype(np.int64)
+        self.history_day = np.array([row[1] for row in history], dtype="datetime64[D]").astype(np.int64)
+        self.history_won = np.array([row[4] == "W" for row in history], dtype=np.int64)
+        rounds = np.array([_rounds(SCORE.parse(row[3])) for row in history], dtype=np.float64).reshape(-1, 2)
+        self.history_round_diff = rounds[:, 0] - rounds[:, 1]
+
+        last_day = int(self.history_day.max()) + 1 if len(history) else 0
+        self.match_day = np.array([
+            last_day if row[1] is None else row[1] // SECONDS_PER_DAY for row in matches
+        ], dtype=np.int64)
+
+        players = storage.player_stats()
+        self.player_group = self._groups([row[0] for row in players], [row[1] for row in players])
+        self.player_rating = np.array([_rating(json.loads(row[2])) for row in players], dtype=np.float64)
+
+        self.opening_group, (self.opening_maps, self.opening_success, self.opening_rating) = \
+            self._team_rows(storage, "opening_kills", OpeningKill, ("maps", "success", "rating"))
+        self.flash_group, (self.flash_maps, self.flash_success) = \
+            self._team_rows(storage, "flashes", Flash, ("maps", "success"))
+
+    def _groups(self, match_ids: List[int], team_ids: List[int]) -> np.ndarray:
+        match_ids = np.array(match_ids, dtype=np.int64)
+        team_ids = np.array(team_ids, dtype=np.int64)
+        if not len(self.match_id):
+            return np.full(len(match_ids), -1, dtype=np.int64)
+
+        row = np.clip(np.searchsorted(self.match_id, match_ids), 0, len(self.match_id) - 1)
+        side = np.where(team_ids == self.team_id[row, 0], 0, np.where(team_ids == self.team_id[row, 1], 1, -1))
+        return np.where((self.match_id[row] == match_ids) & (side >= 0), row * 2 + side, -1)
+
+    def _team_rows(self, storage: Storage, section: str, record: Type[Record],
+                   fields: Tuple[str, ...]) -> Tuple[np.ndarray, List[np.ndarray]]:
+        columns = [(key, codec) for name in fields for field, key, codec in record.FIELDS if field == name]
+        match_ids, team_ids, values = [], [], []
+        for match_id, team_id, data in storage.team_sections(section):
+            for item in json.loads(data) if data else ():
+                match_ids.append(match_id)
+                team_ids.append(team_id)
+                values.append([_float(codec.parse(item.get(key))) for key, codec in columns])
+        values = np.array(values, dtype=np.float64).reshape(-1, len(fields))
+        return self._groups(match_ids, team_ids), list(values.T)
+
+
+def _grouped_mean(groups: np.ndarray, values: np.ndarray, weights: np.ndarray, size: int) -> np.ndarray:
+    valid = (groups >= 0) & ~np.isnan(values) & ~np.isnan(weights)
+    total = np.bincount(groups[valid], weights[valid] * values[valid], size)
+    weight = np.bincount(groups[valid], weights[valid], size)
+    return _divide(total, weight)
+
+
+def _grouped_spread(groups: np.ndarray, values: np.ndarray, size: int) -> Tuple[np.ndarray, ...]:
+    valid = (groups >= 0) & ~np.isnan(values)
+    groups, values = groups[valid], values[valid]
+    count = np.bincount(groups, minlength=size)
+    mean = _divide(np.bincount(groups, values, size), count)
+    deviation = values - mean[groups]
+    spread = np.sqrt(_divide(np.bincount(groups, deviation * deviation, size), count))
+    low, high = np.full(size, np.inf), np.full(size, -np.inf)
+    np.minimum.at(low, groups, values)
+    np.maximum.at(high, groups, values)
+    empty = count == 0
+    low[empty], high[empty] = np.nan, np.nan
+    return mean, spread, low, high
+
+
+def team_features(tables: Tables, window_days: int = WINDOW_DAYS) -> Dict[str, np.ndarray]:
+    size = len(tables.match_id) * 2
+    query_team = tables.team_id.reshape(-1)
+    query_day = np.repeat(tables.match_day, 2)
+    base = (query_day - window_days - 1).astype(np.float64)
+
+    day = tables.history_day.astype(np.float64)
+    won = tables.history_won.astype(np.float64)
+    round_diff = np.nan_to_num(tables.history_round_diff)
+    has_rounds = (~np.isnan(tables.history_round_diff)).astype(np.float64)
+
+    count, weight_day, wins, wins_day, diffs, diffs_day, rounds_count, rounds_day = _window_sums(
+        tables.history_team, tables.history_day,
+        [np.ones_like(day), day, won, won * day, round_diff, round_diff * day, has_rounds, has_rounds * day],
+        query_team, query_day, window_days
+    )
+    weight = weight_day - base * count
+
+    features = {
+        "maps_played": count.astype(np.float64),
+        "win_rate": _divide(wins_day - base * wins, weight),
+        "round_diff": _divide(diffs_day - base * diffs, rounds_day - base * rounds_count)
+    }
+
+    maps = len(tables.maps)
+    map_keys = tables.history_team * max(maps, 1) + tables.history_map
+    map_query = (query_team[:, None] * max(maps, 1) + np.arange(maps)[None, :]).reshape(-1)
+    map_day = np.repeat(query_day, maps)
+    map_count, map_weight_day, map_wins, map_wins_day = _window_sums(
+        map_keys, tables.history_day, [np.ones_like(day), day, won, won * day], map_query, map_day, window_days
+    )
+    map_base = np.repeat(base, maps)
+    features["map_win_rate"] = _divide(
+        map_wins_day - map_base * map_wins, map_weight_day - map_base * map_count
+    ).reshape(size, maps)
+
+    (features["rating_mean"], features["rating_spread"],
+     features["rating_min"], features["rating_max"]) = _grouped_spread(tables.player_group, tables.player_rating, size)
+    features["opening_success"] = _grouped_mean(tables.opening_group, tables.opening_success, tables.opening_maps, size)
+    features["opening_rating"] = _grouped_mean(tables.opening_group, tables.opening_rating, tables.opening_maps, size)
+    features["flash_success"] = _grouped_mean(tables.flash_group, tables.flash_success, tables.flash_maps, size)
+    features["h2h_wins"] = tables.h2h_wins.reshape(-1)
+    return features
+
+
+def match_features(tables: Tables, window_days: int = WINDOW_DAYS) -> Dict[str, np.ndarray]:
+    features = team_features(tables, window_days)
+    result = {
+        "match_id": tables.match_id,
+        "team1_id": tables.team_id[:, 0],
+        "team2_id": tables.team_id[:, 1],
+        "maps": tables.maps
+    }
+    for name in (*TEAM_FEATURES, "map_win_rate"):
+        value = features[name]
+        team1, team2 = value[0::2], value[1::2]
+        result[f"team1_{name}"] = team1
+        result[f"team2_{name}"] = team2
+        result[f"delta_{name}"] = team1 - team2
+    return result
+
+
+def compute_features(storage: Storage, window_days: int = WINDOW_DAYS) -> Dict[str, np.ndarray]:
+    return match_features(Tables(storage), window_days)
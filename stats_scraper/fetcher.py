@@ -0,0 +1,245 @@
+import re
+import time
+import asyncio
+
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+from stats_scraper.logger import logger
+from stats_scraper.archive import PageArchive
+from stats_scraper.browser import BrowserPool, page_fragments
+from stats_scraper.metrics import metrics
+from stats_scraper.ratelimit import RequestScheduler
+from stats_scraper.resilience import (
+    BudgetExceeded, ChallengeError, CircuitBreaker, FetchError, RetryPolicy, classify, describe, remaining,
+    within_budget
+)
+from stats_scraper.useragent import random_user_agent
+
+if TYPE_CHECKING:
+    from aiohttp import ClientSession
+
+
+HTTP = "http"
+BROWSER = "browser"
+
+CHALLENGE_STATUSES = (403,)
+THROTTLE_STATUSES = (429, 503)
+CHALLENGE_MARKERS = ("cf-challenge", "cf_chl_opt", "<title>Just a moment...</title>")
+
+
+class Route:
+    def __init__(self, name: str, pattern: str, required: Tuple[str, ...] = (), strategy: str = HTTP,
+                 roots: Tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.pattern = re.compile(pattern)
+        self.required = [re.compile(rf'class="[^"]*\b{re.escape(cls)}\b') for cls in required]
+        self.strategy = strategy
+        self.roots = roots
+
+    def matches(self, url: str) -> bool:
+        return self.pattern.search(url) is not None
+
+    def is_complete(self, page_content: str) -> bool:
+        return all(marker.search(page_content) for marker in self.required)
+
+
+ROUTES = [
+    Route("player_stats",         r"/stats/players/\d+/",              ("summaryNickname",),
+          roots=(".playerSummaryStatBox", ".statistics")),
+    Route("team_matches",         r"/stats/teams/matches/\d+/",        ("stats-table",), roots=(".stats-table",)),
+    Route("team_maps",            r"/stats/teams/maps/\d+/",           ("two-grid",), roots=(".two-grid",)),
+    Route("team_flashes",         r"/stats/teams/players/flashes/\d+/", ("stats-table",), roots=(".stats-table",)),
+    Route("team_opening_kills",   r"/stats/teams/players/openingkills/\d+/", ("stats-table",),
+          roots=(".stats-table",)),
+    Route("team_players",         r"/stats/teams/players/\d+/",        ("stats-table",), roots=(".stats-table",)),
+    Route("team_overview",        r"/stats/teams/+\d+/",               ("standard-box",), roots=(".col.standard-box",)),
+    Route("match_analytics",      r"/betting/analytics/",              ("analytics-insights-wrapper",), BROWSER,
+          roots=(".analytics-insights-wrapper", ".analytics-head-to-head", ".analytics-handicap-wrapper",
+                 ".analytics-handicap-map-wrapper", "table.gtSmartphone-only")),
+    Route("match_list",           r"/matches/?$",                      ("upcomingMatchesSection",), BROWSER,
+          roots=(".upcomingMatchesSection",)),
+    Route("results",              r"/results",                         ("results-holder",), BROWSER,
+          roots=(".results-all", ".pagination-data")),
+    Route("match",                r"/matches/\d+/",                    ("lineup",), BROWSER,
+          roots=(".timeAndEvent", ".preformatted-text", ".matchpage-analytics-center-container", ".lineups",
+                 ".map-stats-infobox", ".past-matches", ".head-to-head", ".head-to-head-listing")),
+]
+DEFAULT_ROUTE = Route("default", r"", strategy=BROWSER)
+
+
+def is_challenge(status: int, page_content: str, route: Optional[Route] = None) -> bool:
+    if status in CHALLENGE_STATUSES:
+        return True
+    if not any(marker in page_content for marker in CHALLENGE_MARKERS):
+        return False
+    return route is None or not route.required or not route.is_complete(page_content)
+
+
+def is_throttled(status: int, page_content: str, route: Optional[Route] = None) -> bool:
+    return status in THROTTLE_STATUSES or is_challenge(status, page_content, route)
+
+
+def find_route(url: str) -> Route:
+    for route in ROUTES:
+        if route.matches(url):
+            return route
+    return DEFAULT_ROUTE
+
+
+class Fetcher:
+    def __init__(self, browser: BrowserPool, scheduler: RequestScheduler, connection_limit: int = 10,
+                 keepalive_timeout: int = 30, timeout: int = 30, strategies: Optional[Dict[str, str]] = None,
+                 archive: Optional[PageArchive] = None, fragments: bool = False,
+                 retry: Optional[RetryPolicy] = None, breaker_threshold: int = 5,
+                 breaker_cooldown: float = 60.0, navigation_timeout: float = 60.0,
+                 demote_after: int = 3, demote_cooldown: float = 300.0) -> None:
+        self.browser = browser
+        self.scheduler = scheduler
+        self.archive = archive
+        self.fragments = fragments
+        self.connection_limit = connection_limit
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = timeout
+        self.retry = retry or RetryPolicy()
+        self.navigation_timeout = navigation_timeout
+        self.demote_after = demote_after
+        self.demote_cooldown = demote_cooldown
+
+        self.session: Optional["ClientSession"] = None
+        self.strategies: Dict[str, str] = {route.name: route.strategy for route in ROUTES + [DEFAULT_ROUTE]}
+        self.strategies.update(strategies or {})
+        self.http_misses: Dict[str, int] = {}
+        self.demoted_until: Dict[str, float] = {}
+        self.breakers: Dict[str, CircuitBreaker] = {
+            route.name: CircuitBreaker(route.name, breaker_threshold, breaker_cooldown)
+            for route in ROUTES + [DEFAULT_ROUTE]
+        }
+
+    async def start(self) -> None:
+        from aiohttp import ClientSession, ClientTimeout, TCPConnector
+
+        connector = TCPConnector(limit=self.connection_limit, keepalive_timeout=self.keepalive_timeout)
+        self.session = ClientSession(
+            connector=connector,
+            timeout=ClientTimeout(total=self.timeout),
+            headers={
+                "User-Agent": random_user_agent(),
+                "Accept": "text/html,application/xhtml+xml",
+                "Accept-Encoding": "gzip, deflate, br"
+            }
+        )
+
+    async def close(self) -> None:
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def fetch(self, url: str) -> str:
+        route = find_route(url)
+        breaker = self.breakers[route.name]
+        attempt = 0
+        while True:
+            await breaker.wait()
+            try:
+                page_content = await within_budget(self._fetch(url, route))
+            except Exception as error:
+                kind = classify(error)
+                if not isinstance(error, BudgetExceeded):
+                    breaker.failure()
+                metrics.inc("fetch_errors_total", route=route.name, kind=kind)
+                delay = self.retry.delay(attempt)
+                if not self.retry.should_retry(kind, attempt, delay):
+                    raise
+                logger.debug(f"Ошибка {kind} ({describe(error)}), повтор через {delay:.1f} сек: {url}")
+                await asyncio.sleep(delay)
+                attempt += 1
+            else:
+                breaker.success()
+                return page_content
+
+    async def _fetch(self, url: str, route: Route) -> str:
+        if self._use_http(route):
+            with metrics.timer("fetch_seconds", route=route.name, strategy=HTTP):
+                page_content = await self._fetch_http(url, route)
+            if page_content is not None:
+                await self._store(url, page_content, 200)
+                return page_content
+            metrics.inc("fetch_retries_total", route=route.name)
+
+        with metrics.timer("fetch_seconds", route=route.name, strategy=BROWSER):
+            page_content, status = await self._fetch_browser(url, route)
+        await self._store(url, page_content, status)
+        return page_content
+
+    def _use_http(self, route: Route) -> bool:
+        return self.strategies[route.name] == HTTP and self.demoted_until.get(route.name, 0) <= time.monotonic()
+
+    def _http_hit(self, route: Route) -> None:
+        self.http_misses[route.name] = 0
+        if self.demoted_until.pop(route.name, None) is not None:
+            logger.debug(f"Маршрут {route.name} снова загружается по HTTP")
+
+    def _http_miss(self, route: Route) -> None:
+        misses = self.http_misses.get(route.name, 0) + 1
+        self.http_misses[route.name] = misses
+        if misses >= self.demote_after:
+            self.demoted_until[route.name] = time.monotonic() + self.demote_cooldown
+            metrics.inc("http_demotions_total", route=route.name)
+            logger.debug(f"Маршрут {route.name} переведен на браузер на {self.demote_cooldown:.0f} сек")
+
+    async def _store(self, url: str, page_content: str, status: int) -> None:
+        if self.archive is not None:
+            await asyncio.to_thread(self.archive.store, url, page_content, status)
+
+    async def _fetch_http(self, url: str, route: Route) -> Optional[str]:
+        from aiohttp import ClientError
+
+        async with self.scheduler.slot(url) as slot:
+            try:
+                async with self.session.get(url) as response:
+                    page_content = await response.text()
+                    status = response.status
+            except (ClientError, asyncio.TimeoutError):
+                slot.throttle()
+                raise
+
+            if is_throttled(status, page_content, route):
+                slot.throttle()
+            else:
+                slot.success()
+
+        if is_challenge(status, page_content, route):
+            logger.debug(f"HTTP запрос получил проверку ({status}), переход на браузер: {url}")
+            self._http_miss(route)
+            return None
+        if status in THROTTLE_STATUSES or status >= 500:
+            raise FetchError(f"Сайт ответил {status}")
+        if status != 200 or not route.is_complete(page_content):
+            logger.debug(f"HTTP ответ неполный ({status}), переход на браузер: {url}")
+            self._http_miss(route)
+            return None
+        self._http_hit(route)
+        return page_content
+
+    async def _fetch_browser(self, url: str, route: Route) -> Tuple[str, int]:
+        async with self.scheduler.slot(url) as slot, self.browser.page() as page:
+            left = remaining()
+            timeout = self.navigation_timeout if left is None else min(self.navigation_timeout, left)
+            response = await page.goto(url, wait_until="domcontentloaded", timeout=timeout * 1000)
+            page_content = None
+            if self.fragments and route.roots:
+                page_content = await page_fragments(page, route.roots)
+                metrics.inc("browser_fragments_total", route=route.name, result="hit" if page_content else "miss")
+            if page_content is None:
+                page_content = await page.content()
+            status = response.status if response else 200
+
+            if is_throttled(status, page_content, route):
+                slot.throttle()
+            else:
+                slot.success()
+
+        if is_challenge(status, page_content, route):
+            raise ChallengeError(f"Проверка Cloudflare ({status})")
+        if status in THROTTLE_STATUSES or status >= 500:
+            raise FetchError(f"Сайт ответил {status}")
+        return page_content, status
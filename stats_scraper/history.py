@@ -0,0 +1,149 @@
+import json
+import sqlite3
+import threading
+import time
+
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from stats_scraper.models import SCORE
+from stats_scraper.paths import ensure_parent
+from stats_scraper.storage import MAP_STATS_SCHEMA, add_map_stats
+
+
+MATCHES_PAGE = "team_matches"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS team_syncs (
+    team_id   INTEGER PRIMARY KEY,
+    synced_on TEXT NOT NULL,
+    synced_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS team_pages (
+    team_id    INTEGER NOT NULL,
+    page_type  TEXT NOT NULL,
+    data       TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (team_id, page_type)
+);
+"""
+
+
+def _totals(rows: Iterable[Dict[str, Any]]) -> Tuple[int, int, int, int, int]:
+    maps = wins = losses = rounds = 0
+    for row in rows:
+        maps += 1
+        wins += row["W/L"] == "W"
+        losses += row["W/L"] == "L"
+        score = SCORE.parse(row["result"])
+        if isinstance(score, tuple):
+            rounds += sum(score)
+    return maps, wins, maps - wins - losses, losses, rounds
+
+
+def derive_overview(page: Dict[str, Any], rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    maps, wins, draws, losses, rounds = _totals(rows)
+    return {"summary": {
+        **page.get("summary", {}),
+        "Maps played": str(maps),
+        "Wins / draws / losses": f"{wins} / {draws} / {losses}",
+        "Rounds played": str(rounds)
+    }}
+
+
+def derive_maps(page: Dict[str, Any], rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    by_map: Dict[str, List[Dict[str, Any]]] = {}
+    for row in rows:
+        by_map.setdefault(row["map"], []).append(row)
+
+    stored = {item["map"]: item["stats"] for item in page.get("maps", [])}
+    names = [name for name in stored if name in by_map] + [name for name in by_map if name not in stored]
+    result = []
+    for name in names:
+        maps, wins, draws, losses, rounds = _totals(by_map[name])
+        result.append({"map": name, "stats": {
+            **stored.get(name, {}),
+            "Wins / draws / losses": f"{wins} / {draws} / {losses}",
+            "Win rate": f"{wins / maps * 100:.1f}%",
+            "Total rounds": str(rounds)
+        }})
+    return {"maps": result}
+
+
+DERIVE = {
+    "team_overview": derive_overview,
+    "team_maps": derive_maps
+}
+
+
+class TeamHistory:
+    def __init__(self, path: Path, database: Path, ttl: Dict[str, int]) -> None:
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(ensure_parent(path), timeout=30, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        # Сами матчи хранятся в таблице map_stats основной базы, здесь - только
+        # даты синхронизации и последние загруженные страницы
+        self._connection.execute("ATTACH DATABASE ? AS storage", (str(ensure_parent(database)),))
+        self._connection.execute("PRAGMA storage.journal_mode=WAL")
+        self._connection.executescript(SCHEMA + MAP_STATS_SCHEMA.format(schema="storage"))
+        self._move_team_matches()
+        self._connection.commit()
+
+    def _move_team_matches(self) -> None:
+        # Раньше матчи хранились в отдельной таблице team_matches этой базы
+        if self._connection.execute("SELECT 1 FROM main.sqlite_master WHERE name = 'team_matches'").fetchone():
+            self._connection.execute(
+                "INSERT OR IGNORE INTO storage.map_stats "
+                "SELECT team_id, played_on, date, map, opponent, event, result, outcome FROM main.team_matches"
+            )
+            self._connection.execute("DROP TABLE main.team_matches")
+
+    def sync_from(self, team_id: int, start: str) -> Optional[str]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT synced_on, synced_at FROM team_syncs WHERE team_id = ?", (team_id,)
+            ).fetchone()
+        if row is None:
+            return start
+        synced_on, synced_at = row
+        if time.time() - synced_at < self.ttl.get(MATCHES_PAGE, 0):
+            return None
+        return max(synced_on, start)
+
+    def add_matches(self, team_id: int, rows: List[Dict[str, Any]], synced_on: str) -> int:
+        with self._lock, self._connection:
+            added = add_map_stats(self._connection, ((team_id, row) for row in rows), "storage")
+            self._connection.execute(
+                "INSERT OR REPLACE INTO team_syncs VALUES (?, ?, ?)", (team_id, synced_on, time.time())
+            )
+        return added
+
+    def matches(self, team_id: int, start: str, end: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT date, event, opponent, map, result, outcome FROM storage.map_stats "
+                "WHERE team_id = ? AND played_on BETWEEN ? AND ? ORDER BY played_on DESC, rowid",
+                (team_id, start, end)
+            ).fetchall()
+        return [dict(zip(("date", "event", "opponent", "map", "result", "W/L"), row)) for row in rows]
+
+    def page(self, team_id: int, page_type: str) -> Optional[Any]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT data, fetched_at FROM team_pages WHERE team_id = ? AND page_type = ?", (team_id, page_type)
+            ).fetchone()
+        if row is None or time.time() - row[1] >= self.ttl.get(page_type, 0):
+            return None
+        return json.loads(row[0])
+
+    def store_page(self, team_id: int, page_type: str, data: Any) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO team_pages VALUES (?, ?, ?, ?)",
+                (team_id, page_type, json.dumps(data, ensure_ascii=False), time.time())
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
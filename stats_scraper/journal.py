@@ -0,0 +1,42 @@
+import json
+import sqlite3
+import threading
+import time
+
+from pathlib import Path
+from typing import Any, Optional
+from stats_scraper.logger import logger
+from stats_scraper.paths import ensure_parent
+
+
+class RunJournal:
+    def __init__(self, path: Path, resume: bool = False) -> None:
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(ensure_parent(path), check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS units (key TEXT PRIMARY KEY, result TEXT, completed_at REAL)"
+        )
+        if resume:
+            count, = self._connection.execute("SELECT COUNT(*) FROM units").fetchone()
+            logger.info(f"Продолжение прошлого запуска, готово загрузок: {count}")
+        else:
+            self._connection.execute("DELETE FROM units")
+        self._connection.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            row = self._connection.execute("SELECT result FROM units WHERE key = ?", (key,)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def record(self, key: str, result: Any) -> None:
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO units VALUES (?, ?, ?)",
+                (key, json.dumps(result, ensure_ascii=False), time.time())
+            )
+            self._connection.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
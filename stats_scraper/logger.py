@@ -3,11 +3,8 @@ from loguru import logger
 from datetime import datetime
 
 from stats_scraper.paths import LOG_DIR
-from stats_scraper.utils import load_config
 
 
-DEBUG = load_config()["debug"]
-
 LOG_FORMAT = "<green>{time:YYYY-MM-DD HH:mm:ss}</green> - <level>{level: <7}</level> - <white>{message}</white>"
 CONSOLE_FORMAT = "<green>{time:HH:mm:ss}</green> - <level>{level: <7}</level> - <white>{message}</white>"
 
@@ -18,6 +15,3 @@ def setup_logger(debug: bool):
     filepath = LOG_DIR / filename
     logger.add(filepath, format=LOG_FORMAT, level="DEBUG", rotation="1 day")
     logger.add(sys.stderr, colorize=True, format=CONSOLE_FORMAT, level="DEBUG" if debug else "INFO")
-
-
-setup_logger(DEBUG)
\ No newline at end of file
@@ -1,58 +1,150 @@
-from bs4 import BeautifulSoup
-from datetime import datetime
+import os
+import asyncio
+from datetime import date
 
+from typing import Optional
+from stats_scraper.backfill import BackfillCursor, iter_results, parse_date
+from stats_scraper.distributed import Coordinator, Worker, spawn_workers, wait_workers
+from stats_scraper.journal import RunJournal
+from stats_scraper.logger import logger
+from stats_scraper.metrics import MetricsExporter
+from stats_scraper.paths import LOG_DIR, OUT_DIR, STATE_DIR
+from stats_scraper.pipeline import Pipeline
 from stats_scraper.scraper import Scraper
-from stats_scraper.utils import save_data, save_data_to_txt
-
-
-async def main() -> None:
-    async with Scraper() as scraper:
-        match_urls = await scraper.get_all_match_urls()
-
-        for match_url in match_urls:
-            time = datetime.now().strftime("%d%m%y%H%M%S")
-            
-            json_data = {}
-            
-            match_page_content = await scraper.get_page_content(match_url)
-            
-            match_name = await scraper.get_match_name(match_page_content) + f"({time})"
-            match_type = await scraper.get_match_type(match_page_content)
-            
-            json_data["match_name"] = f"{match_name}. {match_type}"
-            
-            match_data = await scraper.fetch_all_match_data(match_page_content,match_name)
-            
-            json_data["match_pre_data"] = match_data
-            save_data(match_name, "pre-match-data", match_data)
-
-            players = []
-            for lineups in match_data["lineups"]:
-                players += lineups["players"]
-            
-            players_stats = await scraper.get_all_players_stats(players)
-            
-            json_data["match_player_stats"] = players_stats
-            save_data(match_name, "player-stats", players_stats)
-        
-            soup = BeautifulSoup(match_page_content, "lxml")
-            analytic_selector = soup.select_one(".matchpage-analytics-center-container")
-            if analytic_selector:
-                analytic_url = "https://www.hltv.org" + analytic_selector.get("href")
-            
-                match_analytics = await scraper.fetch_match_analytics(analytic_url)
-
-                json_data["match_analytics"] = match_analytics
-                save_data(match_name, "match-analytics", match_analytics)
-            
-            json_data["match_teams"] = []
-            for lineup in match_data["lineups"]:
-                team_id, team_name = lineup["id"], lineup["team"]
-                team_name = team_name.replace(" ", "-").replace("'", "").lower()
-                team_stats = await scraper.fetch_team_stats(team_id, team_name)
-                
-                json_data["match_teams"].append(team_stats)
-                
-                save_data(match_name, f"team-{team_name}", team_stats)
-                
-            save_data_to_txt(json_data, match_name)
\ No newline at end of file
+from stats_scraper.state import WatchState
+from stats_scraper.storage import Storage
+from stats_scraper.settings import Settings, load_config
+from stats_scraper.workqueue import open_queue
+
+
+def metrics_exporter(config: Settings, name: str = "metrics") -> MetricsExporter:
+    metrics_config = config.get("metrics", {})
+    return MetricsExporter(
+        enabled=metrics_config.get("enabled", False),
+        port=metrics_config.get("port", 0),
+        json_path=LOG_DIR / f"{name}.json" if metrics_config.get("snapshot", False) else None,
+        json_interval=metrics_config.get("snapshot_interval", 30)
+    )
+
+
+async def main(replay: bool = False, watch: bool = False, resume: bool = False,
+               config: Optional[Settings] = None) -> None:
+    config = config or load_config()
+    pipeline_config = config.get("pipeline", {})
+    watch_config = config.get("watch", {})
+    storage_config = config.get("storage", {})
+    storage = Storage(OUT_DIR / storage_config.get("database", "hltv.sqlite3"))
+    state = WatchState(STATE_DIR / "watch.sqlite3") if watch else None
+    journal_enabled = config.get("journal", {}).get("enabled", True) and not watch
+    journal = RunJournal(STATE_DIR / "journal.sqlite3", resume=resume) if journal_enabled else None
+    
+    async with metrics_exporter(config), Scraper(replay=replay, config=config, journal=journal) as scraper:
+        pipeline = Pipeline(
+            scraper,
+            storage,
+            export=tuple(storage_config.get("export", ("json", "txt"))),
+            matches=pipeline_config.get("matches", 3),
+            players=pipeline_config.get("players", 5),
+            analytics=pipeline_config.get("analytics", 2),
+            teams=pipeline_config.get("teams", 2),
+            writers=pipeline_config.get("writers", 1),
+            state=state,
+            refresh=watch_config.get("refresh", {}),
+            near_start=watch_config.get("near_start", 3600),
+            near_start_refresh=watch_config.get("near_start_refresh", {}),
+            match_budget=config.get("retry", {}).get("match_budget", 600)
+        )
+        try:
+            if watch:
+                await pipeline.watch(watch_config.get("interval", 300))
+            else:
+                await pipeline.run()
+        finally:
+            storage.close()
+            if state is not None:
+                state.close()
+            if journal is not None:
+                journal.close()
+
+
+async def coordinator(resume: bool = False, config: Optional[Settings] = None) -> None:
+    config = config or load_config()
+    distributed_config = config.get("distributed", {})
+    storage_config = config.get("storage", {})
+    storage = Storage(OUT_DIR / storage_config.get("database", "hltv.sqlite3"))
+    queue = open_queue(config)
+
+    workers = []
+    try:
+        async with metrics_exporter(config, "metrics-coordinator"):
+            coordinator = Coordinator(
+                queue,
+                storage,
+                export=tuple(storage_config.get("export", ("json", "txt"))),
+                poll_interval=distributed_config.get("poll_interval", 0.5)
+            )
+            run = asyncio.create_task(coordinator.run(resume=resume))
+            workers = await spawn_workers(distributed_config.get("local_workers", 0))
+            await run
+    finally:
+        if workers:
+            await asyncio.to_thread(queue.stop)
+            await wait_workers(workers, distributed_config.get("lease", 120))
+        storage.close()
+        queue.close()
+
+
+async def worker(replay: bool = False, config: Optional[Settings] = None) -> None:
+    config = config or load_config()
+    distributed_config = config.get("distributed", {})
+    queue = open_queue(config)
+    exporter = metrics_exporter(config, f"metrics-worker-{os.getpid()}")
+    try:
+        async with exporter, Scraper(replay=replay, config=config, rate_store=queue) as scraper:
+            await Worker(
+                scraper,
+                queue,
+                concurrency=distributed_config.get("concurrency", 4),
+                lease=distributed_config.get("lease", 120),
+                retry_delay=distributed_config.get("retry_delay", 5),
+                poll_interval=distributed_config.get("poll_interval", 0.5),
+                idle_exit=distributed_config.get("idle_exit", 0),
+                match_budget=config.get("retry", {}).get("match_budget", 600)
+            ).run()
+    finally:
+        queue.close()
+
+
+async def backfill(replay: bool = False, config: Optional[Settings] = None) -> None:
+    config = config or load_config()
+    backfill_config = config.get("backfill", {})
+    storage_config = config.get("storage", {})
+    start = parse_date(backfill_config["start"])
+    end = parse_date(backfill_config["end"]) if backfill_config.get("end") else None
+    storage = Storage(OUT_DIR / storage_config.get("database", "hltv.sqlite3"))
+    cursor = BackfillCursor(STATE_DIR / "backfill.sqlite3", start, end)
+    end = end or date.today()
+    position = cursor.position()
+    if position is None:
+        logger.info(f"Загрузка прошедших матчей с {start} по {end}")
+    else:
+        logger.info(f"Продолжение загрузки прошедших матчей с {position[0]}, смещение {position[1]}")
+
+    scraper_config = {**config, "rate_limit": {**config.get("rate_limit", {}), **backfill_config.get("rate_limit", {})}}
+    try:
+        async with metrics_exporter(config), Scraper(replay=replay, config=scraper_config) as scraper:
+            pipeline = Pipeline(
+                scraper,
+                storage,
+                export=tuple(storage_config.get("export", ("json", "txt"))),
+                matches=backfill_config.get("matches", 2),
+                snapshots=True,
+                queue_size=backfill_config.get("matches", 2),
+                match_budget=config.get("retry", {}).get("match_budget", 600)
+            )
+            results = iter_results(scraper, start, end, backfill_config.get("window_days", 7), position)
+            saved = await pipeline.backfill(results, cursor.commit)
+            logger.info(f"Загрузка прошедших матчей завершена, сохранено матчей: {saved}")
+    finally:
+        storage.close()
+        cursor.close()
@@ -0,0 +1,241 @@
+import json
+import time
+import asyncio
+import functools
+from bisect import bisect_left
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Tuple
+from stats_scraper.logger import logger
+from stats_scraper.paths import ensure_parent
+
+if TYPE_CHECKING:
+    from aiohttp import web
+
+
+PREFIX = "hltv_scraper_"
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+SIZE_BUCKETS = tuple(1024 * size for size in (1, 4, 16, 64, 256, 1024, 4096))
+COUNT_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250)
+
+Key = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+DISABLED_TIMER = nullcontext()
+
+
+def _key(name: str, labels: Dict[str, Any]) -> Key:
+    return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
+
+
+def _format_key(key: Key) -> str:
+    name, labels = key
+    if not labels:
+        return f"{PREFIX}{name}"
+    return f"{PREFIX}{name}{{" + ",".join(f'{label}="{value}"' for label, value in labels) + "}"
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        target = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target and count:
+                return min(self.buckets[index], self.max) if index < len(self.buckets) else self.max
+        return 0.0
+
+
+class Metrics:
+    def __init__(self) -> None:
+        self.enabled = False
+        self.counters: Dict[Key, float] = {}
+        self.gauges: Dict[Key, float] = {}
+        self.histograms: Dict[Key, Histogram] = {}
+
+    def inc(self, name: str, value: float = 1, **labels: Any) -> None:
+        if not self.enabled:
+            return
+        key = _key(name, labels)
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels: Any) -> None:
+        if not self.enabled:
+            return
+        self.gauges[_key(name, labels)] = value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        if not self.enabled:
+            return
+        key = _key(name, labels)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            if name.endswith("_seconds"):
+                buckets = LATENCY_BUCKETS
+            elif name.endswith("_bytes"):
+                buckets = SIZE_BUCKETS
+            else:
+                buckets = COUNT_BUCKETS
+            histogram = self.histograms[key] = Histogram(buckets)
+        histogram.observe(value)
+
+    def timer(self, name: str, **labels: Any) -> AbstractContextManager:
+        if not self.enabled:
+            return DISABLED_TIMER
+        return self._timer(name, labels)
+
+    @contextmanager
+    def _timer(self, name: str, labels: Dict[str, Any]) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def timed(self, name: str, **labels: Any) -> Callable:
+        def decorator(function: Callable) -> Callable:
+            if asyncio.iscoroutinefunction(function):
+                @functools.wraps(function)
+                async def async_wrapper(*args, **kwargs):
+                    if not self.enabled:
+                        return await function(*args, **kwargs)
+                    with self.timer(name, **labels):
+                        return await function(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                with self.timer(name, **labels):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def render_prometheus(self) -> str:
+        lines = []
+        for key, value in sorted(self.counters.items()):
+            lines.append(f"{_format_key(key)} {value}")
+        for key, value in sorted(self.gauges.items()):
+            lines.append(f"{_format_key(key)} {value}")
+        for (name, labels), histogram in sorted(self.histograms.items(), key=lambda item: item[0]):
+            cumulative = 0
+            for bound, count in zip(histogram.buckets + ("+Inf",), histogram.counts):
+                cumulative += count
+                lines.append(f"{_format_key((f'{name}_bucket', labels + (('le', str(bound)),)))} {cumulative}")
+            lines.append(f"{_format_key((f'{name}_sum', labels))} {histogram.sum}")
+            lines.append(f"{_format_key((f'{name}_count', labels))} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "timestamp": time.time(),
+            "counters": {_format_key(key): value for key, value in self.counters.items()},
+            "gauges": {_format_key(key): value for key, value in self.gauges.items()},
+            "histograms": {
+                _format_key(key): {
+                    "count": histogram.count,
+                    "sum": histogram.sum,
+                    "max": histogram.max,
+                    "p50": histogram.quantile(0.5),
+                    "p95": histogram.quantile(0.95)
+                } for key, histogram in self.histograms.items()
+            }
+        }
+
+    def summary(self) -> str:
+        rows: List[Tuple[str, ...]] = [("Метрика", "Кол-во", "Сумма", "Среднее", "p95", "Макс")]
+        for key, histogram in sorted(self.histograms.items(), key=lambda item: item[0]):
+            rows.append((
+                _format_key(key).removeprefix(PREFIX), str(histogram.count), f"{histogram.sum:.3f}",
+                f"{histogram.sum / histogram.count:.3f}", f"{histogram.quantile(0.95):g}", f"{histogram.max:.3f}"
+            ))
+        for key, value in sorted(self.counters.items()):
+            rows.append((_format_key(key).removeprefix(PREFIX), f"{value:g}", "", "", "", ""))
+
+        widths = [max(len(row[column]) for row in rows) for column in range(len(rows[0]))]
+        return "\n".join(
+            "  ".join(cell.ljust(width) if column == 0 else cell.rjust(width)
+                      for column, (cell, width) in enumerate(zip(row, widths)))
+            for row in rows
+        )
+
+
+metrics = Metrics()
+
+
+class MetricsExporter:
+    def __init__(self, enabled: bool = False, port: Optional[int] = None,
+                 json_path: Optional[Path] = None, json_interval: float = 30) -> None:
+        self.enabled = enabled
+        self.port = port
+        self.json_path = json_path
+        self.json_interval = json_interval
+
+        self._runner: Optional["web.AppRunner"] = None
+        self._snapshot_task: Optional[asyncio.Task] = None
+
+    async def __aenter__(self):
+        metrics.enabled = self.enabled
+        if not self.enabled:
+            return self
+
+        if self.port:
+            from aiohttp import web
+
+            app = web.Application()
+            app.router.add_get("/metrics", self._handle_metrics)
+            self._runner = web.AppRunner(app, access_log=None)
+            await self._runner.setup()
+            try:
+                await web.TCPSite(self._runner, "127.0.0.1", self.port).start()
+                logger.info(f"Метрики доступны по адресу http://127.0.0.1:{self.port}/metrics")
+            except OSError as error:
+                logger.warning(f"Порт метрик {self.port} недоступен ({error.strerror}), метрики только в логе и JSON")
+                await self._runner.cleanup()
+                self._runner = None
+        if self.json_path:
+            self._snapshot_task = asyncio.create_task(self._write_snapshots())
+        return self
+
+    async def __aexit__(self, *args):
+        if not self.enabled:
+            return
+
+        if self._snapshot_task is not None:
+            self._snapshot_task.cancel()
+        if self._runner is not None:
+            await self._runner.cleanup()
+        if self.json_path:
+            self._write_snapshot()
+        if metrics.histograms or metrics.counters:
+            logger.info("Итоги работы:\n" + metrics.summary())
+
+    async def _handle_metrics(self, request: "web.Request") -> "web.Response":
+        from aiohttp import web
+
+        return web.Response(text=metrics.render_prometheus(), content_type="text/plain")
+
+    async def _write_snapshots(self) -> None:
+        while True:
+            await asyncio.sleep(self.json_interval)
+            await asyncio.to_thread(self._write_snapshot)
+
+    def _write_snapshot(self) -> None:
+        temp_path = ensure_parent(self.json_path).with_name(f"{self.json_path.name}.tmp")
+        temp_path.write_text(json.dumps(metrics.snapshot(), ensure_ascii=False, indent=4), encoding="utf-8")
+        temp_path.replace(self.json_path)
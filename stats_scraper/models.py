@@ -0,0 +1,383 @@
+import re
+import sys
+from abc import ABC, abstractmethod
+from datetime import date, datetime
+from functools import lru_cache
+
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Type
+from stats_scraper.state import MATCH, PLAYERS, TEAMS
+
+
+NUMBER = re.compile(r"(?P<number>-?\d+(?:\.(?P<decimals>\d+))?)(?P<suffix>%|\s[a-z]+)?")
+
+
+# Одни и те же строки ("1.05", "74.1%", "13 - 9") повторяются в архиве тысячи
+# раз, а разобранные значения неизменяемы, поэтому результаты разбора кэшируются
+PARSE_CACHE = 1 << 16
+
+
+class Codec(ABC):
+    __slots__ = ()
+
+    def parse(self, text: Any) -> Any:
+        return _parse(self, text) if isinstance(text, str) else text
+
+    @abstractmethod
+    def convert(self, text: str) -> Any:
+        ...
+
+    @abstractmethod
+    def format(self, value: Any) -> Any:
+        ...
+
+
+@lru_cache(maxsize=PARSE_CACHE)
+def _parse(codec: Codec, text: str) -> Any:
+    return codec.convert(text)
+
+
+class Number(Codec):
+    __slots__ = ("decimals", "suffix")
+
+    def __init__(self, decimals: int = 0, suffix: str = "") -> None:
+        self.decimals = decimals
+        self.suffix = suffix
+
+    def convert(self, text: str) -> Any:
+        if not text.endswith(self.suffix):
+            return text
+        number = text[:len(text) - len(self.suffix)] if self.suffix else text
+        try:
+            if "." in number:
+                value = float(number)
+                formatted = f"{value:.{self.decimals}f}"
+            else:
+                value = int(number)
+                formatted = str(value)
+        except ValueError:
+            return text
+        return value if formatted == number else text
+
+    def format(self, value: Any) -> Any:
+        if isinstance(value, float):
+            return f"{value:.{self.decimals}f}{self.suffix}"
+        if isinstance(value, int):
+            return f"{value}{self.suffix}"
+        return value
+
+
+class Date(Codec):
+    __slots__ = ("pattern",)
+
+    def __init__(self, pattern: str) -> None:
+        self.pattern = pattern
+
+    def convert(self, text: str) -> Any:
+        try:
+            value = datetime.strptime(text, self.pattern).date()
+        except ValueError:
+            return text
+        return value if self.format(value) == text else text
+
+    def format(self, value: Any) -> Any:
+        return value.strftime(self.pattern) if isinstance(value, date) else value
+
+
+class Score(Codec):
+    __slots__ = ()
+
+    def convert(self, text: str) -> Any:
+        try:
+            won, lost = text.split(" - ")
+            value = int(won), int(lost)
+        except ValueError:
+            return text
+        return value if str(value[0]) == won and str(value[1]) == lost else text
+
+    def format(self, value: Any) -> Any:
+        return f"{value[0]} - {value[1]}" if isinstance(value, tuple) else value
+
+
+INT = Number()
+DECIMAL = Number(2)
+YEARS = Number(suffix=" years")
+DATE = Date("%d/%m/%y")
+SCORE = Score()
+
+_NUMBERS: Dict[Tuple[int, str], Number] = {}
+_SCHEMAS: Dict[Tuple[Tuple[str, Optional[Number]], ...], Tuple[Tuple[str, Optional[Number]], ...]] = {}
+
+
+def detect_number(text: Any) -> Optional[Number]:
+    match = NUMBER.fullmatch(text) if isinstance(text, str) else None
+    if match is None:
+        return None
+    key = (len(match["decimals"] or ""), match["suffix"] or "")
+    codec = _NUMBERS.get(key)
+    if codec is None:
+        codec = _NUMBERS.setdefault(key, Number(*key))
+    return codec
+
+
+def parse_number(text: Any) -> Any:
+    codec = detect_number(text)
+    return text if codec is None else codec.parse(text)
+
+
+class StatTable:
+    __slots__ = ("schema", "values")
+
+    def __init__(self, schema: Tuple[Tuple[str, Optional[Number]], ...], values: Tuple[Any, ...]) -> None:
+        self.schema = _SCHEMAS.setdefault(schema, schema)
+        self.values = values
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "StatTable":
+        schema, values = [], []
+        for key, text in data.items():
+            codec = detect_number(text)
+            value = text if codec is None else codec.parse(text)
+            schema.append((sys.intern(key), codec if value is not text else None))
+            values.append(sys.intern(value) if isinstance(value, str) else value)
+        return cls(tuple(schema), tuple(values))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            key: value if codec is None else codec.format(value)
+            for (key, codec), value in zip(self.schema, self.values)
+        }
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        return zip((key for key, _ in self.schema), self.values)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        for name, value in self.items():
+            if name == key:
+                return value
+        return default
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key, self)
+        if value is self:
+            raise KeyError(key)
+        return value
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, StatTable) and self.schema == other.schema and self.values == other.values
+
+    def __repr__(self) -> str:
+        return f"StatTable({dict(self.items())!r})"
+
+
+class Stats:
+    __slots__ = ()
+
+    def parse(self, data: Any) -> Any:
+        return StatTable.from_dict(data) if isinstance(data, dict) else data
+
+    def format(self, value: Any) -> Any:
+        return value.to_dict() if isinstance(value, StatTable) else value
+
+
+class Rows:
+    __slots__ = ("record",)
+
+    def __init__(self, record: Type["Record"]) -> None:
+        self.record = record
+
+    def parse(self, data: Any) -> Any:
+        return [self.record.from_dict(item) for item in data] if isinstance(data, list) else data
+
+    def format(self, value: Any) -> Any:
+        return [item.to_dict() for item in value] if isinstance(value, list) else value
+
+
+STATS = Stats()
+
+
+class Record:
+    __slots__ = ()
+    KEYS: Dict[str, str] = {}
+    CODECS: Dict[str, Any] = {}
+    FIELDS: Tuple[Tuple[str, str, Any], ...] = ()
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls.FIELDS = tuple((name, cls.KEYS.get(name, name), cls.CODECS.get(name)) for name in cls.__slots__)
+
+    def __init__(self, *values: Any) -> None:
+        for (name, _, _), value in zip(self.FIELDS, values):
+            setattr(self, name, value)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Record":
+        record = cls.__new__(cls)
+        for name, key, codec in cls.FIELDS:
+            value = data.get(key)
+            if codec is not None:
+                value = codec.parse(value)
+            setattr(record, name, sys.intern(value) if isinstance(value, str) else value)
+        return record
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = {}
+        for name, key, codec in self.FIELDS:
+            value = getattr(self, name)
+            result[key] = value if codec is None else codec.format(value)
+        return result
+
+    def __eq__(self, other: Any) -> bool:
+        return type(other) is type(self) and all(
+            getattr(self, name) == getattr(other, name) for name, _, _ in self.FIELDS
+        )
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name, _, _ in self.FIELDS)
+        return f"{type(self).__name__}({fields})"
+
+
+class LineupPlayer(Record):
+    __slots__ = ("id", "nickname")
+    CODECS = {"id": INT}
+
+    id: int | str | None
+    nickname: str
+
+
+class Lineup(Record):
+    __slots__ = ("id", "team", "world_rank", "players")
+    CODECS = {"players": Rows(LineupPlayer)}
+
+    id: int
+    team: str
+    world_rank: int
+    players: List[LineupPlayer]
+
+
+class PlayerStats(Record):
+    __slots__ = ("nickname", "realname", "team", "age", "short_stats", "full_stats")
+    CODECS = {"age": YEARS, "short_stats": STATS, "full_stats": STATS}
+
+    nickname: str
+    realname: str
+    team: str
+    age: int | str | None
+    short_stats: StatTable
+    full_stats: StatTable
+
+
+class TeamMatch(Record):
+    __slots__ = ("date", "event", "opponent", "map", "result", "outcome")
+    KEYS = {"outcome": "W/L"}
+    CODECS = {"date": DATE, "result": SCORE}
+
+    date: date | str | None
+    event: str
+    opponent: str
+    map: str
+    result: Tuple[int, int] | str | None
+    outcome: str
+
+
+class MapStats(Record):
+    __slots__ = ("map", "stats")
+    CODECS = {"stats": STATS}
+
+    map: str
+    stats: StatTable
+
+
+class TeamPlayer(Record):
+    __slots__ = ("nickname", "maps", "rounds", "kd_diff", "kd", "rating")
+    KEYS = {"kd_diff": "k-d diff", "kd": "k/d"}
+    CODECS = {"maps": INT, "rounds": DECIMAL, "kd_diff": DECIMAL, "kd": DECIMAL, "rating": DECIMAL}
+
+    nickname: str
+    maps: int | str | None
+    rounds: float | str | None
+    kd_diff: float | str | None
+    kd: float | str | None
+    rating: float | str | None
+
+
+class Flash(Record):
+    __slots__ = ("nickname", "maps", "rounds", "thrown", "blinder", "opp_flashed", "diff", "fa", "success")
+    CODECS = {name: DECIMAL for name in __slots__[2:]} | {"maps": INT}
+
+    nickname: str
+    maps: int | str | None
+    rounds: float | str | None
+    thrown: float | str | None
+    blinder: float | str | None
+    opp_flashed: float | str | None
+    diff: float | str | None
+    fa: float | str | None
+    success: float | str | None
+
+
+class OpeningKill(Record):
+    __slots__ = ("nickname", "maps", "rounds", "kpr", "dpr", "attempts", "success", "rating")
+    CODECS = {name: DECIMAL for name in __slots__[2:]} | {"maps": INT}
+
+    nickname: str
+    maps: int | str | None
+    rounds: float | str | None
+    kpr: float | str | None
+    dpr: float | str | None
+    attempts: float | str | None
+    success: float | str | None
+    rating: float | str | None
+
+
+class TeamStats(Record):
+    __slots__ = ("team", "summary", "matches", "maps", "overview", "flashes", "opening_kills")
+    CODECS = {
+        "summary": STATS,
+        "matches": Rows(TeamMatch),
+        "maps": Rows(MapStats),
+        "overview": Rows(TeamPlayer),
+        "flashes": Rows(Flash),
+        "opening_kills": Rows(OpeningKill)
+    }
+
+    team: str
+    summary: StatTable | None
+    matches: List[TeamMatch] | None
+    maps: List[MapStats] | None
+    overview: List[TeamPlayer] | None
+    flashes: List[Flash] | None
+    opening_kills: List[OpeningKill] | None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {key: value for key, value in super().to_dict().items() if value is not None}
+
+
+def to_records(sections: Dict[str, Any]) -> Dict[str, Any]:
+    records = dict(sections)
+    if MATCH in sections:
+        records[MATCH] = {**sections[MATCH], "data": {
+            **sections[MATCH]["data"],
+            "lineups": [Lineup.from_dict(item) for item in sections[MATCH]["data"]["lineups"]]
+        }}
+    if PLAYERS in sections:
+        records[PLAYERS] = [PlayerStats.from_dict(item) for item in sections[PLAYERS]]
+    if TEAMS in sections:
+        records[TEAMS] = [TeamStats.from_dict(item) for item in sections[TEAMS]]
+    return records
+
+
+def to_sections(records: Dict[str, Any]) -> Dict[str, Any]:
+    sections = dict(records)
+    if MATCH in records:
+        sections[MATCH] = {**records[MATCH], "data": {
+            **records[MATCH]["data"],
+            "lineups": [item.to_dict() for item in records[MATCH]["data"]["lineups"]]
+        }}
+    if PLAYERS in records:
+        sections[PLAYERS] = [item.to_dict() for item in records[PLAYERS]]
+    if TEAMS in records:
+        sections[TEAMS] = [item.to_dict() for item in records[TEAMS]]
+    return sections
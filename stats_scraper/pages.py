@@ -0,0 +1,302 @@
+from bs4 import BeautifulSoup
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from stats_scraper.extract import Field, Pairs, Schema
+
+
+def _team_id(href: str) -> int | None:
+    part = href.split("/")[2] if href.count("/") >= 2 else ""
+    return int(part) if part.isdigit() else None
+
+
+def _world_rank(text: str) -> int | None:
+    rank = text.rsplit("#")[-1].strip()
+    return int(rank) if rank.isdigit() else None
+
+
+def _unix_time(value: str) -> int:
+    return int(value) // 1000
+
+
+def _match_type(text: str) -> str:
+    return text.split("*")[0].strip()
+
+
+def _total(text: str) -> int:
+    return int(text.rsplit("of", 1)[-1].strip())
+
+
+MATCH_LIST = Schema(".upcomingMatch[team1]", {
+    "href":       Field(".match", attr="href"),
+    "start":      Field(attr="data-zonedgrouping-entry-unix", transform=_unix_time),
+    "match_time": Field(".matchTime", attr="data-unix", transform=_unix_time),
+    "stars":      Field(attr="stars", transform=int)
+})
+
+RESULTS = Schema(".results-all .result-con", {
+    "href":  Field("a.a-reset", attr="href"),
+    "start": Field(attr="data-zonedgrouping-entry-unix", transform=_unix_time)
+})
+RESULTS_TOTAL = Schema(None, Field(".pagination-data", transform=_total))
+
+MATCH_NAME = Schema(None, ".event")
+MATCH_TYPE = Schema(None, Field(".preformatted-text", transform=_match_type))
+MATCH_ANALYTICS = Schema(None, Field(".matchpage-analytics-center-container", attr="href"))
+
+LINEUPS = Schema(".lineup", {
+    "id":         Field(".flex-align-center > a", attr="href", transform=_team_id),
+    "team":       ".flex-align-center > a",
+    "world_rank": Field(".teamRanking > a", transform=_world_rank),
+    "players": Schema(".player > .flagAlign", {
+        "id":       Field(attr="data-player-id"),
+        "nickname": Field()
+    })
+})
+
+MATCH_STATS_TEAMS = Schema(None, {
+    "team_1": ".map-stats-infobox-header > :nth-child(2)",
+    "team_2": ".map-stats-infobox-header > :nth-child(3)"
+})
+MATCH_STATS = Schema(".map-stats-infobox-maps", {
+    "map":           ".mapname",
+    "team_1_win":    ":nth-child(2) > .map-stats-infobox-winpercentage",
+    "team_1_played": ":nth-child(2) > .map-stats-infobox-maps-played",
+    "team_2_win":    ":nth-child(3) > .map-stats-infobox-winpercentage",
+    "team_2_played": ":nth-child(3) > .map-stats-infobox-maps-played"
+})
+
+PAST_3_MONTH = Schema(".past-matches > :nth-child(3) > .past-matches-box", {
+    "team": ".past-matches-headline",
+    "matches": Schema("tbody > tr", {
+        "team":  ".past-matches-teamname",
+        "cell":  ".past-matches-map",
+        "score": ".past-matches-score"
+    })
+})
+
+HEAD_TO_HEAD_STATS = Schema(None, {
+    "team1":     ".team1",
+    "team1_won": ".right-border > .bold",
+    "team2":     ".team2",
+    "team2_won": ".left-border > .bold",
+    "overtimes": ".padding > :nth-child(3) > .bold"
+})
+HEAD_TO_HEAD_LISTING = Schema(".head-to-head-listing > table > tbody > tr", {
+    "date":   ".date",
+    "team1":  ".team1",
+    "team2":  ".team2",
+    "event":  ".event",
+    "map":    ".map > .dynamic-map-name-full",
+    "result": ".result"
+})
+
+PLAYER_SUMMARY = Schema(None, {
+    "nickname": ".summaryNickname",
+    "realname": ".summaryRealname",
+    "team":     ".SummaryTeamname",
+    "age":      ".summaryPlayerAge"
+})
+PLAYER_SHORT_STATS = Pairs(".summaryStatBreakdown", ".summaryStatTooltip > b", ".summaryStatBreakdownDataValue")
+PLAYER_FULL_STATS = Pairs(".stats-row", ":nth-child(1)", ":nth-child(2)")
+
+ANALYTICS_SUMMARY = Schema(".analytics-insights-wrapper > .col-6", {
+    "team":     ".team-name",
+    "analytic": Schema(".analytics-insights-insight", ".analytics-insights-info")
+})
+ANALYTICS_HEAD_TO_HEAD = Schema(".analytics-head-to-head-container", {
+    "team": ".team-name",
+    "players": Schema(".table-container > tbody > tr", {
+        "nickname": ".player-nickname",
+        "3 month":  ".table-3-months",
+        "event":    ".table-event"
+    }),
+    "last_matchs": Schema(".analytics-last-matches > a", {
+        "team":  ".team-name",
+        "score": ".recent-score",
+        "type":  ".match-type"
+    })
+})
+ANALYTICS_PAST_3_MONTH = Schema(".analytics-handicap-wrapper > .col-6", {
+    "team":            ".team-name",
+    "match_map_count": ".match-map-count",
+    "matches": Schema("tbody > tr", {
+        "score":    "td:not(.best-bet):not(.handicap-data)",
+        "handicap": ".handicap-data"
+    })
+})
+ANALYTICS_MAP_HANDICAP = Schema(".analytics-handicap-map-wrapper > .col-6", {
+    "avg_rounds_lost_in_wins":  ".analytics-handicap-map-data-overall-container > :nth-child(1) > :nth-child(1)",
+    "avg_rounds_won_in_losses": ".analytics-handicap-map-data-overall-container > :nth-child(2) > :nth-child(1)",
+    "individual_maps": Schema("tbody > tr", {
+        "map":                      ".mapname",
+        "avg_rounds_lost_in_wins":  ":nth-child(2):not(.mapname)",
+        "avg_rounds_won_in_losses": ":nth-child(3):not(.mapname)"
+    })
+})
+ANALYTICS_MAP_STATS = Schema(".gtSmartphone-only > tbody > tr", {
+    "map":        "td[rowspan]",
+    "team":       ".maps-team-name",
+    "first_pick": ".analytics-map-stats-pick-percentage",
+    "first_ban":  ".analytics-map-stats-ban-percentage",
+    "win":        ".analytics-map-stats-win-percentage",
+    "played":     ".analytics-map-stats-played",
+    "comment":    ".analytics-map-stats-comment"
+})
+
+TEAM_OVERVIEW = Pairs(".col.standard-box", ".small-label-below", ".large-strong")
+TEAM_MATCHES = Schema(".stats-table > tbody > tr", {
+    "date":     ".time",
+    "event":    ".gtSmartphone-only",
+    "opponent": ":nth-child(4)",
+    "map":      ".statsMapPlayed",
+    "result":   ".statsDetail",
+    "W/L":      ".text-center:not(.gtSmartphone-only)"
+})
+TEAM_MAPS = Schema(".two-grid:not(.win-defeat-container) > .col", {
+    "map":   ".map-pool",
+    "stats": Pairs(".stats-row", ".strong", ":not(.strong)")
+})
+TEAM_PLAYERS = Schema(".stats-table > tbody > tr", {
+    "nickname": ":nth-child(1)",
+    "maps":     ".statsDetail",
+    "rounds":   ":nth-child(3)",
+    "k-d diff": ":nth-child(4)",
+    "k/d":      ":nth-child(5)",
+    "rating":   ":nth-child(6)"
+})
+TEAM_FLASHES = Schema(".stats-table > tbody > tr", {
+    "nickname":    ":nth-child(1)",
+    "maps":        ".mapsCol",
+    "rounds":      ":nth-child(3)",
+    "thrown":      ":nth-child(4)",
+    "blinder":     ":nth-child(5)",
+    "opp_flashed": ":nth-child(6)",
+    "diff":        ":nth-child(7)",
+    "fa":          ":nth-child(8)",
+    "success":     ":nth-child(9)"
+})
+TEAM_OPENING_KILLS = Schema(".stats-table > tbody > tr", {
+    "nickname": ":nth-child(1)",
+    "maps":     ".mapsCol",
+    "rounds":   ":nth-child(3)",
+    "kpr":      ":nth-child(4)",
+    "dpr":      ":nth-child(5)",
+    "attempts": ":nth-child(6)",
+    "success":  ":nth-child(7)",
+    "rating":   ":nth-child(8)"
+})
+
+
+def parse_match_list(soup: BeautifulSoup) -> List[Dict[str, Any]]:
+    return [{
+        "href": item["href"],
+        "start": item["start"] or item["match_time"],
+        "stars": item["stars"] or 0
+    } for item in MATCH_LIST.collect(soup.select_one(".upcomingMatchesSection"))]
+
+
+def parse_results(soup: BeautifulSoup) -> Dict[str, Any]:
+    return {"matches": RESULTS.collect(soup), "total": RESULTS_TOTAL.extract(soup)}
+
+
+def parse_match_stats(soup: BeautifulSoup) -> List[Dict[str, Any]]:
+    teams = MATCH_STATS_TEAMS.extract(soup)
+    return [{
+        "map": item["map"],
+        "stats": {
+            teams["team_1"]: (item["team_1_win"], item["team_1_played"]),
+            teams["team_2"]: (item["team_2_win"], item["team_2_played"])
+        }
+    } for item in MATCH_STATS.collect(soup)]
+
+
+def parse_head_to_head(soup: BeautifulSoup) -> Dict[str, Any]:
+    head_to_head = soup.select_one(".head-to-head")
+    if head_to_head:
+        stats = HEAD_TO_HEAD_STATS.extract(head_to_head)
+        stats = {
+            stats["team1"]: stats["team1_won"],
+            stats["team2"]: stats["team2_won"],
+            "overtimes": stats["overtimes"]
+        }
+    else:
+        stats = {"team1": None, "team2": None, "overtimes": None}
+    return {"stats": stats, "listing": HEAD_TO_HEAD_LISTING.collect(soup)}
+
+
+def parse_player_stats(soup: BeautifulSoup) -> Dict[str, Any]:
+    return {
+        **PLAYER_SUMMARY.extract(soup),
+        "short_stats": PLAYER_SHORT_STATS.collect(soup),
+        "full_stats": PLAYER_FULL_STATS.collect(soup)
+    }
+
+
+def parse_match_analytics(soup: BeautifulSoup) -> Dict[str, Any]:
+    return {
+        "analytics_summary": ANALYTICS_SUMMARY.collect(soup),
+        "head_to_head": [{
+            "team": item["team"],
+            "players": {
+                player["nickname"]: {"3 month": player["3 month"], "event": player["event"]}
+                for player in item["players"]
+            },
+            "last_matchs": item["last_matchs"]
+        } for item in ANALYTICS_HEAD_TO_HEAD.collect(soup)],
+        "past_3_month": ANALYTICS_PAST_3_MONTH.collect(soup),
+        "map_handicap": [{
+            "overall_data": {
+                "avg_rounds_lost_in_wins":  item["avg_rounds_lost_in_wins"],
+                "avg_rounds_won_in_losses": item["avg_rounds_won_in_losses"]
+            },
+            "individual_maps": item["individual_maps"]
+        } for item in ANALYTICS_MAP_HANDICAP.collect(soup)],
+        "map_stats": ANALYTICS_MAP_STATS.collect(soup)
+    }
+
+
+def parse_match_page(soup: BeautifulSoup) -> Dict[str, Any]:
+    return {
+        "name": MATCH_NAME.extract(soup),
+        "type": MATCH_TYPE.extract(soup),
+        "analytics_href": MATCH_ANALYTICS.extract(soup),
+        "data": {
+            "lineups": LINEUPS.collect(soup),
+            "match_stats": parse_match_stats(soup),
+            "past_3_month": PAST_3_MONTH.collect(soup),
+            "head_to_head": parse_head_to_head(soup)
+        }
+    }
+
+
+PAGE_PARSERS: Dict[str, Callable[[BeautifulSoup], Any]] = {
+    "match_list":         parse_match_list,
+    "results":            parse_results,
+    "match":              parse_match_page,
+    "player_stats":       parse_player_stats,
+    "match_analytics":    parse_match_analytics,
+    "team_overview":      lambda soup: {"summary": TEAM_OVERVIEW.collect(soup)},
+    "team_matches":       lambda soup: {"matches": TEAM_MATCHES.collect(soup)},
+    "team_maps":          lambda soup: {"maps": TEAM_MAPS.collect(soup)},
+    "team_players":       lambda soup: {"overview": TEAM_PLAYERS.collect(soup)},
+    "team_flashes":       lambda soup: {"flashes": TEAM_FLASHES.collect(soup)},
+    "team_opening_kills": lambda soup: {"opening_kills": TEAM_OPENING_KILLS.collect(soup)}
+}
+
+
+def parse_html(page_type: str, page_content: str) -> Any:
+    soup = BeautifulSoup(page_content, "lxml")
+    try:
+        return PAGE_PARSERS[page_type](soup)
+    finally:
+        soup.decompose()
+
+
+def parse_batch(items: List[Tuple[str, str]]) -> List[Tuple[Any, Optional[Exception]]]:
+    results = []
+    for page_type, page_content in items:
+        try:
+            results.append((parse_html(page_type, page_content), None))
+        except Exception as error:
+            results.append((None, error))
+    return results
@@ -0,0 +1,91 @@
+import asyncio
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from typing import Any, List, Optional, Set, Tuple
+from stats_scraper.logger import logger
+from stats_scraper.metrics import metrics
+from stats_scraper.lazy import lazy_import
+
+pages = lazy_import("stats_scraper.pages")
+
+
+INLINE = "inline"
+THREAD = "thread"
+PROCESS = "process"
+
+
+class ParseExecutor:
+    def __init__(self, mode: str = PROCESS, workers: int = 0, batch_size: int = 8,
+                 batch_bytes: int = 256 * 1024, batch_delay: float = 0.005) -> None:
+        if mode not in (INLINE, THREAD, PROCESS):
+            raise ValueError(f"Неизвестный режим разбора страниц: {mode}")
+
+        self.mode = mode
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self.batch_size = batch_size
+        self.batch_bytes = batch_bytes
+        self.batch_delay = batch_delay
+
+        self._executor: Optional[Executor] = None
+        self._batch: List[Tuple[str, str, asyncio.Future]] = []
+        self._batch_size_bytes = 0
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    def start(self) -> None:
+        if self.mode == THREAD:
+            self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="parser")
+        elif self.mode == PROCESS:
+            self._executor = ProcessPoolExecutor(self.workers)
+        logger.debug(f"Разбор страниц: {self.mode}, обработчиков: {self.workers if self._executor else 0}")
+
+    async def close(self) -> None:
+        self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    async def parse(self, page_type: str, page_content: str) -> Any:
+        if self._executor is None:
+            return pages.parse_html(page_type, page_content)
+
+        future = asyncio.get_running_loop().create_future()
+        self._batch.append((page_type, page_content, future))
+        self._batch_size_bytes += len(page_content)
+
+        if len(self._batch) >= self.batch_size or self._batch_size_bytes >= self.batch_bytes:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.batch_delay, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._batch:
+            return
+
+        batch, self._batch, self._batch_size_bytes = self._batch, [], 0
+        metrics.observe("parse_batch_size", len(batch))
+        task = asyncio.ensure_future(self._run_batch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: List[Tuple[str, str, asyncio.Future]]) -> None:
+        items = [(page_type, page_content) for page_type, page_content, _ in batch]
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(self._executor, pages.parse_batch, items)
+        except Exception as error:
+            results = [(None, error)] * len(batch)
+
+        for (_, _, future), (result, error) in zip(batch, results):
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
@@ -1,11 +1,15 @@
 from pathlib import Path
-from os import makedirs
 
 ROOT        = Path(__file__).resolve().parent
 LOG_DIR     = ROOT / "logs"
 OUT_DIR     = ROOT.parent / "output"
+CACHE_DIR   = ROOT.parent / "cache"
+ARCHIVE_DIR = ROOT.parent / "archive"
+STATE_DIR   = ROOT.parent / "state"
 
 CONFIG_PATH = ROOT.parent / "config.yaml"
 
-makedirs(LOG_DIR,    exist_ok=True)
-makedirs(OUT_DIR,    exist_ok=True)
\ No newline at end of file
+
+def ensure_parent(path: Path) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path
@@ -0,0 +1,329 @@
+import re
+import asyncio
+from datetime import date, datetime, timedelta
+
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
+from stats_scraper.logger import logger
+from stats_scraper.metrics import metrics
+from stats_scraper.ratelimit import PrioritySemaphore
+from stats_scraper.resilience import PARSE, error_marker, section_error, time_budget
+from stats_scraper.export import export_match
+from stats_scraper.scraper import Scraper
+from stats_scraper.state import (
+    ANALYTICS, ERRORS, LINEUPS, MATCH, PLAYERS, SECTIONS, TEAMS, WatchState, content_hash
+)
+from stats_scraper.storage import Storage
+
+
+def priority(match: Dict[str, Any]) -> Tuple[float, int]:
+    return (match["start"] if match["start"] is not None else float("inf")), -match["stars"]
+
+
+def match_id(match_url: str) -> int:
+    found = re.search(r"/matches/(\d+)", match_url)
+    if found is None:
+        raise ValueError(f"Не удалось определить номер матча: {match_url}")
+    return int(found.group(1))
+
+
+def team_slug(team_name: str) -> str:
+    return team_name.replace(" ", "-").replace("'", "").lower()
+
+
+def match_section(match_page: Dict[str, Any], match_name: str, start: Optional[int], stars: int,
+                  live: bool = True) -> Dict[str, Any]:
+    captured_before_start = None if start is None or not live else int(start - datetime.now().timestamp())
+    if captured_before_start is not None:
+        metrics.observe("capture_lead_seconds", max(0, captured_before_start))
+        if captured_before_start < 0:
+            metrics.inc("deadline_misses_total")
+            logger.warning(f"Данные матча {match_name} собраны после его начала")
+    return {**match_page, "start": start, "stars": stars, "captured_before_start": captured_before_start}
+
+
+def missing_player(player: Dict[str, str]) -> Dict[str, Any]:
+    return {"nickname": player["nickname"], "realname": None, "team": None, "age": None,
+            "short_stats": None, "full_stats": None}
+
+
+def missing_team(lineup: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    error = section_error(TEAMS, lineup["team"], PARSE, "на странице матча нет номера команды")
+    return {"team": team_slug(lineup["team"])}, error
+
+
+def snapshot_date(start: Optional[int]) -> Optional[date]:
+    return None if start is None else datetime.fromtimestamp(start).date() - timedelta(days=1)
+
+
+def save_match(storage: Storage, export: Tuple[str, ...], match_url: str, match_name: str,
+               sections: Dict[str, Any]) -> None:
+    storage.save(match_id(match_url), match_url, sections)
+    if export:
+        export_match(storage, match_id(match_url), match_name, export, sections)
+
+
+class Pipeline:
+    def __init__(self, scraper: Scraper, storage: Storage, export: Tuple[str, ...] = (), matches: int = 3,
+                 players: int = 5, analytics: int = 2, teams: int = 2, writers: int = 1,
+                 state: Optional[WatchState] = None,
+                 refresh: Optional[Dict[str, int]] = None, near_start: int = 3600,
+                 near_start_refresh: Optional[Dict[str, int]] = None, snapshots: bool = False,
+                 queue_size: int = 0, match_budget: float = 0) -> None:
+        self.scraper = scraper
+        self.storage = storage
+        self.export = export
+        self.writers = writers
+        self.state = state
+        self.refresh = refresh or {}
+        self.near_start = near_start
+        self.near_start_refresh = near_start_refresh or {}
+        self.snapshots = snapshots
+        self.matches = matches
+        self.match_budget = match_budget
+
+        self.match_limit = PrioritySemaphore(matches)
+        self.player_limit = PrioritySemaphore(players)
+        self.analytics_limit = PrioritySemaphore(analytics)
+        self.team_limit = PrioritySemaphore(teams)
+        # Хеши разделов записываются в состояние только после сохранения матча
+        self.write_queue: asyncio.Queue[Tuple[str, str, Dict[str, Any], List[Tuple[str, str]]]] = asyncio.Queue(queue_size)
+
+    async def run(self) -> List[Dict[str, Any]]:
+        matches = sorted(await self.scraper.get_upcoming_matches(), key=priority)
+        match_urls = [match["url"] for match in matches]
+        if self.state is not None:
+            finished = self.state.forget(match_urls)
+            if finished:
+                logger.info(f"Завершенных матчей удалено из состояния: {finished}")
+
+        writers = [asyncio.create_task(self._writer()) for _ in range(self.writers)]
+        try:
+            results = await asyncio.gather(
+                *(self.process_match(match["url"], match["start"], match["stars"]) for match in matches),
+                return_exceptions=True
+            )
+            for match_url, result in zip(match_urls, results):
+                if isinstance(result, Exception):
+                    logger.opt(exception=result).error(f"Не удалось обработать матч: {match_url}")
+
+            await self.write_queue.join()
+        finally:
+            for writer in writers:
+                writer.cancel()
+
+        if self.state is not None:
+            updated = sum(result is True for result in results)
+            logger.info(f"Обновлено матчей: {updated} из {len(match_urls)}")
+        return matches
+
+    async def watch(self, interval: int) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            delay = interval
+            try:
+                matches = await self.run()
+                if self.near_start_refresh and any(self._is_near_start(match["start"]) for match in matches):
+                    delay = min(interval, *self.near_start_refresh.values())
+            except Exception:
+                logger.exception("Не удалось обновить список матчей")
+            await asyncio.sleep(max(0, delay - (loop.time() - started)))
+
+    async def backfill(self, results: AsyncIterator[Tuple[Dict[str, Any], Optional[Any]]],
+                       commit: Callable[[Any], None]) -> int:
+        slots = asyncio.Semaphore(self.matches)
+        pending: Set[asyncio.Task] = set()
+        saved = 0
+
+        async def process(match: Dict[str, Any]) -> None:
+            nonlocal saved
+            try:
+                if await asyncio.to_thread(self.storage.exists, match_id(match["url"])):
+                    metrics.inc("backfill_matches_total", result="skipped")
+                    return
+                updated = await self.process_match(match["url"], match["start"])
+                saved += updated
+                metrics.inc("backfill_matches_total", result="saved")
+            except Exception:
+                metrics.inc("backfill_matches_total", result="failed")
+                logger.exception(f"Не удалось обработать матч: {match['url']}")
+            finally:
+                slots.release()
+
+        writers = [asyncio.create_task(self._writer()) for _ in range(self.writers)]
+        try:
+            async for match, position in results:
+                await slots.acquire()
+                task = asyncio.create_task(process(match))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+                if position is not None:
+                    await asyncio.gather(*pending)
+                    await self.write_queue.join()
+                    await asyncio.to_thread(commit, position)
+            await asyncio.gather(*pending)
+            await self.write_queue.join()
+        finally:
+            for task in [*pending, *writers]:
+                task.cancel()
+        return saved
+
+    async def process_match(self, match_url: str, start: Optional[int] = None, stars: int = 0) -> bool:
+        with time_budget(self.match_budget):
+            return await self._process_match(match_url, start, stars)
+
+    async def _process_match(self, match_url: str, start: Optional[int], stars: int) -> bool:
+        time = await self._started_at(match_url)
+        order = priority({"start": start, "stars": stars})
+        if self.state is None:
+            stale = set(SECTIONS)
+        else:
+            refresh = {**self.refresh, **self.near_start_refresh} if self._is_near_start(start) else self.refresh
+            stale = self.state.stale_sections(match_url, refresh)
+        if not stale:
+            return False
+
+        async with self.match_limit.slot(order):
+            match_page = await self.scraper.get_match_page(match_url)
+
+        if self.state is None:
+            match_name = match_page["name"] + f"({time}-{match_id(match_url)})"
+        else:
+            match_name = match_page["name"] + f"({match_id(match_url)})"
+        analytic_url = match_page["analytics_url"]
+        match_data = match_page["data"]
+        logger.info(f"Получение данных матча: {match_name}")
+
+        saved = {} if self.state is None else await asyncio.to_thread(self.storage.load, match_id(match_url))
+        sections = {}
+        digests: List[Tuple[str, str]] = []
+        if self._update(match_url, MATCH, match_data, digests) or MATCH not in saved:
+            sections[MATCH] = match_section(match_page, match_name, start, stars, live=not self.snapshots)
+
+        lineups_digest = content_hash(match_data["lineups"])
+        lineups_changed = self.state is None or self.state.changed(match_url, LINEUPS, lineups_digest)
+        if lineups_changed:
+            stale |= {PLAYERS, TEAMS}
+
+        players = []
+        for lineups in match_data["lineups"]:
+            players += lineups["players"]
+
+        errors = []
+        await asyncio.gather(
+            self._fetch_players(match_url, players, order, stale, saved, sections, errors, digests),
+            self._fetch_analytics(match_url, analytic_url, order, stale, saved, sections, errors, digests),
+            self._fetch_teams(match_url, match_data["lineups"], order, stale, saved, sections, errors, digests, start)
+        )
+        if lineups_changed:
+            digests.append((LINEUPS, lineups_digest))
+        if errors:
+            sections[ERRORS] = errors
+
+        if not sections:
+            self._commit(match_url, digests)
+            return False
+        await self.write_queue.put((match_url, match_name, sections, digests))
+        metrics.observe("write_queue_depth", self.write_queue.qsize())
+        return True
+
+    async def _fetch_players(self, match_url: str, players: List[Dict[str, str]], order: Tuple[float, int],
+                             stale: Set[str], saved: Dict[str, Any], sections: Dict[str, Any],
+                             errors: List[Dict[str, Any]], digests: List[Tuple[str, str]]) -> None:
+        if PLAYERS not in stale and PLAYERS in saved:
+            return
+        failures = []
+
+        async def fetch(player: Dict[str, str]) -> Dict[str, Any]:
+            try:
+                async with self.player_limit.slot(order):
+                    return await self.scraper.get_player_stats(player)
+            except Exception as error:
+                failures.append(error_marker(PLAYERS, player["nickname"], error))
+                return missing_player(player)
+
+        players_stats = await asyncio.gather(*(fetch(player) for player in players))
+        errors += failures
+        if failures:
+            if PLAYERS not in saved:
+                sections[PLAYERS] = players_stats
+        elif self._update(match_url, PLAYERS, players_stats, digests) or PLAYERS not in saved:
+            sections[PLAYERS] = players_stats
+
+    async def _fetch_analytics(self, match_url: str, analytic_url: str | None, order: Tuple[float, int],
+                               stale: Set[str], saved: Dict[str, Any], sections: Dict[str, Any],
+                               errors: List[Dict[str, Any]], digests: List[Tuple[str, str]]) -> None:
+        if analytic_url is None or (ANALYTICS not in stale and ANALYTICS in saved):
+            return
+
+        try:
+            async with self.analytics_limit.slot(order):
+                match_analytics = await self.scraper.fetch_match_analytics(analytic_url)
+        except Exception as error:
+            errors.append(error_marker(ANALYTICS, analytic_url, error))
+            return
+        if self._update(match_url, ANALYTICS, match_analytics, digests) or ANALYTICS not in saved:
+            sections[ANALYTICS] = match_analytics
+
+    async def _fetch_teams(self, match_url: str, lineups: List[Dict[str, Any]], order: Tuple[float, int],
+                           stale: Set[str], saved: Dict[str, Any], sections: Dict[str, Any],
+                           errors: List[Dict[str, Any]], digests: List[Tuple[str, str]],
+                           start: Optional[int] = None) -> None:
+        if TEAMS not in stale and TEAMS in saved:
+            return
+        until = snapshot_date(start) if self.snapshots else None
+        failures = []
+
+        async def fetch(lineup: Dict[str, Any]) -> Dict[str, Any]:
+            if lineup["id"] is None:
+                team_stats, error = missing_team(lineup)
+                failures.append(error)
+                return team_stats
+            async with self.team_limit.slot(order):
+                return await self.scraper.fetch_team_stats(lineup["id"], team_slug(lineup["team"]), until, failures)
+
+        teams_stats = list(await asyncio.gather(*(fetch(lineup) for lineup in lineups)))
+        errors += failures
+        if failures:
+            if TEAMS not in saved:
+                sections[TEAMS] = teams_stats
+        elif self._update(match_url, TEAMS, teams_stats, digests) or TEAMS not in saved:
+            sections[TEAMS] = teams_stats
+
+    async def _started_at(self, match_url: str) -> str:
+        time = datetime.now().strftime("%d%m%y%H%M%S")
+        journal = self.scraper.journal
+        if journal is None:
+            return time
+
+        key = f"started_at:{match_url}"
+        started_at = await asyncio.to_thread(journal.get, key)
+        if started_at is None:
+            await asyncio.to_thread(journal.record, key, time)
+            return time
+        return started_at
+
+    def _is_near_start(self, start: Optional[int]) -> bool:
+        return start is not None and start - datetime.now().timestamp() <= self.near_start
+
+    def _update(self, match_url: str, section: str, data: Any, digests: List[Tuple[str, str]]) -> bool:
+        if self.state is None:
+            return True
+        digest = content_hash(data)
+        digests.append((section, digest))
+        return self.state.changed(match_url, section, digest)
+
+    def _commit(self, match_url: str, digests: List[Tuple[str, str]]) -> None:
+        if self.state is not None and digests:
+            self.state.commit(match_url, digests)
+
+    async def _writer(self) -> None:
+        while True:
+            match_url, match_name, sections, digests = await self.write_queue.get()
+            try:
+                await asyncio.to_thread(save_match, self.storage, self.export, match_url, match_name, sections)
+                self._commit(match_url, digests)
+            except Exception:
+                logger.exception(f"Не удалось сохранить данные матча: {match_name}")
+            finally:
+                self.write_queue.task_done()
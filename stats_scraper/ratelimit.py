@@ -0,0 +1,152 @@
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from urllib.parse import urlsplit
+
+from typing import Any, AsyncIterator, Dict, List, Tuple
+from stats_scraper.logger import logger
+from stats_scraper.metrics import metrics
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class SharedTokenBucket:
+    def __init__(self, store: Any, host: str, rate: float, burst: int) -> None:
+        self.store = store
+        self.host = host
+        self.rate = rate
+        self.burst = burst
+
+    async def acquire(self) -> None:
+        while True:
+            wait = await asyncio.to_thread(self.store.take_token, self.host, self.rate, self.burst)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+
+class AdaptiveLimiter:
+    def __init__(self, initial: int, minimum: int, maximum: int) -> None:
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = float(max(minimum, min(initial, maximum)))
+        self.active = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.active < int(self.limit))
+            self.active += 1
+
+    async def release(self, throttled: bool | None) -> None:
+        async with self._condition:
+            self.active -= 1
+            if throttled:
+                self.limit = max(self.minimum, self.limit / 2)
+            elif throttled is not None:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._condition.notify_all()
+
+
+class PrioritySemaphore:
+    def __init__(self, value: int) -> None:
+        self.value = value
+        self._waiters: List[Tuple[Any, int, asyncio.Future]] = []
+        self._order = itertools.count()
+
+    @asynccontextmanager
+    async def slot(self, priority: Any) -> AsyncIterator[None]:
+        if self.value > 0 and not self._waiters:
+            self.value -= 1
+        else:
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiters, (priority, next(self._order), future))
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    self._release()
+                raise
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _release(self) -> None:
+        while self._waiters:
+            *_, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.value += 1
+
+
+class RequestSlot:
+    def __init__(self) -> None:
+        self.throttled: bool | None = None
+
+    def success(self) -> None:
+        self.throttled = False
+
+    def throttle(self) -> None:
+        self.throttled = True
+
+
+class RequestScheduler:
+    def __init__(self, rate: float = 1.0, burst: int = 3, concurrency: int = 2,
+                 min_concurrency: int = 1, max_concurrency: int = 8, store: Any = None) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.concurrency = concurrency
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.store = store
+
+        self._buckets: Dict[str, TokenBucket | SharedTokenBucket] = {}
+        self._limiters: Dict[str, AdaptiveLimiter] = {}
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[RequestSlot]:
+        host = urlsplit(url).hostname or ""
+        if host not in self._buckets:
+            if self.store is None:
+                self._buckets[host] = TokenBucket(self.rate, self.burst)
+            else:
+                self._buckets[host] = SharedTokenBucket(self.store, host, self.rate, self.burst)
+            self._limiters[host] = AdaptiveLimiter(self.concurrency, self.min_concurrency, self.max_concurrency)
+        bucket, limiter = self._buckets[host], self._limiters[host]
+
+        with metrics.timer("rate_limit_wait_seconds", host=host):
+            await limiter.acquire()
+        slot = RequestSlot()
+        try:
+            with metrics.timer("rate_limit_wait_seconds", host=host):
+                await bucket.acquire()
+            metrics.observe("active_requests", limiter.active, host=host)
+            yield slot
+        finally:
+            await limiter.release(slot.throttled)
+            if slot.throttled:
+                metrics.inc("throttled_total", host=host)
+                logger.debug(f"Сервер {host} ограничивает запросы, одновременных запросов: {int(limiter.limit)}")
@@ -0,0 +1,217 @@
+from typing import Any, Callable, Dict, Iterable, Iterator, List, TextIO, Tuple
+
+
+ORDINALS = ("Первая", "Вторая", "Третья", "Четвертая")
+# Строки отчета склеиваются и пишутся в файл, когда их накопится столько после
+# очередного раздела: маленький отчет записывается одним вызовом write
+REPORT_CHUNK = 8192
+
+Renderer = Callable[[Any, List[str]], None]
+
+
+def _ordinal(index: int) -> str:
+    return ORDINALS[index] if index < len(ORDINALS) else f"{index + 1}-я"
+
+
+def _join(values: Iterable[Any]) -> str:
+    try:
+        return " / ".join(values)
+    except TypeError:
+        return " / ".join("" if value is None else str(value) for value in values)
+
+
+def _pairs(lines: List[str], data: Dict[str, Any], prefix: str = "- ") -> None:
+    for key, value in data.items():
+        lines.append(f"{prefix}{key}: {value}\n")
+
+
+def _rows(lines: List[str], rows: Any) -> None:
+    if isinstance(rows, dict):
+        _pairs(lines, rows)
+        return
+    for item in rows or ():
+        lines.append(f"- {_join(item.values())}\n")
+
+
+def _split_players(data: Dict[str, Any]) -> List[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+    lineups = data["match_pre_data"].get("lineups") or []
+    player_stats = data.get("match_player_stats") or []
+    teams, offset = [], 0
+    for lineup in lineups:
+        size = len(lineup.get("players") or [])
+        teams.append((lineup, player_stats[offset:offset + size]))
+        offset += size
+    return teams
+
+
+def render_header(data: Dict[str, Any], lines: List[str]) -> None:
+    lines.append(f"Название турнира + формат: {data['match_name']}\n")
+    if data.get("start_time") and data.get("captured_before_start") is not None:
+        lines.append(
+            f"Начало матча: {data['start_time']} (данные собраны за {data['captured_before_start'] // 60} мин)\n"
+        )
+    elif data.get("start_time"):
+        lines.append(f"Начало матча: {data['start_time']}\n")
+    lines.append("\n")
+
+
+def render_lineups(data: Dict[str, Any], lines: List[str]) -> None:
+    lines.append("Lineups:\n\n")
+    for index, (lineup, player_stats) in enumerate(_split_players(data)):
+        lines.append(f"{_ordinal(index)} команда: {lineup['team']} #{lineup['world_rank']}\n")
+        for player in lineup.get("players") or ():
+            lines.append(f"- {player['nickname']}\n")
+
+        lines.append("\nСтатистика игроков:\n")
+        for stats in player_stats:
+            for key, value in stats.items():
+                if isinstance(value, dict):
+                    _pairs(lines, value, "  - ")
+                else:
+                    lines.append(f"- {key}: {value}\n")
+            lines.append("\n")
+
+
+def render_map_stats(match_stats: List[Dict[str, Any]], lines: List[str]) -> None:
+    lines.append("\nMap stats:\n")
+    for map_stat in match_stats:
+        for key, value in map_stat.items():
+            if isinstance(value, dict):
+                for team, stats in value.items():
+                    lines.append(f"  - {team}: {_join(stats)}\n")
+            else:
+                lines.append(f"- Карта: {value}\n")
+        lines.append("\n")
+
+
+def render_past_3_month(past_3_month: List[Dict[str, Any]], lines: List[str]) -> None:
+    lines.append("\nPast 3 month:\n")
+    for index, item in enumerate(past_3_month):
+        if index:
+            lines.append("\n")
+        lines.append(f"{_ordinal(index)} команда: {item['team']}\n")
+        _rows(lines, item.get("matches"))
+
+
+def render_head_to_head(head_to_head: Dict[str, Any], lines: List[str]) -> None:
+    lines.append("\n\nHead to head:\n")
+    lines.append(f"{_join(f'{key}: {value}' for key, value in (head_to_head.get('stats') or {}).items())}\n")
+
+    listing = head_to_head.get("listing") or []
+    if not listing:
+        lines.append("\n")
+    for item in listing:
+        _pairs(lines, item)
+        lines.append("\n")
+
+
+def render_analytics(analytics: Dict[str, Any], lines: List[str]) -> None:
+    lines.append("\nAnalytics center.\n")
+
+    lines.append("\nAnalytics summary:\n")
+    for item in analytics.get("analytics_summary") or ():
+        lines.append(f"- Команда: {item['team']}\n")
+        for analytic in item["analytic"]:
+            lines.append(f"  - {analytic}\n")
+        lines.append("\n")
+
+    lines.append("Head to head:\n")
+    for item in analytics.get("head_to_head") or ():
+        lines.append(f"- Команда: {item['team']}\n")
+        for nickname, stats in item["players"].items():
+            lines.append(f"  - {nickname}: {_join(stats.values())}\n")
+        lines.append("\n")
+
+    lines.append("Past 3 months:\n")
+    for item in analytics.get("past_3_month") or ():
+        lines.append(f"- Команда: {item['team']}\n")
+        lines.append(f"- Кол-во матчей: {item['match_map_count']}\n")
+        for matches in item["matches"]:
+            _pairs(lines, matches, "  - ")
+            lines.append("\n")
+
+    lines.append("Map handicap:\n")
+    for item in analytics.get("map_handicap") or ():
+        lines.append("- Overall data:\n")
+        _pairs(lines, item["overall_data"], "  - ")
+        lines.append("\n")
+        for individual_map in item["individual_maps"]:
+            _pairs(lines, individual_map, "  - ")
+            lines.append("\n")
+
+    lines.append("Map stats:\n")
+    for item in analytics.get("map_stats") or ():
+        _pairs(lines, item)
+        lines.append("\n")
+
+
+def render_team(team_stats: Dict[str, Any], lines: List[str]) -> None:
+    lines.append(f"\nСтатистика команды: {team_stats['team']}\n")
+    lines.append("Overview:\n")
+    _rows(lines, team_stats.get("overview"))
+
+    lines.append("\nMatches:\n")
+    _rows(lines, team_stats.get("matches"))
+
+    lines.append("\nMaps:\n")
+    for item in team_stats.get("maps") or ():
+        lines.append(f"- Карта: {item['map']}\n")
+        _pairs(lines, item["stats"], "  - ")
+        lines.append("\n")
+
+    lines.append("Flashes:\n")
+    _rows(lines, team_stats.get("flashes"))
+
+    lines.append("\nOpening Kills:\n")
+    _rows(lines, team_stats.get("opening_kills"))
+
+
+def render_teams(teams: List[Dict[str, Any]], lines: List[str]) -> None:
+    lines.append("\nСтатистика команд:\n")
+    for team_stats in teams:
+        render_team(team_stats, lines)
+
+
+def render_errors(errors: List[Dict[str, Any]], lines: List[str]) -> None:
+    lines.append("\nНе загружено:\n")
+    for error in errors:
+        lines.append(f"- {error['section']}: {error['item']} ({error['kind']})\n")
+
+
+def _pre_data(key: str) -> Callable[[Dict[str, Any]], Any]:
+    return lambda data: data["match_pre_data"].get(key)
+
+
+TEMPLATE: List[Tuple[Callable[[Dict[str, Any]], Any], Renderer]] = [
+    (lambda data: data, render_header),
+    (lambda data: data, render_lineups),
+    (_pre_data("match_stats"), render_map_stats),
+    (_pre_data("past_3_month"), render_past_3_month),
+    (_pre_data("head_to_head"), render_head_to_head),
+    (lambda data: data.get("match_analytics"), render_analytics),
+    (lambda data: data.get("match_teams"), render_teams),
+    (lambda data: data.get("errors"), render_errors)
+]
+
+
+def _render(data: Dict[str, Any], lines: List[str], chunk_lines: int) -> Iterator[None]:
+    for section, renderer in TEMPLATE:
+        value = section(data)
+        if value is not None:
+            renderer(value, lines)
+            if len(lines) >= chunk_lines:
+                yield
+
+
+def render_report(data: Dict[str, Any], chunk_lines: int = REPORT_CHUNK) -> Iterator[str]:
+    lines: List[str] = []
+    for _ in _render(data, lines, chunk_lines):
+        yield "".join(lines)
+        lines.clear()
+    if lines:
+        yield "".join(lines)
+
+
+def write_report(data: Dict[str, Any], file: TextIO) -> None:
+    for part in render_report(data):
+        file.write(part)
@@ -0,0 +1,150 @@
+import time
+import random
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from typing import Any, Awaitable, Dict, Iterator, Optional, TypeVar
+from stats_scraper.logger import logger
+from stats_scraper.metrics import metrics
+
+
+NETWORK = "network"
+TIMEOUT = "timeout"
+CHALLENGE = "challenge"
+PARSE = "parse"
+CIRCUIT = "circuit"
+
+KINDS = (NETWORK, TIMEOUT, CHALLENGE, PARSE, CIRCUIT)
+RETRYABLE = (NETWORK, TIMEOUT, CHALLENGE)
+
+T = TypeVar("T")
+
+_deadline: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+
+
+class FetchError(Exception):
+    kind = NETWORK
+
+
+class ChallengeError(FetchError):
+    kind = CHALLENGE
+
+
+class BudgetExceeded(FetchError):
+    kind = TIMEOUT
+
+
+class CircuitOpenError(FetchError):
+    kind = CIRCUIT
+
+
+def classify(error: BaseException) -> str:
+    if isinstance(error, FetchError):
+        return error.kind
+    if isinstance(error, asyncio.TimeoutError) or type(error).__name__ == "TimeoutError":
+        return TIMEOUT
+    if isinstance(error, OSError) or type(error).__module__.startswith(("aiohttp", "playwright")):
+        return NETWORK
+    return PARSE
+
+
+def describe(error: BaseException) -> str:
+    text = str(error).strip()
+    return type(error).__name__ + (": " + text.splitlines()[0] if text else "")
+
+
+def error_marker(section: str, item: Any, error: BaseException) -> Dict[str, Any]:
+    return section_error(section, item, classify(error), describe(error))
+
+
+def section_error(section: str, item: Any, kind: str, message: str) -> Dict[str, Any]:
+    metrics.inc("section_errors_total", section=section, kind=kind)
+    logger.warning(f"Раздел {section} ({item}) не загружен, ошибка {kind}: {message}")
+    return {"section": section, "item": str(item), "kind": kind, "message": message}
+
+
+@contextmanager
+def time_budget(seconds: float) -> Iterator[None]:
+    token = _deadline.set(time.monotonic() + seconds if seconds > 0 else None)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+async def within_budget(awaitable: Awaitable[T]) -> T:
+    left = remaining()
+    if left is None:
+        return await awaitable
+    if left <= 0:
+        if asyncio.iscoroutine(awaitable):
+            awaitable.close()
+        raise BudgetExceeded("Время на матч истекло")
+    try:
+        return await asyncio.wait_for(awaitable, left)
+    except asyncio.TimeoutError:
+        raise BudgetExceeded("Время на матч истекло") from None
+
+
+def run_detached(awaitable: Awaitable[T]) -> "asyncio.Task[T]":
+    token = _deadline.set(None)
+    try:
+        task = asyncio.ensure_future(awaitable)
+    finally:
+        _deadline.reset(token)
+    task.add_done_callback(lambda done: done.cancelled() or done.exception())
+    return task
+
+
+class RetryPolicy:
+    def __init__(self, attempts: int = 3, base_delay: float = 2.0, max_delay: float = 30.0) -> None:
+        self.attempts = max(1, attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def should_retry(self, kind: str, attempt: int, delay: float) -> bool:
+        left = remaining()
+        return kind in RETRYABLE and attempt + 1 < self.attempts and (left is None or delay < left)
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, threshold: int = 5, cooldown: float = 60.0) -> None:
+        self.name = name
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_until = 0.0
+
+    async def wait(self) -> None:
+        while True:
+            delay = self.opened_until - time.monotonic()
+            if delay <= 0:
+                return
+            left = remaining()
+            if left is not None and delay >= left:
+                raise CircuitOpenError(f"Маршрут {self.name} приостановлен еще на {delay:.0f} сек")
+            await asyncio.sleep(delay)
+
+    def success(self) -> None:
+        self.failures = 0
+
+    def failure(self) -> None:
+        self.failures += 1
+        now = time.monotonic()
+        if self.threshold <= 0 or self.failures < self.threshold or self.opened_until > now:
+            return
+        self.opened_until = now + self.cooldown
+        metrics.inc("circuit_open_total", route=self.name)
+        logger.warning(
+            f"Маршрут {self.name} приостановлен на {self.cooldown:.0f} сек после {self.failures} ошибок подряд"
+        )
+
@@ -1,14 +1,40 @@
 import asyncio
-from aiohttp import ClientSession
-from bs4 import BeautifulSoup
-from fake_useragent import UserAgent
-from playwright.async_api import async_playwright
 
-from datetime import datetime
-from dateutil.relativedelta import relativedelta
+from datetime import date, datetime
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 from stats_scraper.logger import logger
+from stats_scraper.archive import PageArchive
+from stats_scraper.browser import ALLOWED_RESOURCE_TYPES, BrowserPool, allowed_domains
+from stats_scraper.cache import PageCache
+from stats_scraper.fetcher import Fetcher, find_route
+from stats_scraper.history import DERIVE, MATCHES_PAGE, TeamHistory
+from stats_scraper.journal import RunJournal
+from stats_scraper.metrics import metrics
+from stats_scraper.parsing import ParseExecutor
+from stats_scraper.paths import ARCHIVE_DIR, CACHE_DIR, OUT_DIR, STATE_DIR
+from stats_scraper.ratelimit import RequestScheduler
+from stats_scraper.resilience import RetryPolicy, error_marker, run_detached, within_budget
+from stats_scraper.state import TEAMS
+from stats_scraper.settings import Settings, load_config
+
+
+TEAM_PAGES = (
+    ("", "team_overview"),
+    ("matches", "team_matches"),
+    ("maps", "team_maps"),
+    ("players", "team_players"),
+    ("players/flashes", "team_flashes"),
+    ("players/openingkills", "team_opening_kills")
+)
+TEAM_PAGE_SUFFIXES = {page_type: suffix for suffix, page_type in TEAM_PAGES}
+
+
+def team_period(until: Optional[date] = None) -> Tuple[str, str]:
+    from dateutil.relativedelta import relativedelta
+
+    end = until or datetime.now().date()
+    return (end - relativedelta(months=3)).strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")
 
 
 class Scraper:
@@ -16,320 +42,228 @@ class Scraper:
     base_player_url = "https://www.hltv.org/stats/players"
     base_teams_url = "https://www.hltv.org/stats/teams"
     
-    def __init__(self) -> None:
-        self.session = ClientSession()
+    def __init__(self, replay: bool = False, config: Optional[Settings] = None,
+                 journal: Optional[RunJournal] = None, rate_store: Any = None) -> None:
+        config = config or load_config()
+        self.replay = replay
+        self.journal = journal
+        
+        if "base_url" in config:
+            self.base_url = config["base_url"].rstrip("/")
+            self.base_player_url = f"{self.base_url}/stats/players"
+            self.base_teams_url = f"{self.base_url}/stats/teams"
+        
+        browser_config = config.get("browser", {})
+        self.browser = BrowserPool(
+            size=browser_config.get("pool_size", 4),
+            max_navigations=browser_config.get("max_navigations", 50),
+            headless=browser_config.get("headless", True),
+            block_resources=browser_config.get("block_resources", True),
+            allowed_resource_types=browser_config.get("allowed_resource_types", ALLOWED_RESOURCE_TYPES),
+            allowed_domains=allowed_domains(
+                self.base_url, tuple(browser_config.get("allowed_domains", ()))
+            )
+        )
+        
+        rate_config = config.get("rate_limit", {})
+        self.scheduler = RequestScheduler(
+            rate=rate_config.get("rate", 1.0),
+            burst=rate_config.get("burst", 3),
+            concurrency=rate_config.get("concurrency", 2),
+            min_concurrency=rate_config.get("min_concurrency", 1),
+            max_concurrency=rate_config.get("max_concurrency", 8),
+            store=rate_store
+        )
+        
+        archive_config = config.get("archive", {})
+        self.archive = PageArchive(
+            ARCHIVE_DIR,
+            compression=archive_config.get("compression", "zstd")
+        ) if archive_config.get("enabled", True) or replay else None
+        
+        http_config = config.get("http", {})
+        retry_config = config.get("retry", {})
+        self.fetcher = Fetcher(
+            self.browser,
+            self.scheduler,
+            connection_limit=http_config.get("connection_limit", 10),
+            keepalive_timeout=http_config.get("keepalive_timeout", 30),
+            timeout=http_config.get("timeout", 30),
+            strategies=http_config.get("strategies", {}),
+            archive=None if replay else self.archive,
+            fragments=browser_config.get("fragments", False),
+            retry=RetryPolicy(
+                attempts=retry_config.get("attempts", 3),
+                base_delay=retry_config.get("base_delay", 2),
+                max_delay=retry_config.get("max_delay", 30)
+            ),
+            breaker_threshold=retry_config.get("breaker_threshold", 5),
+            breaker_cooldown=retry_config.get("breaker_cooldown", 60),
+            navigation_timeout=browser_config.get("navigation_timeout", 60),
+            demote_after=http_config.get("demote_after", 3),
+            demote_cooldown=http_config.get("demote_cooldown", 300)
+        )
+        
+        cache_config = config.get("cache", {})
+        self.cache = PageCache(
+            CACHE_DIR / "pages.sqlite3",
+            ttl=cache_config.get("ttl", {}),
+            memory_items=cache_config.get("memory_items", 256),
+            disk_size_mb=cache_config.get("disk_size_mb", 512)
+        ) if cache_config.get("enabled", True) and not replay else None
+        
+        history_config = config.get("history", {})
+        self.history = TeamHistory(
+            STATE_DIR / "history.sqlite3",
+            OUT_DIR / config.get("storage", {}).get("database", "hltv.sqlite3"),
+            ttl=history_config.get("ttl", {})
+        ) if history_config.get("enabled", False) and not replay else None
+        self._team_syncs: Dict[int, asyncio.Task] = {}
+        
+        parser_config = config.get("parser", {})
+        self.parser = ParseExecutor(
+            mode=parser_config.get("mode", "process"),
+            workers=parser_config.get("workers", 0),
+            batch_size=parser_config.get("batch_size", 8),
+            batch_bytes=parser_config.get("batch_kb", 256) * 1024
+        )
     
     async def __aenter__(self):
+        self.parser.start()
+        await self.fetcher.start()
         return self
     
     async def __aexit__(self, *args):
-        await self.session.close()
+        await self.parser.close()
+        await self.fetcher.close()
+        await self.browser.close()
+        if self.cache is not None:
+            self.cache.close()
+        if self.history is not None:
+            self.history.close()
     
     async def get_page_content(self, url: str) -> str:
         logger.debug(f"Получение содержимого страницы: {url}")
-        
-        async with async_playwright() as playwright:
-            await asyncio.sleep(5)
-            
-            browser = await playwright.chromium.launch(headless=True)
-            context = await browser.new_context(user_agent=UserAgent().random)
-            page = await context.new_page()
-            await page.goto(url, wait_until="domcontentloaded", timeout=60000)
-            return await page.content()
+        route = find_route(url)
+        with metrics.timer("page_seconds", route=route.name):
+            if self.replay:
+                page_content = await asyncio.to_thread(self.archive.load, url)
+            elif self.cache is None:
+                page_content = await self.fetcher.fetch(url)
+            else:
+                page_content = await self.cache.get_or_fetch(url, route, self.fetcher.fetch)
+        metrics.observe("page_bytes", len(page_content), route=route.name)
+        return page_content
     
-    async def get_all_match_urls(self) -> List[str]:
+    async def get_upcoming_matches(self) -> List[Dict[str, Any]]:
         logger.info("Процесс получение всех ссылок на матчи")
         
-        page_content = await self.get_page_content(f"{self.base_url}/matches")
-        soup = BeautifulSoup(page_content, "lxml")
-        return [
-            self.base_url + item.select_one(".match").get("href") 
-            for item in soup.select_one(".upcomingMatchesSection").select(".upcomingMatch[team1]")
-        ]
+        return [{
+            "url": self.base_url + match["href"],
+            "start": match["start"],
+            "stars": match["stars"]
+        } for match in await self.load(f"{self.base_url}/matches", "match_list")]
     
-    async def fetch_all_match_data(self, page_content: str, match_name: str) -> Dict[str, Any]:
-        logger.info(f"Получение данных матча: {match_name}")
+    async def get_results(self, start: str, end: str, offset: int = 0) -> Dict[str, Any]:
+        logger.debug(f"Получение результатов матчей с {start} по {end}, смещение {offset}")
         
-        result = await asyncio.gather(
-            self.fetch_lineups(page_content),
-            self.fetch_match_stats(page_content),
-            self.fetch_past_3_month(page_content),
-            self.fetch_head_to_head(page_content)
-        )
+        page = await self.load(f"{self.base_url}/results?startDate={start}&endDate={end}&offset={offset}", "results")
         return {
-            "lineups": result[0],
-            "match_stats": result[1],
-            "past_3_month": result[2],
-            "head_to_head": result[3]
+            "matches": [{"url": self.base_url + match["href"], "start": match["start"]} for match in page["matches"]],
+            "total": page["total"]
         }
     
-    async def get_match_name(self, page_content: str) -> str:
-        soup = BeautifulSoup(page_content, "lxml")
-        return self.get_text(soup, ".event")
-    
-    async def get_match_type(self, page_content: str) -> str:
-        soup = BeautifulSoup(page_content, "lxml")
-        return self.get_text(soup, ".preformatted-text").split("*")[0].strip()
+    async def parse(self, page_type: str, page_content: str) -> Any:
+        with metrics.timer("parse_seconds", page=page_type):
+            return await self.parser.parse(page_type, page_content)
     
-    async def fetch_lineups(self, page_content: str) -> List[Dict[str, Any]]:
-        soup = BeautifulSoup(page_content, "lxml")
-        return [{
-            "id":         int(item.select_one(".flex-align-center > a").get("href").split("/")[2]),
-            "team":       self.get_text(item, ".flex-align-center > a"),
-            "world_rank": int(self.get_text(item, ".teamRanking > a").rsplit("#")[-1]) if self.get_text(item, ".teamRanking > a") is not None else None,
-            "players": [{
-                "id":       player.get("data-player-id"),
-                "nickname": player.getText(strip=True)
-            } for player in item.select(".player > .flagAlign")]
-        } for item in soup.select(".lineup")]
-        
-    async def fetch_match_stats(self, page_content: str) -> List[Dict[str, Any]]:
-        soup = BeautifulSoup(page_content, "lxml")
-        team_1 = self.get_text(soup, ".map-stats-infobox-header > :nth-child(2)")
-        team_2 = self.get_text(soup, ".map-stats-infobox-header > :nth-child(3)")
-        return [{
-            "map": self.get_text(item, ".mapname"),
-            "stats": {
-                team_1: (
-                    self.get_text(item, ":nth-child(2) > .map-stats-infobox-winpercentage"),
-                    self.get_text(item, ":nth-child(2) > .map-stats-infobox-maps-played")
-                ),
-                team_2: (
-                    self.get_text(item, ":nth-child(3) > .map-stats-infobox-winpercentage"),
-                    self.get_text(item, ":nth-child(3) > .map-stats-infobox-maps-played")
-                )
-            }
-        } for item in soup.select(".map-stats-infobox-maps")]
-        
-    async def fetch_past_3_month(self, page_content: str) -> List[Dict[str, Any]]:
-        soup = BeautifulSoup(page_content, "lxml")
-        return [{
-            "team": self.get_text(item, ".past-matches-headline"),
-            "matches": [{
-                "team":  self.get_text(match, ".past-matches-teamname"),
-                "cell":  self.get_text(match, ".past-matches-map"),
-                "score": self.get_text(match, ".past-matches-score")
-            }for match in item.select("tbody > tr")]
-        } for item in soup.select(".past-matches > :nth-child(3) > .past-matches-box")]
-        
-    async def fetch_head_to_head(self, page_content: str) -> Dict[str, Any]:
-        soup = BeautifulSoup(page_content, "lxml")
-        head_to_head = soup.select_one(".head-to-head")
-        return {
-            "stats": {
-                self.get_text(head_to_head, ".team1"): self.get_text(head_to_head, ".right-border > .bold"),
-                self.get_text(head_to_head, ".team2"): self.get_text(head_to_head, ".left-border > .bold"),
-                "overtimes": self.get_text(head_to_head, ".padding > :nth-child(3) > .bold")
-            } if head_to_head else {
-                "team1": None,
-                "team2": None,
-                "overtimes": None
-            },
-            "listing": [{
-                "date":   self.get_text(row, ".date"),
-                "team1":  self.get_text(row, ".team1"),
-                "team2":  self.get_text(row, ".team2"), 
-                "event":  self.get_text(row, ".event"),
-                "map":    self.get_text(row, ".map > .dynamic-map-name-full"),
-                "result": self.get_text(row, ".result")
-            } for row in soup.select(".head-to-head-listing > table > tbody > tr") if row]
-        }
-        
-    async def fetch_player_stats(self, page_content: str) -> Dict[str, Any]:
-        soup = BeautifulSoup(page_content, "lxml")
-        return {
-            "nickname": self.get_text(soup, ".summaryNickname"),
-            "realname": self.get_text(soup, ".summaryRealname"),
-            "team":     self.get_text(soup, ".SummaryTeamname"),
-            "age":      self.get_text(soup, ".summaryPlayerAge"),
-            "short_stats": {
-                self.get_text(stats, ".summaryStatTooltip > b"): self.get_text(stats, ".summaryStatBreakdownDataValue")
-                for stats in soup.select(".summaryStatBreakdown")
-            },
-            "full_stats": {
-                self.get_text(stats, ":nth-child(1)"): self.get_text(stats, ":nth-child(2)")
-                for stats in soup.select(".stats-row")
-            }
-        }
+    async def load(self, url: str, page_type: str) -> Any:
+        key = f"{page_type}:{url}"
+        if self.journal is not None:
+            result = await asyncio.to_thread(self.journal.get, key)
+            if result is not None:
+                metrics.inc("journal_hits_total", page=page_type)
+                return result
         
-    async def get_all_players_stats(self, players: List[Dict[str, str]]) -> List[Dict[str, Any]]:
-        tasks = []
-        for player in players:
-            id, nickname = player["id"], player["nickname"]
-            page_content = await self.get_page_content(f"{self.base_player_url}/{id}/{nickname}")
-            task = self.fetch_player_stats(page_content)
-            tasks.append(task)
-            
-        return await asyncio.gather(*tasks)
-
+        result = await self.parse(page_type, await self.get_page_content(url))
+        if self.journal is not None:
+            await asyncio.to_thread(self.journal.record, key, result)
+        return result
+    
+    @metrics.timed("section_seconds", section="match")
+    async def get_match_page(self, match_url: str) -> Dict[str, Any]:
+        match_page = await self.load(match_url, "match")
+        href = match_page.pop("analytics_href")
+        match_page["analytics_url"] = self.base_url + href if href else None
+        return match_page
+    
+    @metrics.timed("section_seconds", section="player")
+    async def get_player_stats(self, player: Dict[str, str]) -> Dict[str, Any]:
+        id, nickname = player["id"], player["nickname"]
+        return await self.load(f"{self.base_player_url}/{id}/{nickname}", "player_stats")
+    
+    @metrics.timed("section_seconds", section="analytics")
     async def fetch_match_analytics(self, match_url: str) -> Dict[str, Any]:
-        page_content = await self.get_page_content(match_url)
-        soup = BeautifulSoup(page_content, "lxml")
-        return {
-            "analytics_summary": [{
-                "team": self.get_text(item, ".team-name"),
-                "analytic": [
-                    self.get_text(analytic, ".analytics-insights-info")
-                    for analytic in item.select(".analytics-insights-insight")
-                ]
-            } for item in soup.select(".analytics-insights-wrapper > .col-6")],
-            "head_to_head": [{
-                "team": self.get_text(hth, ".team-name"),
-                "players": {
-                    self.get_text(player, ".player-nickname"): {
-                        "3 month": self.get_text(player, ".table-3-months"),
-                        "event":   self.get_text(player, ".table-event")
-                    }
-                    for player in hth.select(".table-container > tbody > tr")
-                },
-                "last_matchs": [{
-                    "team":  self.get_text(match, ".team-name"),
-                    "score": self.get_text(match, ".recent-score"),
-                    "type":  self.get_text(match, ".match-type")
-                } for match in hth.select(".analytics-last-matches > a")]
-            } for hth in soup.select(".analytics-head-to-head-container")],
-            "past_3_month": [{
-                "team":            self.get_text(p3m, ".team-name"),
-                "match_map_count": self.get_text(p3m, ".match-map-count"),
-                "matches": [{
-                    "score":    self.get_text(match, "td:not(.best-bet):not(.handicap-data)"),
-                    "handicap": self.get_text(match, ".handicap-data")
-                } for match in p3m.select("tbody > tr")]
-            } for p3m in soup.select(".analytics-handicap-wrapper > .col-6")],
-            "map_handicap": [{
-                "overall_data": {
-                    "avg_rounds_lost_in_wins":  self.get_text(
-                        handicap, 
-                        ".analytics-handicap-map-data-overall-container > :nth-child(1) > :nth-child(1)"
-                    ),
-                    "avg_rounds_won_in_losses": self.get_text(
-                        handicap, 
-                        ".analytics-handicap-map-data-overall-container > :nth-child(2) > :nth-child(1)"
-                    )
-                },
-                "individual_maps": [{
-                    "map":                      self.get_text(item, ".mapname"),
-                    "avg_rounds_lost_in_wins":  self.get_text(item, ":nth-child(2):not(.mapname)"),
-                    "avg_rounds_won_in_losses": self.get_text(item, ":nth-child(3):not(.mapname)")
-                } for item in handicap.select("tbody > tr")]
-            } for handicap in soup.select(".analytics-handicap-map-wrapper > .col-6")],
-            "map_stats": [{
-                "map":        self.get_text(item, "td[rowspan]"),
-                "team":       self.get_text(item, ".maps-team-name"),
-                "first_pick": self.get_text(item, ".analytics-map-stats-pick-percentage"),
-                "first_ban":  self.get_text(item, ".analytics-map-stats-ban-percentage"),
-                "win":        self.get_text(item, ".analytics-map-stats-win-percentage"),
-                "played":     self.get_text(item, ".analytics-map-stats-played"),
-                "comment":    self.get_text(item, ".analytics-map-stats-comment")
-            } for item in soup.select(".gtSmartphone-only > tbody > tr")]
-        }
+        return await self.load(match_url, "match_analytics")
         
-    async def fetch_team_stats(self, team_id: int, team_name: str) -> List[Dict[str, Any]]:
+    @metrics.timed("section_seconds", section="team")
+    async def fetch_team_stats(self, team_id: int, team_name: str, until: Optional[date] = None,
+                               errors: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
         logger.info(f"Получения статистики команды: {team_name}")
-        
-        today = datetime.now()
-        three_months_ago = today - relativedelta(months=3)
-        today_str = today.strftime('%Y-%m-%d')
-        three_months_ago_str = three_months_ago.strftime('%Y-%m-%d')
-        
-        async def fetch_data(url_suffix: str, data_transformer: callable) -> Any:
-            full_url = f"{self.base_teams_url}/{url_suffix}/{team_id}/{team_name}" \
-                       f"?startDate={three_months_ago_str}&endDate={today_str}"
-            page_content = await self.get_page_content(full_url)
-            soup = BeautifulSoup(page_content, "lxml")
-            return await data_transformer(soup)
 
+        results = await asyncio.gather(*(
+            self.fetch_team_page(team_id, team_name, suffix, page_type, until) for suffix, page_type in TEAM_PAGES
+        ), return_exceptions=errors is not None)
         team_stats = {"team": team_name}
-        data_fetchers = [
-            ("", self._parse_overview),
-            ("matches", self._parse_matches),
-            ("maps", self._parse_maps),
-            ("players", self._parse_players),
-            ("players/flashes", self._parse_flashes),
-            ("players/openingkills", self._parse_opening_kills)
-        ]
-
-        for suffix, transformer in data_fetchers:
-            team_stats.update(await fetch_data(suffix, transformer))
+        for (_, page_type), result in zip(TEAM_PAGES, results):
+            if isinstance(result, Exception):
+                errors.append(error_marker(TEAMS, f"{team_name}/{page_type}", result))
+            else:
+                team_stats.update(result)
         
         return team_stats
 
+    async def fetch_team_page(self, team_id: int, team_name: str, url_suffix: str, page_type: str,
+                              until: Optional[date] = None) -> Dict[str, Any]:
+        start, end = team_period(until)
+        if self.history is not None and until is None:
+            return await self.fetch_team_history(team_id, team_name, page_type, start, end)
+        return await self.load(self.team_url(team_id, team_name, url_suffix, start, end), page_type)
 
-    async def _parse_overview(self, soup: BeautifulSoup) -> Dict[str, Any]:
-        return {
-            "overview": {
-                self.get_text(item, ".small-label-below"): self.get_text(item, ".large-strong")
-                for item in soup.select(".col.standard-box")
-            }
-        }
-
-    async def _parse_matches(self, soup: BeautifulSoup) -> List[Dict[str, Any]]:
-        return {
-            "matches": [{
-                "date":     self.get_text(item, ".time"),
-                "event":    self.get_text(item, ".gtSmartphone-only"),
-                "opponent": self.get_text(item, ":nth-child(4)"),
-                "map":      self.get_text(item, ".statsMapPlayed"),
-                "result":   self.get_text(item, ".statsDetail"),
-                "W/L":      self.get_text(item, ".text-center:not(.gtSmartphone-only)")
-            } for item in soup.select(".stats-table > tbody > tr")]
-        }
+    def team_url(self, team_id: int, team_name: str, url_suffix: str, start: str, end: str) -> str:
+        return f"{self.base_teams_url}/{url_suffix}/{team_id}/{team_name}?startDate={start}&endDate={end}"
 
-    async def _parse_maps(self, soup: BeautifulSoup) -> List[Dict[str, Any]]:
-        return {
-            "maps": [{
-                "map": self.get_text(item, ".map-pool"),
-                "stats": {
-                    self.get_text(row, ".strong"): self.get_text(row, ":not(.strong)")
-                    for row in item.select(".stats-row")
-                } 
-            } for item in soup.select(".two-grid:not(.win-defeat-container) > .col")]
-        }
+    async def fetch_team_history(self, team_id: int, team_name: str, page_type: str,
+                                 start: str, end: str) -> Dict[str, Any]:
+        if page_type == MATCHES_PAGE:
+            return {"matches": await self.sync_team_matches(team_id, team_name, start, end)}
 
-    async def _parse_players(self, soup: BeautifulSoup) -> Dict[str, Any]:
-        return {
-            "overview": [{
-                "nickname": self.get_text(item, ":nth-child(1)"),
-                "maps":     self.get_text(item, ".statsDetail"),
-                "rounds":   self.get_text(item, ":nth-child(3)"),
-                "k-d diff": self.get_text(item, ":nth-child(4)"),
-                "k/d":      self.get_text(item, ":nth-child(5)"),
-                "rating":   self.get_text(item, ":nth-child(6)")
-            } for item in soup.select(".stats-table > tbody > tr")]
-        }
+        page = await asyncio.to_thread(self.history.page, team_id, page_type)
+        if page is None:
+            url = self.team_url(team_id, team_name, TEAM_PAGE_SUFFIXES[page_type], start, end)
+            page = await self.load(url, page_type)
+            await asyncio.to_thread(self.history.store_page, team_id, page_type, page)
+        else:
+            metrics.inc("team_history_total", page=page_type, result="stored")
 
-    async def _parse_flashes(self, soup: BeautifulSoup) -> List[Dict[str, Any]]:
-        return {
-            "flashes": [{
-                "nickname":    self.get_text(item, ":nth-child(1)"),
-                "maps":        self.get_text(item, ".mapsCol"),
-                "rounds":      self.get_text(item, ":nth-child(3)"),
-                "thrown":      self.get_text(item, ":nth-child(4)"),
-                "blinder":     self.get_text(item, ":nth-child(5)"),
-                "opp_flashed": self.get_text(item, ":nth-child(6)"),
-                "diff":        self.get_text(item, ":nth-child(7)"),
-                "fa":          self.get_text(item, ":nth-child(8)"),
-                "success":     self.get_text(item, ":nth-child(9)")
-            } for item in soup.select(".stats-table > tbody > tr")]
-        }
+        if page_type in DERIVE:
+            page = DERIVE[page_type](page, await self.sync_team_matches(team_id, team_name, start, end))
+        return page
 
-    async def _parse_opening_kills(self, soup: BeautifulSoup) -> List[Dict[str, Any]]:
-        return {
-            "opening_kills": [{
-                "nickname": self.get_text(item, ":nth-child(1)"),
-                "maps":     self.get_text(item, ".mapsCol"),
-                "rounds":   self.get_text(item, ":nth-child(3)"),
-                "kpr":      self.get_text(item, ":nth-child(4)"),
-                "dpr":      self.get_text(item, ":nth-child(5)"),
-                "attempts": self.get_text(item, ":nth-child(6)"),
-                "success":  self.get_text(item, ":nth-child(7)"),
-                "rating":   self.get_text(item, ":nth-child(8)"),
-            } for item in soup.select(".stats-table > tbody > tr")]
-        }
+    async def sync_team_matches(self, team_id: int, team_name: str, start: str, end: str) -> List[Dict[str, Any]]:
+        task = self._team_syncs.get(team_id)
+        if task is None:
+            task = run_detached(self._sync_team_matches(team_id, team_name, start, end))
+            self._team_syncs[team_id] = task
+            task.add_done_callback(lambda _: self._team_syncs.pop(team_id, None))
+        await within_budget(asyncio.shield(task))
+        return await asyncio.to_thread(self.history.matches, team_id, start, end)
 
-    def get_text(self, soup: BeautifulSoup, selector: str) -> str | None:
-        text = soup.select_one(selector)
-        if text:
-            return text.getText(strip=True)
-        else:
-            return None
\ No newline at end of file
+    async def _sync_team_matches(self, team_id: int, team_name: str, start: str, end: str) -> None:
+        since = await asyncio.to_thread(self.history.sync_from, team_id, start)
+        if since is not None:
+            url = self.team_url(team_id, team_name, TEAM_PAGE_SUFFIXES[MATCHES_PAGE], since, end)
+            page = await self.load(url, MATCHES_PAGE)
+            added = await asyncio.to_thread(self.history.add_matches, team_id, page["matches"], end)
+            metrics.inc("team_history_total", page=MATCHES_PAGE, result="full" if since == start else "delta")
+            logger.debug(f"История команды {team_name} обновлена с {since}, строк: {added}")
@@ -0,0 +1,145 @@
+from datetime import date
+from functools import lru_cache
+
+from typing import Dict, List, TypedDict
+from stats_scraper.paths import CONFIG_PATH
+
+
+class BrowserSettings(TypedDict, total=False):
+    pool_size: int
+    max_navigations: int
+    navigation_timeout: float
+    headless: bool
+    block_resources: bool
+    allowed_resource_types: List[str]
+    allowed_domains: List[str]
+    fragments: bool
+
+
+class HttpSettings(TypedDict, total=False):
+    connection_limit: int
+    keepalive_timeout: int
+    timeout: int
+    strategies: Dict[str, str]
+    demote_after: int
+    demote_cooldown: float
+
+
+class RateLimitSettings(TypedDict, total=False):
+    rate: float
+    burst: int
+    concurrency: int
+    min_concurrency: int
+    max_concurrency: int
+
+
+class RetrySettings(TypedDict, total=False):
+    attempts: int
+    base_delay: float
+    max_delay: float
+    match_budget: float
+    breaker_threshold: int
+    breaker_cooldown: float
+
+
+class PipelineSettings(TypedDict, total=False):
+    matches: int
+    players: int
+    analytics: int
+    teams: int
+    writers: int
+
+
+class CacheSettings(TypedDict, total=False):
+    enabled: bool
+    memory_items: int
+    disk_size_mb: int
+    ttl: Dict[str, int]
+
+
+class ParserSettings(TypedDict, total=False):
+    mode: str
+    workers: int
+    batch_size: int
+    batch_kb: int
+
+
+class ArchiveSettings(TypedDict, total=False):
+    enabled: bool
+    compression: str
+
+
+class MetricsSettings(TypedDict, total=False):
+    enabled: bool
+    port: int
+    snapshot: bool
+    snapshot_interval: float
+
+
+class WatchSettings(TypedDict, total=False):
+    interval: float
+    refresh: Dict[str, int]
+    near_start: int
+    near_start_refresh: Dict[str, int]
+
+
+class JournalSettings(TypedDict, total=False):
+    enabled: bool
+
+
+class StorageSettings(TypedDict, total=False):
+    database: str
+    export: List[str]
+
+
+class DistributedSettings(TypedDict, total=False):
+    backend: str
+    path: str
+    local_workers: int
+    concurrency: int
+    lease: float
+    max_attempts: int
+    retry_delay: float
+    poll_interval: float
+    idle_exit: float
+
+
+class HistorySettings(TypedDict, total=False):
+    enabled: bool
+    ttl: Dict[str, int]
+
+
+class BackfillSettings(TypedDict, total=False):
+    start: date
+    end: date
+    window_days: int
+    matches: int
+    rate_limit: RateLimitSettings
+
+
+class Settings(TypedDict, total=False):
+    debug: bool
+    base_url: str
+    browser: BrowserSettings
+    http: HttpSettings
+    rate_limit: RateLimitSettings
+    retry: RetrySettings
+    pipeline: PipelineSettings
+    cache: CacheSettings
+    parser: ParserSettings
+    archive: ArchiveSettings
+    metrics: MetricsSettings
+    watch: WatchSettings
+    journal: JournalSettings
+    storage: StorageSettings
+    distributed: DistributedSettings
+    history: HistorySettings
+    backfill: BackfillSettings
+
+
+@lru_cache(maxsize=None)
+def load_config() -> Settings:
+    import yaml
+
+    with open(CONFIG_PATH) as file:
+        return yaml.load(file, Loader=yaml.FullLoader)
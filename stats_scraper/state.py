@@ -0,0 +1,73 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+from pathlib import Path
+from typing import Any, Dict, Iterable, Set, Tuple
+from stats_scraper.paths import ensure_parent
+
+
+MATCH = "match"
+LINEUPS = "lineups"
+PLAYERS = "players"
+ANALYTICS = "analytics"
+TEAMS = "teams"
+ERRORS = "errors"
+
+SECTIONS = (MATCH, PLAYERS, ANALYTICS, TEAMS)
+
+
+def content_hash(data: Any) -> str:
+    return hashlib.sha256(json.dumps(data, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class WatchState:
+    def __init__(self, path: Path) -> None:
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(ensure_parent(path), check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS sections ("
+            "match_url TEXT, section TEXT, hash TEXT, fetched_at REAL, PRIMARY KEY (match_url, section))"
+        )
+        self._connection.commit()
+
+    def stale_sections(self, match_url: str, refresh: Dict[str, int]) -> Set[str]:
+        with self._lock:
+            fetched = dict(self._connection.execute(
+                "SELECT section, fetched_at FROM sections WHERE match_url = ?", (match_url,)
+            ).fetchall())
+
+        now = time.time()
+        return {section for section in SECTIONS
+                if section not in fetched or now - fetched[section] >= refresh.get(section, 0)}
+
+    def changed(self, match_url: str, section: str, digest: str) -> bool:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT hash FROM sections WHERE match_url = ? AND section = ?", (match_url, section)
+            ).fetchone()
+        return row is None or row[0] != digest
+
+    def commit(self, match_url: str, digests: Iterable[Tuple[str, str]]) -> None:
+        fetched_at = time.time()
+        with self._lock:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO sections VALUES (?, ?, ?, ?)",
+                ((match_url, section, digest, fetched_at) for section, digest in digests)
+            )
+            self._connection.commit()
+
+    def forget(self, match_urls: Iterable[str]) -> int:
+        active = set(match_urls)
+        with self._lock:
+            known = {url for url, in self._connection.execute("SELECT DISTINCT match_url FROM sections")}
+            finished = known - active
+            self._connection.executemany("DELETE FROM sections WHERE match_url = ?", ((url,) for url in finished))
+            self._connection.commit()
+        return len(finished)
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
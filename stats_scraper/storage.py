@@ -0,0 +1,435 @@
+import json
+import sqlite3
+import threading
+import time
+
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from stats_scraper.logger import logger
+from stats_scraper.metrics import metrics
+from stats_scraper.models import parse_number, to_records
+from stats_scraper.paths import ensure_parent
+from stats_scraper.state import ANALYTICS, ERRORS, MATCH, PLAYERS, SECTIONS, TEAMS
+from stats_scraper.utils import iso_date
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    match_id              INTEGER PRIMARY KEY,
+    url                   TEXT NOT NULL,
+    event                 TEXT,
+    type                  TEXT,
+    start_time            INTEGER,
+    stars                 INTEGER,
+    analytics_url         TEXT,
+    match_stats           TEXT,
+    past_3_month          TEXT,
+    head_to_head_stats    TEXT,
+    analytics             TEXT,
+    captured_before_start INTEGER,
+    updated_at            REAL
+);
+CREATE INDEX IF NOT EXISTS matches_start_time ON matches (start_time);
+
+CREATE TABLE IF NOT EXISTS lineups (
+    match_id   INTEGER NOT NULL,
+    team_id    INTEGER NOT NULL,
+    position   INTEGER,
+    team       TEXT,
+    world_rank INTEGER,
+    PRIMARY KEY (match_id, team_id)
+);
+CREATE INDEX IF NOT EXISTS lineups_team ON lineups (team_id);
+
+CREATE TABLE IF NOT EXISTS players (
+    player_id  TEXT PRIMARY KEY,
+    nickname   TEXT,
+    realname   TEXT,
+    team       TEXT,
+    age        TEXT,
+    updated_at REAL
+);
+
+CREATE TABLE IF NOT EXISTS player_stats (
+    match_id    INTEGER NOT NULL,
+    player_id   TEXT NOT NULL,
+    team_id     INTEGER,
+    position    INTEGER,
+    nickname    TEXT,
+    short_stats TEXT,
+    full_stats  TEXT,
+    updated_at  REAL,
+    PRIMARY KEY (match_id, player_id)
+);
+CREATE INDEX IF NOT EXISTS player_stats_player ON player_stats (player_id);
+CREATE INDEX IF NOT EXISTS player_stats_team ON player_stats (team_id);
+
+CREATE TABLE IF NOT EXISTS team_stats (
+    match_id   INTEGER NOT NULL,
+    team_id    INTEGER NOT NULL,
+    section    TEXT NOT NULL,
+    position   INTEGER,
+    data       TEXT,
+    updated_at REAL,
+    PRIMARY KEY (match_id, team_id, section)
+);
+CREATE INDEX IF NOT EXISTS team_stats_team ON team_stats (team_id);
+
+CREATE TABLE IF NOT EXISTS head_to_head (
+    match_id  INTEGER NOT NULL,
+    position  INTEGER NOT NULL,
+    played_on TEXT,
+    date      TEXT,
+    team1     TEXT,
+    team2     TEXT,
+    event     TEXT,
+    map       TEXT,
+    result    TEXT,
+    PRIMARY KEY (match_id, position)
+);
+CREATE INDEX IF NOT EXISTS head_to_head_teams ON head_to_head (team1, team2);
+CREATE INDEX IF NOT EXISTS head_to_head_played_on ON head_to_head (played_on);
+
+CREATE TABLE IF NOT EXISTS stat_values (
+    match_id  INTEGER NOT NULL,
+    entity    TEXT NOT NULL,
+    entity_id TEXT NOT NULL,
+    section   TEXT NOT NULL,
+    item      TEXT NOT NULL,
+    stat      TEXT NOT NULL,
+    value     REAL,
+    text      TEXT,
+    PRIMARY KEY (match_id, entity, entity_id, section, item, stat)
+);
+CREATE INDEX IF NOT EXISTS stat_values_stat ON stat_values (entity, section, stat, value);
+
+CREATE TABLE IF NOT EXISTS section_errors (
+    match_id   INTEGER NOT NULL,
+    section    TEXT NOT NULL,
+    item       TEXT NOT NULL,
+    kind       TEXT NOT NULL,
+    message    TEXT,
+    updated_at REAL,
+    PRIMARY KEY (match_id, section, item)
+);
+"""
+
+# История матчей команд по картам. Пишется и при сохранении статистики команд,
+# и при синхронизации истории (stats_scraper/history.py, база подключается через ATTACH)
+MAP_STATS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS {schema}.map_stats (
+    team_id   INTEGER NOT NULL,
+    played_on TEXT NOT NULL,
+    date      TEXT,
+    map       TEXT NOT NULL,
+    opponent  TEXT NOT NULL,
+    event     TEXT,
+    result    TEXT,
+    outcome   TEXT,
+    PRIMARY KEY (team_id, played_on, opponent, map)
+);
+CREATE INDEX IF NOT EXISTS {schema}.map_stats_team_map ON map_stats (team_id, map, played_on);
+CREATE INDEX IF NOT EXISTS {schema}.map_stats_played_on ON map_stats (played_on);
+"""
+
+
+def add_map_stats(connection: sqlite3.Connection, rows: Iterable[Tuple[int, Dict[str, Any]]],
+                  schema: str = "main") -> int:
+    values = [
+        (team_id, iso_date(row.get("date")), row.get("date"), row.get("map"), row.get("opponent"), row.get("event"),
+         row.get("result"), row.get("W/L"))
+        for team_id, row in rows
+    ]
+    values = [value for value in values if value[1] and value[3] and value[4]]
+    connection.executemany(
+        f"INSERT INTO {schema}.map_stats VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+        "ON CONFLICT (team_id, played_on, opponent, map) DO UPDATE SET date = excluded.date, "
+        "event = excluded.event, result = excluded.result, outcome = excluded.outcome",
+        values
+    )
+    return len(values)
+
+
+def _dumps(data: Any) -> Optional[str]:
+    return None if data is None else json.dumps(data, ensure_ascii=False)
+
+
+def _loads(text: Optional[str]) -> Any:
+    return None if text is None else json.loads(text)
+
+
+def _stat_values(data: Any) -> Iterator[Tuple[str, str, Optional[float], Any]]:
+    if isinstance(data, dict):
+        rows = [("", data)]
+    elif isinstance(data, list):
+        rows = [(row.get("map") or "", row["stats"]) if isinstance(row.get("stats"), dict) else
+                (row.get("nickname") or "", {key: text for key, text in row.items() if key != "nickname"})
+                for row in data if isinstance(row, dict)]
+    else:
+        rows = []
+    for item, stats in rows:
+        for stat, text in stats.items():
+            value = parse_number(text)
+            yield item, stat, value if isinstance(value, (int, float)) else None, text
+
+
+class Storage:
+    def __init__(self, path: Path) -> None:
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(ensure_parent(path), check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(SCHEMA + MAP_STATS_SCHEMA.format(schema="main"))
+        self._connection.commit()
+
+    @metrics.timed("save_seconds", format="sqlite")
+    def save(self, match_id: int, match_url: str, sections: Dict[str, Any]) -> None:
+        now = time.time()
+        with self._lock, self._connection:
+            if MATCH in sections:
+                self._save_match(match_id, match_url, sections[MATCH], now)
+            if PLAYERS in sections:
+                self._save_players(match_id, sections[PLAYERS], now)
+            if ANALYTICS in sections:
+                self._connection.execute(
+                    "UPDATE matches SET analytics = ?, updated_at = ? WHERE match_id = ?",
+                    (_dumps(sections[ANALYTICS]), now, match_id)
+                )
+            if TEAMS in sections:
+                self._save_teams(match_id, sections[TEAMS], now)
+            self._save_errors(match_id, sections, now)
+
+    def exists(self, match_id: int) -> bool:
+        with self._lock:
+            return self._connection.execute(
+                "SELECT 1 FROM matches WHERE match_id = ?", (match_id,)
+            ).fetchone() is not None
+
+    def load(self, match_id: int) -> Dict[str, Any]:
+        with self._lock:
+            match = self._connection.execute(
+                "SELECT event, type, analytics_url, start_time, stars, captured_before_start, match_stats, "
+                "past_3_month, head_to_head_stats, analytics FROM matches WHERE match_id = ?", (match_id,)
+            ).fetchone()
+            if match is None:
+                return {}
+
+            lineups = self._connection.execute(
+                "SELECT team_id, team, world_rank FROM lineups WHERE match_id = ? ORDER BY position", (match_id,)
+            ).fetchall()
+            players = self._connection.execute(
+                "SELECT s.player_id, s.team_id, s.nickname, s.short_stats, s.full_stats, "
+                "p.nickname, p.realname, p.team, p.age "
+                "FROM player_stats s LEFT JOIN players p USING (player_id) "
+                "WHERE s.match_id = ? ORDER BY s.position", (match_id,)
+            ).fetchall()
+            teams = self._connection.execute(
+                "SELECT t.team_id, t.section, t.data FROM team_stats t "
+                "JOIN lineups l ON l.match_id = t.match_id AND l.team_id = t.team_id "
+                "WHERE t.match_id = ? ORDER BY l.position, t.position", (match_id,)
+            ).fetchall()
+            listing = self._connection.execute(
+                "SELECT date, team1, team2, event, map, result FROM head_to_head "
+                "WHERE match_id = ? ORDER BY position", (match_id,)
+            ).fetchall()
+            errors = self._connection.execute(
+                "SELECT section, item, kind, message FROM section_errors WHERE match_id = ? ORDER BY section, item",
+                (match_id,)
+            ).fetchall()
+
+        event, match_type, analytics_url, start, stars, captured_before_start, *data, analytics = match
+        match_stats, past_3_month, head_to_head_stats = map(_loads, data)
+        sections = {MATCH: {
+            "name": event,
+            "type": match_type,
+            "analytics_url": analytics_url,
+            "start": start,
+            "stars": stars,
+            "captured_before_start": captured_before_start,
+            "data": {
+                "lineups": [{
+                    "id": team_id,
+                    "team": team,
+                    "world_rank": world_rank,
+                    "players": [
+                        {"id": player[0], "nickname": player[2]} for player in players if player[1] == team_id
+                    ]
+                } for team_id, team, world_rank in lineups],
+                "match_stats": match_stats,
+                "past_3_month": past_3_month,
+                "head_to_head": {
+                    "stats": head_to_head_stats,
+                    "listing": [
+                        dict(zip(("date", "team1", "team2", "event", "map", "result"), row)) for row in listing
+                    ]
+                }
+            }
+        }}
+
+        if players and any(player[3] is not None for player in players):
+            sections[PLAYERS] = [{
+                "nickname": nickname or stats_nickname,
+                "realname": realname,
+                "team": team,
+                "age": age,
+                "short_stats": _loads(short_stats),
+                "full_stats": _loads(full_stats)
+            } for _, _, stats_nickname, short_stats, full_stats, nickname, realname, team, age in players]
+        if analytics is not None:
+            sections[ANALYTICS] = _loads(analytics)
+        if teams:
+            team_stats: Dict[int, Dict[str, Any]] = {}
+            for team_id, section, data in teams:
+                team_stats.setdefault(team_id, {})[section] = _loads(data)
+            sections[TEAMS] = list(team_stats.values())
+        if errors:
+            sections[ERRORS] = [dict(zip(("section", "item", "kind", "message"), row)) for row in errors]
+        return sections
+
+    def load_records(self, match_id: int) -> Dict[str, Any]:
+        return to_records(self.load(match_id))
+
+    def match_teams(self) -> List[Tuple[int, Optional[int], int, str, int, str, Optional[str]]]:
+        with self._lock:
+            return self._connection.execute(
+                "SELECT m.match_id, m.start_time, t1.team_id, t1.team, t2.team_id, t2.team, m.head_to_head_stats "
+                "FROM matches m "
+                "JOIN lineups t1 ON t1.match_id = m.match_id AND t1.position = 0 "
+                "JOIN lineups t2 ON t2.match_id = m.match_id AND t2.position = 1 "
+                "ORDER BY m.match_id"
+            ).fetchall()
+
+    def map_history(self) -> List[Tuple[int, str, str, Optional[str], Optional[str]]]:
+        with self._lock:
+            return self._connection.execute(
+                "SELECT team_id, played_on, map, result, outcome FROM map_stats "
+                "WHERE played_on GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]'"
+            ).fetchall()
+
+    def player_stats(self) -> List[Tuple[int, int, Optional[str]]]:
+        with self._lock:
+            return self._connection.execute(
+                "SELECT match_id, team_id, short_stats FROM player_stats WHERE short_stats IS NOT NULL"
+            ).fetchall()
+
+    def team_sections(self, section: str) -> List[Tuple[int, int, Optional[str]]]:
+        with self._lock:
+            return self._connection.execute(
+                "SELECT match_id, team_id, data FROM team_stats WHERE section = ?", (section,)
+            ).fetchall()
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def _save_match(self, match_id: int, match_url: str, match: Dict[str, Any], now: float) -> None:
+        data = match["data"]
+        head_to_head = data["head_to_head"]
+        self._connection.execute(
+            "INSERT INTO matches (match_id, url, event, type, start_time, stars, analytics_url, match_stats, "
+            "past_3_month, head_to_head_stats, captured_before_start, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (match_id) DO UPDATE SET url = excluded.url, event = excluded.event, "
+            "type = excluded.type, start_time = excluded.start_time, stars = excluded.stars, "
+            "analytics_url = excluded.analytics_url, match_stats = excluded.match_stats, "
+            "past_3_month = excluded.past_3_month, head_to_head_stats = excluded.head_to_head_stats, "
+            "captured_before_start = excluded.captured_before_start, updated_at = excluded.updated_at",
+            (match_id, match_url, match["name"], match["type"], match.get("start"), match.get("stars"),
+             match["analytics_url"], _dumps(data["match_stats"]), _dumps(data["past_3_month"]),
+             _dumps(head_to_head["stats"]), match.get("captured_before_start"), now)
+        )
+
+        lineups = data["lineups"]
+        for lineup in lineups:
+            if lineup["id"] is None:
+                logger.warning(f"Не найден номер команды {lineup['team']} в матче {match_id}, состав не сохранен")
+        self._connection.execute("DELETE FROM lineups WHERE match_id = ?", (match_id,))
+        self._connection.executemany(
+            "INSERT INTO lineups VALUES (?, ?, ?, ?, ?)",
+            [(match_id, lineup["id"], position, lineup["team"], lineup["world_rank"])
+             for position, lineup in enumerate(lineups) if lineup["id"] is not None]
+        )
+
+        players = [(lineup["id"], player) for lineup in lineups for player in lineup["players"]]
+        player_ids = [player["id"] or player["nickname"] for _, player in players]
+        self._connection.execute(
+            f"DELETE FROM player_stats WHERE match_id = ? AND player_id NOT IN ({','.join('?' * len(player_ids))})",
+            (match_id, *player_ids)
+        )
+        self._connection.executemany(
+            "INSERT INTO player_stats (match_id, player_id, team_id, position, nickname, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (match_id, player_id) DO UPDATE SET team_id = excluded.team_id, "
+            "position = excluded.position, nickname = excluded.nickname",
+            [(match_id, player_id, team_id, position, player["nickname"], now)
+             for position, (player_id, (team_id, player)) in enumerate(zip(player_ids, players))]
+        )
+
+        self._connection.execute("DELETE FROM head_to_head WHERE match_id = ?", (match_id,))
+        self._connection.executemany(
+            "INSERT INTO head_to_head VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(match_id, position, iso_date(item["date"]), item["date"], item["team1"], item["team2"],
+              item["event"], item["map"], item["result"])
+             for position, item in enumerate(head_to_head["listing"])]
+        )
+
+    def _save_players(self, match_id: int, players_stats: List[Dict[str, Any]], now: float) -> None:
+        player_ids = [player_id for player_id, in self._connection.execute(
+            "SELECT player_id FROM player_stats WHERE match_id = ? ORDER BY position", (match_id,)
+        )]
+        self._connection.executemany(
+            "INSERT INTO players VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (player_id) DO UPDATE SET nickname = excluded.nickname, realname = excluded.realname, "
+            "team = excluded.team, age = excluded.age, updated_at = excluded.updated_at",
+            [(player_id, stats["nickname"], stats["realname"], stats["team"], stats["age"], now)
+             for player_id, stats in zip(player_ids, players_stats) if stats["short_stats"] is not None]
+        )
+        self._connection.executemany(
+            "UPDATE player_stats SET short_stats = ?, full_stats = ?, updated_at = ? "
+            "WHERE match_id = ? AND player_id = ?",
+            [(_dumps(stats["short_stats"]), _dumps(stats["full_stats"]), now, match_id, player_id)
+             for player_id, stats in zip(player_ids, players_stats)]
+        )
+        self._connection.execute("DELETE FROM stat_values WHERE match_id = ? AND entity = 'player'", (match_id,))
+        self._connection.executemany(
+            "INSERT OR REPLACE INTO stat_values VALUES (?, 'player', ?, ?, ?, ?, ?, ?)",
+            [(match_id, player_id, section, item, stat, value, text)
+             for player_id, stats in zip(player_ids, players_stats)
+             for section in ("short_stats", "full_stats")
+             for item, stat, value, text in _stat_values(stats[section])]
+        )
+
+    def _save_teams(self, match_id: int, teams_stats: List[Dict[str, Any]], now: float) -> None:
+        teams = [(team_id, teams_stats[position]) for position, team_id in self._connection.execute(
+            "SELECT position, team_id FROM lineups WHERE match_id = ? ORDER BY position", (match_id,)
+        ) if position < len(teams_stats)]
+        self._connection.execute("DELETE FROM team_stats WHERE match_id = ?", (match_id,))
+        self._connection.executemany(
+            "INSERT INTO team_stats VALUES (?, ?, ?, ?, ?, ?)",
+            [(match_id, team_id, section, position, _dumps(data), now)
+             for team_id, team_stats in teams
+             for position, (section, data) in enumerate(team_stats.items())]
+        )
+        add_map_stats(self._connection, (
+            (team_id, item) for team_id, team_stats in teams for item in team_stats.get("matches") or ()
+        ))
+        self._connection.execute("DELETE FROM stat_values WHERE match_id = ? AND entity = 'team'", (match_id,))
+        self._connection.executemany(
+            "INSERT OR REPLACE INTO stat_values VALUES (?, 'team', ?, ?, ?, ?, ?, ?)",
+            [(match_id, team_id, section, item, stat, value, text)
+             for team_id, team_stats in teams
+             for section, data in team_stats.items() if section not in ("team", "matches")
+             for item, stat, value, text in _stat_values(data)]
+        )
+
+    def _save_errors(self, match_id: int, sections: Dict[str, Any], now: float) -> None:
+        errors = sections.get(ERRORS, [])
+        cleared = {section for section in SECTIONS if section in sections} | {error["section"] for error in errors}
+        self._connection.executemany(
+            "DELETE FROM section_errors WHERE match_id = ? AND section = ?",
+            [(match_id, section) for section in cleared]
+        )
+        self._connection.executemany(
+            "INSERT OR REPLACE INTO section_errors VALUES (?, ?, ?, ?, ?, ?)",
+            [(match_id, error["section"], error["item"], error["kind"], error["message"], now) for error in errors]
+        )
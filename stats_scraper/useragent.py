@@ -0,0 +1,19 @@
+import random
+from functools import lru_cache
+
+from typing import Tuple
+
+
+@lru_cache(maxsize=None)
+def user_agents() -> Tuple[str, ...]:
+    from fake_useragent import UserAgent
+
+    agent = UserAgent()
+    return tuple(
+        item["useragent"] for item in agent.data_browsers
+        if item["browser"] in agent.browsers and item["os"] in agent.os
+    )
+
+
+def random_user_agent() -> str:
+    return random.choice(user_agents())
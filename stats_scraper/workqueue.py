@@ -0,0 +1,338 @@
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Type
+from stats_scraper.paths import STATE_DIR, ensure_parent
+from stats_scraper.settings import Settings
+
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+OPEN = "open"
+WRITTEN = "written"
+
+
+class Unit:
+    def __init__(self, kind: str, group: str, payload: Dict[str, Any], priority: float = 0.0,
+                 position: int = 0, key: Optional[str] = None, status: str = PENDING, attempts: int = 0,
+                 result: Any = None, error: Optional[str] = None) -> None:
+        self.kind = kind
+        self.group = group
+        self.payload = payload
+        self.priority = priority
+        self.position = position
+        self.key = key or f"{group}|{kind}:{position}"
+        self.status = status
+        self.attempts = attempts
+        self.result = result
+        self.error = error
+
+
+class WorkQueue(ABC):
+    @abstractmethod
+    def reset(self) -> None:
+        ...
+
+    @abstractmethod
+    def put(self, units: Iterable[Unit]) -> None:
+        ...
+
+    @abstractmethod
+    def claim(self, worker: str, lease: float) -> Optional[Unit]:
+        ...
+
+    @abstractmethod
+    def extend(self, key: str, worker: str, lease: float) -> bool:
+        ...
+
+    @abstractmethod
+    def complete(self, key: str, result: Any) -> None:
+        ...
+
+    @abstractmethod
+    def fail(self, key: str, error: str, retry_delay: float) -> bool:
+        ...
+
+    @abstractmethod
+    def finished(self, limit: int = 100) -> List[Unit]:
+        ...
+
+    @abstractmethod
+    def mark_handled(self, keys: Iterable[str]) -> None:
+        ...
+
+    @abstractmethod
+    def unfinished(self) -> int:
+        ...
+
+    @abstractmethod
+    def group_units(self, group: str) -> List[Unit]:
+        ...
+
+    @abstractmethod
+    def open_group(self, group: str, info: Dict[str, Any]) -> None:
+        ...
+
+    @abstractmethod
+    def open_groups(self) -> Dict[str, Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    def close_group(self, group: str, status: str) -> None:
+        ...
+
+    @abstractmethod
+    def start(self) -> None:
+        ...
+
+    @abstractmethod
+    def stop(self) -> None:
+        ...
+
+    @abstractmethod
+    def stopped(self) -> bool:
+        ...
+
+    @abstractmethod
+    def take_token(self, host: str, rate: float, burst: int) -> float:
+        ...
+
+    @abstractmethod
+    def close(self) -> None:
+        ...
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS units (
+    key          TEXT PRIMARY KEY,
+    grp          TEXT NOT NULL,
+    kind         TEXT NOT NULL,
+    payload      TEXT NOT NULL,
+    priority     REAL NOT NULL,
+    position     INTEGER NOT NULL,
+    status       TEXT NOT NULL,
+    attempts     INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL DEFAULT 0,
+    worker       TEXT,
+    lease_until  REAL,
+    result       TEXT,
+    error        TEXT,
+    handled      INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS units_ready ON units (status, priority, available_at);
+CREATE INDEX IF NOT EXISTS units_group ON units (grp, position);
+CREATE INDEX IF NOT EXISTS units_finished ON units (handled, status);
+
+CREATE TABLE IF NOT EXISTS groups (
+    grp    TEXT PRIMARY KEY,
+    info   TEXT NOT NULL,
+    status TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS buckets (
+    host    TEXT PRIMARY KEY,
+    tokens  REAL NOT NULL,
+    updated REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+UNIT_COLUMNS = "kind, grp, payload, priority, position, key, status, attempts, result, error"
+
+
+def _unit(row: Tuple[Any, ...]) -> Unit:
+    kind, group, payload, priority, position, key, status, attempts, result, error = row
+    return Unit(kind, group, json.loads(payload), priority, position, key, status, attempts,
+                None if result is None else json.loads(result), error)
+
+
+class SqliteWorkQueue(WorkQueue):
+    def __init__(self, path: Path, max_attempts: int = 3) -> None:
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(ensure_parent(path), timeout=30, isolation_level=None, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(SCHEMA)
+
+    @contextmanager
+    def _transaction(self, mode: str = "IMMEDIATE") -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            self._connection.execute(f"BEGIN {mode}")
+            try:
+                yield self._connection
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+
+    def reset(self) -> None:
+        with self._transaction():
+            for table in ("units", "groups", "meta"):
+                self._connection.execute(f"DELETE FROM {table}")
+
+    def put(self, units: Iterable[Unit]) -> None:
+        with self._transaction():
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO units (key, grp, kind, payload, priority, position, status) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(unit.key, unit.group, unit.kind, json.dumps(unit.payload, ensure_ascii=False),
+                  unit.priority, unit.position, PENDING) for unit in units]
+            )
+
+    def claim(self, worker: str, lease: float) -> Optional[Unit]:
+        now = time.time()
+        with self._transaction():
+            self._connection.execute(
+                "UPDATE units SET status = ?, error = 'Аренда истекла', worker = NULL "
+                "WHERE status = ? AND lease_until < ? AND attempts >= ?",
+                (FAILED, LEASED, now, self.max_attempts)
+            )
+            row = self._connection.execute(
+                f"SELECT {UNIT_COLUMNS} FROM units "
+                "WHERE (status = ? AND available_at <= ?) OR (status = ? AND lease_until < ?) "
+                "ORDER BY priority, position LIMIT 1",
+                (PENDING, now, LEASED, now)
+            ).fetchone()
+            if row is None:
+                return None
+
+            unit = _unit(row)
+            unit.status, unit.attempts = LEASED, unit.attempts + 1
+            self._connection.execute(
+                "UPDATE units SET status = ?, attempts = ?, worker = ?, lease_until = ? WHERE key = ?",
+                (LEASED, unit.attempts, worker, now + lease, unit.key)
+            )
+        return unit
+
+    def extend(self, key: str, worker: str, lease: float) -> bool:
+        with self._transaction():
+            cursor = self._connection.execute(
+                "UPDATE units SET lease_until = ? WHERE key = ? AND worker = ? AND status = ?",
+                (time.time() + lease, key, worker, LEASED)
+            )
+        return cursor.rowcount > 0
+
+    def complete(self, key: str, result: Any) -> None:
+        with self._transaction():
+            self._connection.execute(
+                "UPDATE units SET status = ?, result = ?, error = NULL, worker = NULL WHERE key = ? AND status = ?",
+                (DONE, json.dumps(result, ensure_ascii=False), key, LEASED)
+            )
+
+    def fail(self, key: str, error: str, retry_delay: float) -> bool:
+        with self._transaction():
+            row = self._connection.execute(
+                "SELECT attempts FROM units WHERE key = ? AND status = ?", (key, LEASED)
+            ).fetchone()
+            if row is None:
+                return False
+
+            attempts, = row
+            if attempts >= self.max_attempts:
+                self._connection.execute(
+                    "UPDATE units SET status = ?, error = ?, worker = NULL WHERE key = ?", (FAILED, error, key)
+                )
+                return False
+            self._connection.execute(
+                "UPDATE units SET status = ?, error = ?, worker = NULL, available_at = ? WHERE key = ?",
+                (PENDING, error, time.time() + retry_delay * 2 ** (attempts - 1), key)
+            )
+        return True
+
+    def finished(self, limit: int = 100) -> List[Unit]:
+        with self._transaction("DEFERRED"):
+            rows = self._connection.execute(
+                f"SELECT {UNIT_COLUMNS} FROM units WHERE handled = 0 AND status IN (?, ?) "
+                "ORDER BY priority, position LIMIT ?", (DONE, FAILED, limit)
+            ).fetchall()
+        return [_unit(row) for row in rows]
+
+    def mark_handled(self, keys: Iterable[str]) -> None:
+        with self._transaction():
+            self._connection.executemany("UPDATE units SET handled = 1 WHERE key = ?", [(key,) for key in keys])
+
+    def unfinished(self) -> int:
+        with self._transaction("DEFERRED"):
+            count, = self._connection.execute(
+                "SELECT COUNT(*) FROM units WHERE status IN (?, ?) OR handled = 0", (PENDING, LEASED)
+            ).fetchone()
+        return count
+
+    def group_units(self, group: str) -> List[Unit]:
+        with self._transaction("DEFERRED"):
+            rows = self._connection.execute(
+                f"SELECT {UNIT_COLUMNS} FROM units WHERE grp = ? ORDER BY position", (group,)
+            ).fetchall()
+        return [_unit(row) for row in rows]
+
+    def open_group(self, group: str, info: Dict[str, Any]) -> None:
+        with self._transaction():
+            self._connection.execute(
+                "INSERT OR IGNORE INTO groups VALUES (?, ?, ?)", (group, json.dumps(info, ensure_ascii=False), OPEN)
+            )
+
+    def open_groups(self) -> Dict[str, Dict[str, Any]]:
+        with self._transaction("DEFERRED"):
+            rows = self._connection.execute("SELECT grp, info FROM groups WHERE status = ?", (OPEN,)).fetchall()
+        return {group: json.loads(info) for group, info in rows}
+
+    def close_group(self, group: str, status: str) -> None:
+        with self._transaction():
+            self._connection.execute("UPDATE groups SET status = ? WHERE grp = ?", (status, group))
+
+    def start(self) -> None:
+        with self._transaction():
+            self._connection.execute("DELETE FROM meta WHERE key = 'stopped'")
+
+    def stop(self) -> None:
+        with self._transaction():
+            self._connection.execute("INSERT OR REPLACE INTO meta VALUES ('stopped', '1')")
+
+    def stopped(self) -> bool:
+        with self._transaction("DEFERRED"):
+            row = self._connection.execute("SELECT value FROM meta WHERE key = 'stopped'").fetchone()
+        return row is not None
+
+    def take_token(self, host: str, rate: float, burst: int) -> float:
+        now = time.time()
+        with self._transaction():
+            row = self._connection.execute("SELECT tokens, updated FROM buckets WHERE host = ?", (host,)).fetchone()
+            tokens = float(burst) if row is None else min(burst, row[0] + max(0.0, now - row[1]) * rate)
+            wait = 0.0 if tokens >= 1 else (1 - tokens) / rate
+            if not wait:
+                tokens -= 1
+            self._connection.execute("INSERT OR REPLACE INTO buckets VALUES (?, ?, ?)", (host, tokens, now))
+        return wait
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+QUEUE_BACKENDS: Dict[str, Type[WorkQueue]] = {
+    "sqlite": SqliteWorkQueue
+}
+
+
+def open_queue(config: Settings) -> WorkQueue:
+    distributed_config = config.get("distributed", {})
+    backend = distributed_config.get("backend", "sqlite")
+    if backend not in QUEUE_BACKENDS:
+        raise ValueError(f"Неизвестная очередь задач: {backend}")
+    return QUEUE_BACKENDS[backend](
+        STATE_DIR / distributed_config.get("path", "queue.sqlite3"),
+        max_attempts=distributed_config.get("max_attempts", 3)
+    )
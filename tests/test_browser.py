@@ -0,0 +1,17 @@
+from stats_scraper.browser import BrowserPool, allowed_domains
+
+
+def test_allowed_domains_follow_base_url():
+    pool = BrowserPool(allowed_domains=allowed_domains("http://mirror.example.com:8080"))
+
+    assert pool._is_allowed("script", "http://mirror.example.com:8080/app.js")
+    assert pool._is_allowed("script", "https://challenges.cloudflare.com/turnstile/v0/api.js")
+    assert not pool._is_allowed("script", "https://www.hltv.org/app.js")
+
+
+def test_allowed_domains_include_site_subdomains():
+    pool = BrowserPool(allowed_domains=allowed_domains("https://www.hltv.org", ("cdn.example.net",)))
+
+    assert pool._is_allowed("script", "https://static.hltv.org/app.js")
+    assert pool._is_allowed("xhr", "https://cdn.example.net/data.json")
+    assert not pool._is_allowed("script", "https://ads.example.org/ads.js")
@@ -0,0 +1,42 @@
+import asyncio
+
+import pytest
+
+from stats_scraper.cache import PageCache
+from stats_scraper.fetcher import find_route
+from stats_scraper.resilience import BudgetExceeded, time_budget
+
+
+PLAYER_URL = "https://www.hltv.org/stats/players/7998/s1mple"
+
+
+def test_shared_fetch_ignores_first_caller_budget(tmp_path):
+    route = find_route(PLAYER_URL)
+    cache = PageCache(tmp_path / "pages.sqlite3", ttl={route.name: 60})
+    fetches = []
+
+    async def fetch(url: str) -> str:
+        fetches.append(url)
+        await asyncio.sleep(0.2)
+        return "page"
+
+    async def short_budget() -> str:
+        with time_budget(0.05):
+            return await cache.get_or_fetch(PLAYER_URL, route, fetch)
+
+    async def long_budget() -> str:
+        await asyncio.sleep(0.01)
+        with time_budget(5):
+            return await cache.get_or_fetch(PLAYER_URL, route, fetch)
+
+    async def run():
+        return await asyncio.gather(short_budget(), long_budget(), return_exceptions=True)
+
+    try:
+        first, second = asyncio.run(run())
+    finally:
+        cache.close()
+
+    assert isinstance(first, BudgetExceeded)
+    assert second == "page"
+    assert fetches == [PLAYER_URL]
@@ -0,0 +1,28 @@
+import asyncio
+
+from stats_scraper.distributed import MATCH_UNIT, TEAM_PAGE_UNIT, Coordinator
+from stats_scraper.workqueue import Unit
+
+
+class ListQueue:
+    def __init__(self) -> None:
+        self.units = []
+
+    def put(self, units):
+        self.units += units
+
+
+def test_team_pages_are_not_queued_for_unknown_team():
+    queue = ListQueue()
+    match_page = {"analytics_url": None, "data": {"lineups": [
+        {"id": None, "team": "Team Unknown", "players": []},
+        {"id": 4608, "team": "Natus Vincere", "players": []}
+    ]}}
+    unit = Unit(MATCH_UNIT, "https://www.hltv.org/matches/2370000/a-vs-b", {}, result=match_page)
+
+    asyncio.run(Coordinator(queue, None)._enqueue_sections(unit))
+
+    team_units = [unit for unit in queue.units if unit.kind == TEAM_PAGE_UNIT]
+    assert team_units
+    assert {unit.payload["team_id"] for unit in team_units} == {4608}
+    assert {unit.payload["team_index"] for unit in team_units} == {1}
@@ -0,0 +1,39 @@
+from pathlib import Path
+
+from benchmarks.server import CHALLENGE_PAGE
+from stats_scraper.fetcher import find_route, is_challenge, is_throttled
+
+
+FIXTURES_DIR = Path(__file__).resolve().parent.parent / "benchmarks" / "fixtures"
+INJECTED_SCRIPT = '<script src="/cdn-cgi/challenge-platform/scripts/jsd/main.js"></script>'
+PLAYER_URL = "https://www.hltv.org/stats/players/7998/s1mple"
+
+
+def with_injected_script(page_content: str) -> str:
+    return page_content.replace("</body>", f"{INJECTED_SCRIPT}</body>")
+
+
+def test_page_with_injected_script_is_not_challenge():
+    route = find_route(PLAYER_URL)
+    page_content = with_injected_script((FIXTURES_DIR / "player_stats.html").read_text(encoding="utf-8"))
+
+    assert INJECTED_SCRIPT in page_content
+    assert route.is_complete(page_content)
+    assert not is_challenge(200, page_content, route)
+    assert not is_throttled(200, page_content, route)
+
+
+def test_challenge_page_is_detected():
+    route = find_route(PLAYER_URL)
+
+    assert is_challenge(200, CHALLENGE_PAGE, route)
+    assert is_challenge(200, CHALLENGE_PAGE)
+    assert is_challenge(403, "", route)
+
+
+def test_complete_page_with_challenge_marker_is_not_challenge():
+    route = find_route(PLAYER_URL)
+    page_content = (FIXTURES_DIR / "player_stats.html").read_text(encoding="utf-8")
+    page_content = page_content.replace("</head>", "<script>window._cf_chl_opt = {};</script></head>")
+
+    assert not is_challenge(200, page_content, route)
@@ -0,0 +1,52 @@
+import sqlite3
+
+from stats_scraper.history import TeamHistory
+from stats_scraper.storage import Storage
+
+
+ROWS = [
+    {"date": "05/03/26", "event": "PGL", "opponent": "NAVI", "map": "Mirage", "result": "13 - 9", "W/L": "W"},
+    {"date": "04/03/26", "event": "PGL", "opponent": "G2", "map": "Nuke", "result": "7 - 13", "W/L": "L"},
+    {"date": "bad", "event": "PGL", "opponent": "G2", "map": "Nuke", "result": "7 - 13", "W/L": "L"}
+]
+
+
+def test_history_matches_are_stored_in_map_stats(tmp_path):
+    database = tmp_path / "hltv.sqlite3"
+    storage = Storage(database)
+    history = TeamHistory(tmp_path / "history.sqlite3", database, ttl={})
+    try:
+        assert history.add_matches(4608, ROWS, "2026-03-06") == 2
+        assert history.add_matches(4608, ROWS[:1], "2026-03-06") == 1
+
+        assert sorted(storage.map_history()) == [
+            (4608, "2026-03-04", "Nuke", "7 - 13", "L"),
+            (4608, "2026-03-05", "Mirage", "13 - 9", "W")
+        ]
+        assert [row["map"] for row in history.matches(4608, "2026-03-01", "2026-03-31")] == ["Mirage", "Nuke"]
+    finally:
+        history.close()
+        storage.close()
+
+
+def test_old_team_matches_table_is_moved(tmp_path):
+    path = tmp_path / "history.sqlite3"
+    connection = sqlite3.connect(path)
+    connection.execute(
+        "CREATE TABLE team_matches (team_id INTEGER NOT NULL, played_on TEXT NOT NULL, date TEXT, event TEXT, "
+        "opponent TEXT NOT NULL, map TEXT NOT NULL, result TEXT, outcome TEXT, "
+        "PRIMARY KEY (team_id, played_on, opponent, map))"
+    )
+    connection.execute(
+        "INSERT INTO team_matches VALUES (4608, '2026-03-05', '05/03/26', 'PGL', 'NAVI', 'Mirage', '13 - 9', 'W')"
+    )
+    connection.commit()
+    connection.close()
+
+    history = TeamHistory(path, tmp_path / "hltv.sqlite3", ttl={})
+    try:
+        assert history.matches(4608, "2026-03-01", "2026-03-31") == [
+            {"date": "05/03/26", "event": "PGL", "opponent": "NAVI", "map": "Mirage", "result": "13 - 9", "W/L": "W"}
+        ]
+    finally:
+        history.close()
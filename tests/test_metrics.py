@@ -0,0 +1,28 @@
+from stats_scraper.metrics import Histogram
+
+
+def test_quantile_does_not_exceed_observed_max():
+    histogram = Histogram((0.1, 1.0, 10.0))
+    for value in (0.2, 0.3, 0.4):
+        histogram.observe(value)
+
+    assert histogram.quantile(0.5) == 0.4
+    assert histogram.quantile(0.99) == 0.4
+
+
+def test_quantile_returns_bucket_bound():
+    histogram = Histogram((0.1, 1.0, 10.0))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value)
+
+    assert histogram.quantile(0.3) == 0.1
+    assert histogram.quantile(0.6) == 1.0
+    assert histogram.quantile(1.0) == 5.0
+    assert histogram.quantile(0.5) <= histogram.max
+
+
+def test_quantile_above_last_bucket_is_max():
+    histogram = Histogram((0.1,))
+    histogram.observe(3.0)
+
+    assert histogram.quantile(0.5) == 3.0
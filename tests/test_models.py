@@ -0,0 +1,29 @@
+from datetime import date
+
+from benchmarks.bench_models import fixture_sections
+from stats_scraper.models import DATE, DECIMAL, SCORE, StatTable, TeamPlayer, parse_number, to_records, to_sections
+from stats_scraper.state import TEAMS
+
+
+def test_records_round_trip():
+    sections = fixture_sections()
+
+    assert to_sections(to_records(sections)) == sections
+
+
+def test_team_summary_and_players_have_separate_types():
+    team_stats = to_records(fixture_sections())[TEAMS][0]
+
+    assert isinstance(team_stats.summary, StatTable)
+    assert all(isinstance(player, TeamPlayer) for player in team_stats.overview)
+
+
+def test_codecs_keep_text_they_cannot_restore():
+    assert DECIMAL.parse("1.05") == 1.05
+    assert DECIMAL.parse("1.5") == "1.5"
+    assert DECIMAL.parse(None) is None
+    assert SCORE.parse("13 - 9") == (13, 9)
+    assert SCORE.parse("13 - 09") == "13 - 09"
+    assert DATE.parse("05/03/26") == date(2026, 3, 5)
+    assert parse_number("74.1%") == 74.1
+    assert parse_number("-") == "-"
@@ -0,0 +1,80 @@
+import asyncio
+
+from stats_scraper.pipeline import Pipeline
+from stats_scraper.state import MATCH, TEAMS, WatchState, content_hash
+
+
+MATCH_URL = "https://www.hltv.org/matches/2370000/a-vs-b"
+
+
+class MemoryStorage:
+    def __init__(self, fail: bool = False) -> None:
+        self.fail = fail
+        self.saved = []
+
+    def save(self, match_id, match_url, sections):
+        if self.fail:
+            raise OSError("disk full")
+        self.saved.append(match_id)
+
+
+def write(storage: MemoryStorage, state: WatchState, digest: str) -> None:
+    pipeline = Pipeline(None, storage, state=state)
+
+    async def run():
+        writer = asyncio.create_task(pipeline._writer())
+        await pipeline.write_queue.put((MATCH_URL, "A vs B", {MATCH: {}}, [(MATCH, digest)]))
+        await pipeline.write_queue.join()
+        writer.cancel()
+
+    asyncio.run(run())
+
+
+def test_digest_is_committed_after_save(tmp_path):
+    state = WatchState(tmp_path / "watch.sqlite3")
+    digest = content_hash({"lineups": []})
+    storage = MemoryStorage()
+    try:
+        write(storage, state, digest)
+        assert storage.saved == [2370000]
+        assert not state.changed(MATCH_URL, MATCH, digest)
+    finally:
+        state.close()
+
+
+def test_digest_is_not_committed_when_save_fails(tmp_path):
+    state = WatchState(tmp_path / "watch.sqlite3")
+    digest = content_hash({"lineups": []})
+    try:
+        write(MemoryStorage(fail=True), state, digest)
+        assert state.changed(MATCH_URL, MATCH, digest)
+        assert state.stale_sections(MATCH_URL, {}) >= {MATCH}
+    finally:
+        state.close()
+
+
+LINEUPS = [
+    {"id": None, "team": "Team Unknown", "world_rank": None, "players": []},
+    {"id": 4608, "team": "Natus Vincere", "world_rank": 1, "players": []}
+]
+
+
+class TeamScraper:
+    def __init__(self) -> None:
+        self.teams = []
+
+    async def fetch_team_stats(self, team_id, team_name, until, failures):
+        self.teams.append(team_id)
+        return {"team": team_name, "summary": {}}
+
+
+def test_lineup_without_team_id_is_not_fetched():
+    scraper = TeamScraper()
+    pipeline = Pipeline(scraper, MemoryStorage())
+    sections, errors = {}, []
+
+    asyncio.run(pipeline._fetch_teams(MATCH_URL, LINEUPS, (0, 0), {TEAMS}, {}, sections, errors, []))
+
+    assert scraper.teams == [4608]
+    assert [team["team"] for team in sections[TEAMS]] == ["team-unknown", "natus-vincere"]
+    assert [(error["section"], error["item"], error["kind"]) for error in errors] == [(TEAMS, "Team Unknown", "parse")]
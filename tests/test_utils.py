@@ -0,0 +1,7 @@
+from stats_scraper.utils import iso_date
+
+
+def test_iso_date():
+    assert iso_date("05/03/26") == "2026-03-05"
+    assert iso_date("2026-03-05") is None
+    assert iso_date(None) is None